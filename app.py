@@ -1,7 +1,18 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, url_for, Response, stream_with_context, g
+import io
 import os
+import json
+import time
+import sqlite3
+from werkzeug.datastructures import FileStorage
 from utils.resume_processor import ResumeProcessor
-from utils.sentiment_analyzer import SentimentAnalyzer
+from utils.sentiment_analyzer import SentimentAnalyzer, ROUTE_COUNTER, ROUTE_LATENCY
+from utils.batch_screener import BatchScreener
+from utils.job_queue import JobQueue, JobWorkerPool
+from utils.bulk_feedback import parse_feedback_items
+from utils.gemini_api import PROMPT_TOKENS
+from utils.json_repair import PARSE_COUNTER
+from utils.metrics import REGISTRY, Trace, activate_trace, deactivate_trace
 from config import Config
 import logging
 
@@ -16,10 +27,74 @@ app.config.from_object(Config)
 # No need to pass parameters as they handle their own initialization
 resume_processor = ResumeProcessor()
 sentiment_analyzer = SentimentAnalyzer()
+batch_screener = BatchScreener(resume_processor)
+
+
+def run_screening_job(payload, file_data):
+    """Job handler for queued resume screenings"""
+    resume_file = FileStorage(stream=io.BytesIO(file_data), filename=payload['file_name'])
+    return resume_processor.process(resume_file, payload['job_description'])
+
+
+# Background screening jobs, persisted so they survive worker restarts. The worker threads are
+# started per process after any fork: by gunicorn's post_worker_init hook or on the first request
+job_queue = JobQueue(Config.JOB_QUEUE_PATH, Config.JOB_RETENTION_SECONDS, Config.JOB_STALE_SECONDS,
+                     Config.JOB_MAX_ATTEMPTS)
+job_workers = JobWorkerPool(job_queue, Config.JOB_WORKERS, Config.JOB_POLL_INTERVAL, Config.JOB_HEARTBEAT_SECONDS)
+job_workers.register('screen_resume', run_screening_job)
 
 # Ensure upload directory exists with correct path from config
 os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
 
+REQUEST_LATENCY = REGISTRY.histogram("http_request_duration_seconds",
+                                     "Time to produce a response (streamed bodies excluded) per endpoint",
+                                     ("endpoint", "method", "status"))
+
+
+@app.before_request
+def start_job_workers():
+    """Start this process's job workers if no server hook has (returns at once once they run)"""
+    job_workers.start()
+
+
+@app.before_request
+def share_metrics():
+    """Share this process's metrics with the other worker processes, if a metrics directory is set"""
+    REGISTRY.share(Config.METRICS_DIR, Config.METRICS_WRITE_INTERVAL)
+
+
+@app.before_request
+def start_trace():
+    """Collect stage timings for this request"""
+    g.trace = Trace()
+    g.trace_token = activate_trace(g.trace)
+
+
+@app.after_request
+def finish_trace(response):
+    """Record the request latency and, if enabled, report the stage breakdown as Server-Timing"""
+    trace = g.pop('trace', None)
+    if trace is not None:
+        REQUEST_LATENCY.observe(time.perf_counter() - trace.started, endpoint=request.endpoint or 'unknown',
+                                method=request.method, status=response.status_code)
+        if Config.SERVER_TIMING_ENABLED:
+            response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def end_trace(exc=None):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        deactivate_trace(token)
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics, summed over the worker processes that share METRICS_DIR"""
+    return Response(REGISTRY.expose(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/')
 def index():
     """Render the home page"""
@@ -38,25 +113,82 @@ def sentiment_analysis():
     return render_template('sentiment_analysis.html')
 
 
-@app.route('/api/screen-resume', methods=['POST'])
-def screen_resume():
-    """API endpoint to screen resume against job requirements"""
+def resume_upload():
+    """
+    Validate the single-resume upload form
+
+    Returns:
+        tuple: (resume file, job description, None), or (None, None, error response)
+    """
     if 'resume' not in request.files:
-        return jsonify({'error': 'No resume file provided'}), 400
+        return None, None, (jsonify({'error': 'No resume file provided'}), 400)
 
     resume_file = request.files['resume']
     job_description = request.form.get('job_description', '')
 
     if resume_file.filename == '':
-        return jsonify({'error': 'No resume file selected'}), 400
+        return None, None, (jsonify({'error': 'No resume file selected'}), 400)
 
     if not job_description:
-        return jsonify({'error': 'Job description is required'}), 400
+        return None, None, (jsonify({'error': 'Job description is required'}), 400)
 
     # Check if the file extension is allowed
     file_ext = os.path.splitext(resume_file.filename)[1].lower()
     if file_ext[1:] not in Config.ALLOWED_EXTENSIONS:
-        return jsonify({'error': f'File type {file_ext} not allowed. Please upload PDF, DOCX, TXT, or common image files.'}), 400
+        return None, None, (jsonify({'error': f'File type {file_ext} not allowed. Please upload PDF, DOCX, TXT, or common image files.'}), 400)
+
+    return resume_file, job_description, None
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_stream(events):
+    """
+    Relay analysis stream events to the browser as Server-Sent Events
+
+    A "start" event goes out before any work so the first byte is not held back
+    by extraction or the model; "delta" carries raw reply text, "field" each
+    top-level field once complete, and "result" (or "error") the final payload.
+    """
+    def generate():
+        yield sse_event('start', {'status': 'processing'})
+        try:
+            for event in events():
+                if event[0] == 'delta':
+                    yield sse_event('delta', {'text': event[1]})
+                elif event[0] == 'field':
+                    yield sse_event('field', {'name': event[1], 'value': event[2]})
+                else:
+                    result = event[1]
+                    yield sse_event('error' if 'error' in result else 'result', result)
+        except Exception as e:
+            app.logger.error(f"Streaming analysis error: {str(e)}")
+            yield sse_event('error', {'error': str(e), 'status': 'failed'})
+
+    # X-Accel-Buffering stops nginx-style proxies from holding events back
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/screen-resume', methods=['POST'])
+def screen_resume():
+    """API endpoint to screen resume against job requirements"""
+    resume_file, job_description, error = resume_upload()
+    if error:
+        return error
+
+    # In async mode, queue the screening and let the client poll /api/jobs/<job_id>
+    if request.form.get('async', request.args.get('async', '')).lower() in ('1', 'true'):
+        job_id = job_queue.enqueue('screen_resume',
+                                   {'file_name': resume_file.filename, 'job_description': job_description},
+                                   resume_file.read())
+        job_workers.notify()
+        app.logger.info(f"Queued resume screening job {job_id} for {resume_file.filename}")
+        return jsonify({'job_id': job_id, 'status': 'queued',
+                        'status_url': url_for('job_status', job_id=job_id)}), 202
 
     try:
         # Process the resume
@@ -71,6 +203,112 @@ def screen_resume():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/screen-resume/stream', methods=['POST'])
+def screen_resume_stream():
+    """API endpoint screening one resume, streaming the analysis fields as Server-Sent Events"""
+    resume_file, job_description, error = resume_upload()
+    if error:
+        return error
+
+    file_name = resume_file.filename
+    file_data = resume_file.read()
+    app.logger.info(f"Streaming resume screening for {file_name}")
+
+    def events():
+        # Extraction runs inside the stream, after the "start" event has gone out
+        resume_text = resume_processor.extract_text(FileStorage(stream=io.BytesIO(file_data), filename=file_name))
+        yield from resume_processor.stream_text_analysis(resume_text, file_name, job_description)
+
+    return sse_stream(events)
+
+
+@app.route('/api/screen-resumes', methods=['POST'])
+def screen_resumes():
+    """API endpoint to screen a batch of resumes (files or zip archives) against one job description"""
+    uploads = [f for f in request.files.getlist('resumes') if f.filename]
+    job_description = request.form.get('job_description', '')
+
+    if not uploads:
+        return jsonify({'error': 'No resume files provided'}), 400
+
+    if not job_description:
+        return jsonify({'error': 'Job description is required'}), 400
+
+    try:
+        app.logger.info(f"Processing resume batch with {len(uploads)} uploaded files")
+        results = batch_screener.screen(uploads, job_description)
+        if results and 'error' in results:
+            app.logger.error(f"Batch screening returned error: {results['error']}")
+            return jsonify(results), 400
+        return jsonify(results)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Batch screening error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """API endpoint returning the status, and once finished the result, of a queued job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/candidates', methods=['GET'])
+def search_candidates():
+    """API endpoint searching past screenings by skill, score range, job and resume text"""
+    if resume_processor.candidate_store is None:
+        return jsonify({'error': 'Candidate store is disabled'}), 404
+
+    try:
+        min_score = request.args.get('min_score', type=float)
+        max_score = request.args.get('max_score', type=float)
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        offset = request.args.get('offset', 0, type=int)
+        # Skills may be repeated (?skill=AWS&skill=Docker) or comma-separated
+        skills = [skill.strip() for value in request.args.getlist('skill') for skill in value.split(',')
+                  if skill.strip()]
+        candidates = resume_processor.candidate_store.search(
+            skills=skills, min_score=min_score, max_score=max_score, jd_hash=request.args.get('job'),
+            job_title=request.args.get('job_title'), text=request.args.get('q'), limit=limit, offset=offset)
+        return jsonify({'candidates': candidates, 'count': len(candidates), 'limit': limit, 'offset': offset})
+    except sqlite3.OperationalError as e:
+        # Usually a malformed full-text query in q
+        return jsonify({'error': f'Invalid search: {e}'}), 400
+
+
+@app.route('/api/candidates/<int:candidate_id>', methods=['GET'])
+def get_candidate(candidate_id):
+    """API endpoint returning one past screening with its full analysis and extracted text"""
+    if resume_processor.candidate_store is None:
+        return jsonify({'error': 'Candidate store is disabled'}), 404
+    candidate = resume_processor.candidate_store.get(candidate_id)
+    if candidate is None:
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify(candidate)
+
+
+@app.route('/api/candidates/<int:candidate_id>', methods=['DELETE'])
+def delete_candidate(candidate_id):
+    """API endpoint deleting one past screening with its extracted text"""
+    if resume_processor.candidate_store is None:
+        return jsonify({'error': 'Candidate store is disabled'}), 404
+    if not resume_processor.candidate_store.delete(candidate_id):
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify({'deleted': candidate_id})
+
+
+@app.route('/api/candidates/jobs', methods=['GET'])
+def candidate_jobs():
+    """API endpoint listing the job descriptions candidates were screened against"""
+    if resume_processor.candidate_store is None:
+        return jsonify({'error': 'Candidate store is disabled'}), 404
+    return jsonify({'jobs': resume_processor.candidate_store.jobs()})
+
+
 @app.route('/api/analyze-sentiment', methods=['POST'])
 def analyze_sentiment():
     """API endpoint to analyze employee feedback and sentiment"""
@@ -96,6 +334,71 @@ def analyze_sentiment():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/analyze-sentiment/stream', methods=['POST'])
+def analyze_sentiment_stream():
+    """API endpoint to analyze employee feedback, streaming the analysis fields as Server-Sent Events"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+
+    feedback = data.get('feedback', '')
+    if not feedback:
+        return jsonify({'error': 'Employee feedback is required'}), 400
+
+    app.logger.info("Streaming sentiment analysis request")
+    return sse_stream(lambda: sentiment_analyzer.analyze_stream(feedback))
+
+
+@app.route('/api/analyze-sentiment/bulk', methods=['POST'])
+def analyze_sentiment_bulk():
+    """API endpoint to analyze many feedback texts (JSON array, NDJSON or CSV), streaming NDJSON results"""
+    upload = request.files.get('file')
+    try:
+        if upload and upload.filename:
+            items = parse_feedback_items(upload.read(), upload.mimetype, upload.filename,
+                                         Config.BULK_FEEDBACK_MAX_ITEMS)
+        else:
+            items = parse_feedback_items(request.get_data(), request.content_type,
+                                         max_items=Config.BULK_FEEDBACK_MAX_ITEMS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not items:
+        return jsonify({'error': 'Employee feedback is required'}), 400
+
+    app.logger.info(f"Processing bulk sentiment analysis request with {len(items)} items")
+
+    # mode=local skips Gemini and returns only the local NLTK sentiment and keywords
+    local_only = request.args.get('mode', '') == 'local'
+
+    def generate():
+        results = sentiment_analyzer.analyze_bulk_local(items) if local_only else sentiment_analyzer.analyze_bulk(items)
+        for result in results:
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """API endpoint exposing cache counters and sentiment routing metrics"""
+    extraction_cache = resume_processor.text_cache.stats() if resume_processor.text_cache else None
+    llm_cache = {
+        'resume': resume_processor.gemini_api.response_cache.stats()
+        if resume_processor.gemini_api.response_cache else None,
+        'sentiment': sentiment_analyzer.gemini_api.response_cache.stats()
+        if sentiment_analyzer.gemini_api.response_cache else None
+    }
+    sentiment_routing = {
+        'mode': Config.SENTIMENT_ROUTING,
+        'routes': ROUTE_COUNTER.snapshot(),
+        'latency': ROUTE_LATENCY.snapshot()
+    }
+    return jsonify({'extraction_cache': extraction_cache, 'llm_cache': llm_cache,
+                    'sentiment_routing': sentiment_routing, 'resume_prompt_tokens': PROMPT_TOKENS.snapshot(),
+                    'llm_json_parse': PARSE_COUNTER.snapshot()})
+
+
 if __name__ == '__main__':
     # Ensure the static folders exist
     for folder in ['uploads', 'results']:
@@ -0,0 +1,266 @@
+"""
+ASGI entry point serving the Flask app with native async resume screening and sentiment analysis.
+
+POST /api/screen-resume and POST /api/analyze-sentiment are answered by
+coroutines: the Gemini call is awaited on the background Gemini loop instead
+of holding a thread, and extraction and OCR run on a thread pool. They run
+inside Flask's request context and hooks, so validation, tracing, metrics and
+responses are the same as in app.py. Every other route (pages, streaming,
+batch, jobs, stats) is served by the Flask app itself on a thread pool.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 [--workers 2]
+"""
+import io
+import sys
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import app as web
+from config import Config
+
+flask_app = web.app
+
+# Returned by read_body when the client went away before sending the whole body
+DISCONNECTED = object()
+
+# Extraction, OCR hand-off and the candidate store write for the native routes
+extract_executor = ThreadPoolExecutor(max_workers=Config.ASGI_EXTRACT_WORKERS, thread_name_prefix="asgi-extract")
+
+
+def in_executor(func, *args):
+    """Run a blocking call on the extraction pool, keeping the request context and trace"""
+    return asyncio.get_running_loop().run_in_executor(extract_executor, contextvars.copy_context().run, func, *args)
+
+
+async def screen_resume():
+    """Async counterpart of app.screen_resume"""
+    # Parsing the multipart form reads and spools the whole upload, so it stays off the event loop
+    resume_file, job_description, error = await in_executor(web.resume_upload)
+    if error:
+        return error
+
+    # Queued screenings only enqueue a job, which the Flask view already does
+    if request.form.get('async', request.args.get('async', '')).lower() in ('1', 'true'):
+        return await in_executor(web.screen_resume)
+
+    try:
+        flask_app.logger.info(f"Processing resume: {resume_file.filename}")
+        results = await web.resume_processor.process_async(resume_file, job_description, extract_executor)
+        if results and 'error' in results:
+            flask_app.logger.error(f"Resume processing returned error: {results['error']}")
+            return jsonify(results), 500
+        return jsonify(results)
+    except Exception as e:
+        flask_app.logger.error(f"Resume processing error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+async def analyze_sentiment():
+    """Async counterpart of app.analyze_sentiment"""
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+
+    feedback = data.get('feedback', '')
+
+    if not feedback:
+        return jsonify({'error': 'Employee feedback is required'}), 400
+
+    try:
+        flask_app.logger.info("Processing sentiment analysis request")
+        results = await web.sentiment_analyzer.analyze_async(feedback)
+        if results and 'error' in results:
+            flask_app.logger.error(f"Sentiment analysis returned error: {results['error']}")
+            return jsonify(results), 500
+        return jsonify(results)
+    except Exception as e:
+        flask_app.logger.error(f"Sentiment analysis error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+NATIVE_ROUTES = {
+    ('POST', '/api/screen-resume'): screen_resume,
+    ('POST', '/api/analyze-sentiment'): analyze_sentiment,
+}
+
+
+async def dispatch(view, environ):
+    """
+    Run an async view the way Flask runs a sync one (before/after request hooks, error handlers, teardown)
+
+    Returns:
+        flask.Response: Fully buffered response
+    """
+    with flask_app.request_context(environ):
+        try:
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None:
+                    rv = await view()
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+            return flask_app.finalize_request(rv)
+        except Exception as e:
+            return flask_app.handle_exception(e)
+
+
+class WSGIBridge:
+    """
+    Serve a WSGI app from ASGI with one pool thread per request
+
+    Generic adapters such as asgiref's WsgiToAsgi run every WSGI call on one
+    shared thread, which would serialize the delegated routes and let one open
+    event stream block the rest. Response chunks are sent as the app yields them.
+    """
+
+    def __init__(self, wsgi_app, max_workers):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi-wsgi")
+
+    async def __call__(self, environ, send):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._run, environ, send, loop)
+
+    def _run(self, environ, send, loop):
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start.update(type='http.response.start', status=int(status.split(' ', 1)[0]),
+                                  headers=[(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                           for name, value in headers])
+
+        body = self.wsgi_app(environ, start_response)
+        started = False
+        try:
+            for chunk in body:
+                if not started:
+                    send_sync(response_start)
+                    started = True
+                if chunk:
+                    send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                send_sync(response_start)
+            send_sync({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+
+wsgi_bridge = WSGIBridge(flask_app.wsgi_app, Config.ASGI_WSGI_THREADS)
+
+
+def build_environ(scope, body):
+    """
+    Translate an ASGI HTTP scope and its buffered body into a WSGI environ
+
+    Args:
+        scope (dict): ASGI HTTP connection scope
+        body (bytes): Request body
+
+    Returns:
+        dict: WSGI environ
+    """
+    script_name = scope.get('root_path', '')
+    path = scope['path']
+    if script_name and path.startswith(script_name):
+        path = path[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ[name] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            # Repeated headers are folded into one comma-separated value
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def read_body(receive, limit):
+    """
+    Returns:
+        bytes: Request body, None if it is larger than limit, or DISCONNECTED if the client disconnected
+    """
+    body = io.BytesIO()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return DISCONNECTED
+        body.write(message.get('body', b''))
+        if body.tell() > limit:
+            return None
+        if not message.get('more_body'):
+            return body.getvalue()
+
+
+async def send_response(send, response):
+    await send({'type': 'http.response.start', 'status': response.status_code,
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                            for name, value in response.headers.to_wsgi_list()]})
+    await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            extract_executor.shutdown(wait=False)
+            wsgi_bridge.executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    # Bodies are buffered like the WSGI servers do; anything over the upload limit is refused up front
+    body = await read_body(receive, Config.MAX_CONTENT_LENGTH + 64 * 1024)
+    if body is DISCONNECTED:
+        # Nobody is left to answer, and a half-received upload must not be screened
+        return
+    environ = build_environ(scope, body or b'')
+    if body is None:
+        await send_response(send, RequestEntityTooLarge().get_response(environ))
+        return
+
+    view = NATIVE_ROUTES.get((environ['REQUEST_METHOD'], environ['PATH_INFO']))
+    if view is None:
+        await wsgi_bridge(environ, send)
+    else:
+        await send_response(send, await dispatch(view, environ))
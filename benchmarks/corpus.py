@@ -0,0 +1,153 @@
+# benchmarks/corpus.py
+"""
+Synthetic, reproducible inputs for the benchmarks: resumes as TXT, DOCX,
+digital PDF and scanned (image-only) PDF, job descriptions, and employee
+feedback of varying length. Everything is generated in memory from a seed.
+"""
+import io
+import random
+
+import docx
+import fitz
+from PIL import Image
+
+from sentiment_benchmark import PHRASES
+
+FIRST_NAMES = ["Alex", "Priya", "Jordan", "Wei", "Maria", "Samuel", "Aisha", "Lukas", "Chen", "Fatima"]
+LAST_NAMES = ["Kim", "Sharma", "Garcia", "Okafor", "Novak", "Tanaka", "Smith", "Haddad", "Rossi", "Brown"]
+SKILLS = ["Python", "Java", "JavaScript", "SQL", "AWS", "Docker", "Kubernetes", "React", "Flask", "Django",
+          "Machine Learning", "Pandas", "Terraform", "Git", "REST APIs", "PostgreSQL", "Linux", "CI/CD"]
+TITLES = ["Software Engineer", "Data Analyst", "Backend Developer", "DevOps Engineer", "Data Scientist"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech"]
+ACHIEVEMENTS = [
+    "Built and maintained services handling {n} requests per day",
+    "Reduced deployment time by {n}% by automating the release pipeline",
+    "Led a team of {n} engineers delivering a customer analytics platform",
+    "Migrated {n} legacy jobs to containerized workloads",
+    "Designed data models and reporting used by {n} internal teams",
+    "Improved query performance by {n}% through indexing and caching",
+]
+FORMATS = ("txt", "docx", "pdf", "scanned_pdf")
+
+
+def make_resume_text(rng, jobs=None):
+    """Plain-text resume with the usual sections; jobs controls its length"""
+    jobs = jobs if jobs is not None else rng.randint(1, 5)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(1000000, 9999999)}", "",
+             "Summary",
+             f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience building reliable software.", "",
+             "Skills", ", ".join(rng.sample(SKILLS, rng.randint(4, 10))), "", "Experience"]
+    for _ in range(jobs):
+        start = rng.randint(2005, 2020)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {start + rng.randint(1, 4)})")
+        for achievement in rng.sample(ACHIEVEMENTS, 3):
+            lines.append("- " + achievement.format(n=rng.randint(3, 90)))
+    lines += ["", "Education", f"B.Sc. Computer Science, State University ({rng.randint(2000, 2018)})"]
+    return "\n".join(lines)
+
+
+def make_job_description(rng):
+    skills = rng.sample(SKILLS, 6)
+    return "\n".join([
+        f"Job Title: Senior {rng.choice(TITLES)}",
+        "",
+        "Requirements:",
+        f"- {rng.randint(3, 7)}+ years of experience in software development",
+        f"- Strong experience with {skills[0]}, {skills[1]} and {skills[2]}",
+        f"- Experience with {skills[3]} and {skills[4]}",
+        "- Bachelor's degree in Computer Science or a related field",
+        "",
+        "Nice to have:",
+        f"- {skills[5]}",
+    ])
+
+
+def to_txt(text):
+    return text.encode("utf-8")
+
+
+def to_docx(text):
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def to_pdf(text, lines_per_page=45):
+    document = fitz.open()
+    lines = text.splitlines()
+    for start in range(0, len(lines), lines_per_page):
+        page = document.new_page()
+        page.insert_text((50, 60), "\n".join(lines[start:start + lines_per_page]), fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def to_scanned_pdf(text, dpi=150, skew=0.0):
+    """PDF whose pages are only images of the text, as produced by a scanner (skew in degrees, counter-clockwise)"""
+    digital = fitz.open(stream=to_pdf(text), filetype="pdf")
+    scanned = fitz.open()
+    for page in digital:
+        pixmap = page.get_pixmap(dpi=dpi)
+        if skew:
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+            buffer = io.BytesIO()
+            image.rotate(skew, resample=Image.BICUBIC, fillcolor="white").save(buffer, format="PNG")
+            scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(
+                page.rect, stream=buffer.getvalue())
+        else:
+            scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pixmap)
+    data = scanned.tobytes(deflate=True)
+    digital.close()
+    scanned.close()
+    return data
+
+
+CONVERTERS = {"txt": (".txt", to_txt), "docx": (".docx", to_docx), "pdf": (".pdf", to_pdf),
+              "scanned_pdf": (".pdf", to_scanned_pdf)}
+
+
+def make_resumes(count, formats=FORMATS, seed=7):
+    """
+    Returns:
+        list: (format, file name, file bytes) tuples, count per format
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for fmt in formats:
+        extension, convert = CONVERTERS[fmt]
+        for i in range(count):
+            corpus.append((fmt, f"resume_{fmt}_{i}{extension}", convert(make_resume_text(rng))))
+    return corpus
+
+
+def make_scans(count, seed=5):
+    """
+    Scanned resumes at mixed resolutions and skews, with their ground-truth text
+
+    Returns:
+        list: (file name, PDF bytes, text) tuples
+    """
+    rng = random.Random(seed)
+    scans = []
+    for i in range(count):
+        text = make_resume_text(rng)
+        dpi = rng.choice((150, 200, 300))
+        skew = rng.choice((0.0, 0.0, 1.5, -2.5, 4.0))
+        scans.append((f"scan_{i}_{dpi}dpi_{skew:+.1f}deg.pdf", to_scanned_pdf(text, dpi=dpi, skew=skew), text))
+    return scans
+
+
+def make_feedback(count, seed=11):
+    """Feedback texts spread over short (1-2), medium (3-8) and long (20-40 sentence) answers"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        low, high = ((1, 2), (3, 8), (20, 40))[i % 3]
+        sentences = [rng.choice(PHRASES) for _ in range(rng.randint(low, high))]
+        texts.append(". ".join(s.capitalize() for s in sentences) + ".")
+    return texts
@@ -0,0 +1,134 @@
+# benchmarks/ocr_benchmark.py
+"""
+Measure OCR image preprocessing: pixels handed to EasyOCR, per-page latency
+and accuracy with and without it.
+
+Runs on a generated sample set of scanned resumes (corpus.make_scans) rendered
+at 150-300 DPI with up to 4 degrees of skew. Every page is rendered the way
+ResumeProcessor renders it, then OCR'd as is ("raw") and after
+ocr_preprocess.preprocess ("preprocessed"). Accuracy is the share of words in
+the source text that the OCR output contains. Without easyocr installed only
+the preprocessing cost and pixel reduction are reported.
+
+Exits with status 1 if preprocessing lowers accuracy by more than --tolerance.
+
+Usage:
+    python benchmarks/ocr_benchmark.py [--documents 6] [--tolerance 0.01]
+"""
+import os
+import re
+import sys
+import argparse
+import tempfile
+import statistics
+import importlib.util
+from collections import Counter
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Measure uncached OCR, and build ResumeProcessor without a Gemini key
+WORKDIR = tempfile.mkdtemp(prefix="engagebot-ocr-bench-")
+os.environ.update({
+    "CACHE_FOLDER": os.path.join(WORKDIR, "cache"),
+    "DATA_FOLDER": os.path.join(WORKDIR, "data"),
+    "EXTRACTION_CACHE_ENABLED": "false",
+    "OCR_PAGE_CACHE_ENABLED": "false",
+    "GEMINI_BACKEND": "standin",
+})
+
+import corpus  # noqa: E402
+from utils import ocr_engine, ocr_preprocess  # noqa: E402
+from utils.resume_processor import ResumeProcessor  # noqa: E402
+
+
+def words(text):
+    return Counter(word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 1)
+
+
+def word_recall(expected, actual):
+    """Share of the expected words (with multiplicity) found in the actual text"""
+    expected, actual = words(expected), words(actual)
+    total = sum(expected.values())
+    return sum((expected & actual).values()) / total if total else 1.0
+
+
+def load_pages(documents):
+    """
+    Returns:
+        list: (file name, source text, [page images]) per scanned document
+    """
+    processor = ResumeProcessor()
+    return [(name, text, list(processor.iter_pdf_page_images(data)))
+            for name, data, text in corpus.make_scans(documents)]
+
+
+def run(samples, preprocess, ocr):
+    """
+    OCR every page, optionally preprocessed
+
+    Returns:
+        dict: pages, mean megapixels sent to OCR, mean preprocess/OCR milliseconds per page, median OCR ms, recall
+    """
+    pixels, prep_times, ocr_times, recalls = [], [], [], []
+    for _, text, images in samples:
+        page_texts = []
+        for image in images:
+            if preprocess:
+                start = perf_counter()
+                image = ocr_preprocess.preprocess(image)
+                prep_times.append(perf_counter() - start)
+            pixels.append(image.shape[0] * image.shape[1])
+            if ocr:
+                start = perf_counter()
+                page_texts.append(ocr_engine.readtext(image))
+                ocr_times.append(perf_counter() - start)
+        if ocr:
+            recalls.append(word_recall(text, " ".join(page_texts)))
+
+    return {
+        "pages": len(pixels),
+        "megapixels": statistics.mean(pixels) / 1e6,
+        "preprocess_ms": statistics.mean(prep_times) * 1000 if prep_times else 0.0,
+        "ocr_ms": statistics.mean(ocr_times) * 1000 if ocr_times else None,
+        "ocr_p50_ms": statistics.median(ocr_times) * 1000 if ocr_times else None,
+        "recall": statistics.mean(recalls) if recalls else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=6, help="Scanned resumes in the sample set")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed drop in word recall")
+    args = parser.parse_args()
+
+    ocr = importlib.util.find_spec("easyocr") is not None
+    if ocr:
+        # Load the models before timing anything
+        ocr_engine.warm_up()
+    else:
+        print("easyocr is not installed; reporting preprocessing only")
+
+    samples = load_pages(args.documents)
+    results = {"raw": run(samples, False, ocr), "preprocessed": run(samples, True, ocr)}
+
+    print(f"{'mode':14} {'pages':>6} {'Mpx/page':>9} {'prep ms':>8} {'ocr ms':>8} {'ocr p50':>8} {'recall':>7}")
+    for mode, stats in results.items():
+        ocr_columns = (f"{stats['ocr_ms']:8.0f} {stats['ocr_p50_ms']:8.0f} {stats['recall']:7.3f}"
+                       if ocr else f"{'-':>8} {'-':>8} {'-':>7}")
+        print(f"{mode:14} {stats['pages']:6d} {stats['megapixels']:9.2f} {stats['preprocess_ms']:8.1f} "
+              f"{ocr_columns}")
+
+    raw, preprocessed = results["raw"], results["preprocessed"]
+    print(f"Pixels per page reduced by {1 - preprocessed['megapixels'] / raw['megapixels']:.0%}")
+    if ocr:
+        speedup = raw["ocr_ms"] / (preprocessed["ocr_ms"] + preprocessed["preprocess_ms"])
+        print(f"OCR latency per page {speedup:.2f}x faster including preprocessing")
+        if preprocessed["recall"] < raw["recall"] - args.tolerance:
+            print(f"REGRESSION recall {preprocessed['recall']:.3f} vs {raw['recall']:.3f} without preprocessing")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
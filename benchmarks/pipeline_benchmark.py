@@ -0,0 +1,263 @@
+# benchmarks/pipeline_benchmark.py
+"""
+Offline end-to-end benchmark of the screening and sentiment pipelines.
+
+Runs against a synthetic corpus and the local Gemini stand-in backend
+(GEMINI_BACKEND=standin) with configurable latency, error and malformed-reply
+rates, so no API key, quota or network is needed. Cases:
+
+    extract.txt, extract.docx, extract.pdf   ResumeProcessor.extract_text per format
+    ocr.scanned_pdf                          extract_text on image-only PDFs (skipped without easyocr)
+    parse.safe_json                          GeminiAPI._safe_json_parse on clean, fenced and truncated replies
+    sentiment.analyze                        SentimentAnalyzer.analyze on short, medium and long feedback
+    http.screen_resume                       POST /api/screen-resume with --concurrency parallel clients
+    http.analyze_sentiment                   POST /api/analyze-sentiment with --concurrency parallel clients
+
+Each case reports throughput and p50/p95/p99 latency. --save-baseline stores
+the results as JSON; --baseline compares a run against them and exits with
+status 1 if any case's p95 latency or throughput is worse by more than
+--tolerance. Baselines are machine-specific, so record one per environment.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py [--iterations 40] [--concurrency 8] [--latency 0.2]
+        [--error-rate 0.05] [--malformed-rate 0.1]
+        [--cases extract,parse] [--save-baseline benchmarks/baseline.json]
+        [--baseline benchmarks/baseline.json --tolerance 0.25]
+"""
+import io
+import os
+import sys
+import json
+import math
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Isolate caches and stores, measure uncached work, and never wait on the Gemini rate limiter
+WORKDIR = tempfile.mkdtemp(prefix="engagebot-bench-")
+os.environ.update({
+    "CACHE_FOLDER": os.path.join(WORKDIR, "cache"),
+    "DATA_FOLDER": os.path.join(WORKDIR, "data"),
+    "EXTRACTION_CACHE_ENABLED": "false",
+    "LLM_CACHE_ENABLED": "false",
+    "GEMINI_RPM_LIMIT": "0",
+    "GEMINI_TPM_LIMIT": "0",
+    "GEMINI_BACKEND": "standin",
+})
+# Per-request log lines would dominate the timings; configure logging before the app modules do
+logging.basicConfig(level=logging.ERROR)
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+import corpus  # noqa: E402
+from config import Config  # noqa: E402
+
+CASES = ("extract", "ocr", "parse", "sentiment", "http")
+
+
+class FileUpload:
+    """Minimal stand-in for werkzeug's FileStorage"""
+
+    def __init__(self, data, filename):
+        self.stream = io.BytesIO(data)
+        self.filename = filename
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(func, inputs, iterations, concurrency=1):
+    """
+    Call func on inputs (cycled) iterations times after one warm-up call
+
+    Calls that raise (e.g. an HTTP 500 from an injected fault) still count
+    towards the latencies and are reported as errors.
+
+    Returns:
+        dict: count, errors, throughput (calls/s) and mean/p50/p95/p99 latency in milliseconds
+    """
+    errors = []
+    try:
+        func(inputs[0])
+    except Exception:
+        pass
+
+    def timed_call(i):
+        start = perf_counter()
+        try:
+            func(inputs[i % len(inputs)])
+        except Exception as e:
+            errors.append(e)
+        return perf_counter() - start
+
+    start = perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(timed_call, range(iterations)))
+    else:
+        latencies = [timed_call(i) for i in range(iterations)]
+    wall = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "count": iterations,
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "throughput": round(iterations / wall, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def bench_extract(args, results):
+    from utils.resume_processor import ResumeProcessor
+    processor = ResumeProcessor()
+    for fmt in ("txt", "docx", "pdf"):
+        files = corpus.make_resumes(args.corpus_size, formats=(fmt,))
+        results[f"extract.{fmt}"] = measure(
+            lambda item: processor.extract_text(FileUpload(item[2], item[1])), files, args.iterations)
+
+
+def bench_ocr(args, results):
+    if importlib.util.find_spec("easyocr") is None:
+        print("ocr.scanned_pdf: skipped (easyocr is not installed)")
+        return
+    from utils.resume_processor import ResumeProcessor
+    processor = ResumeProcessor()
+    files = corpus.make_resumes(max(1, args.corpus_size // 4), formats=("scanned_pdf",))
+    # OCR is slow; a handful of documents gives stable percentiles
+    results["ocr.scanned_pdf"] = measure(
+        lambda item: processor.extract_text(FileUpload(item[2], item[1])), files, max(3, args.iterations // 10))
+
+
+def bench_parse(args, results):
+    from utils.gemini_api import GeminiAPI
+    from utils.model_backends import StandInModel
+    model = StandInModel(latency=0)
+    api = GeminiAPI(model=model)
+    feedback = corpus.make_feedback(15)
+    replies = []
+    for i in range(30):
+        reply = model.reply(f"Employee Feedback: {feedback[i // 2]}" if i % 2 else f"Resume {i}")
+        replies += [reply, f"```json\n{reply}\n```", "Here is the analysis: " + reply[:int(len(reply) * 0.8)]]
+    results["parse.safe_json"] = measure(api._safe_json_parse, replies, args.iterations * 20)
+
+
+def bench_sentiment(args, results):
+    from utils.sentiment_analyzer import SentimentAnalyzer
+    analyzer = SentimentAnalyzer()
+    results["sentiment.analyze"] = measure(analyzer.analyze, corpus.make_feedback(60), args.iterations)
+
+
+def bench_http(args, results):
+    import requests
+    from werkzeug.serving import make_server
+    import app as web
+    web.app.logger.setLevel(logging.ERROR)
+
+    server = make_server("127.0.0.1", 0, web.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    rng = random.Random(1)
+    job_descriptions = [corpus.make_job_description(rng) for _ in range(5)]
+    files = corpus.make_resumes(args.corpus_size, formats=("txt", "docx", "pdf"))
+
+    def screen(item):
+        response = requests.post(f"{base_url}/api/screen-resume",
+                                 data={"job_description": rng.choice(job_descriptions)},
+                                 files={"resume": (item[1], item[2])})
+        response.raise_for_status()
+
+    def analyze(text):
+        requests.post(f"{base_url}/api/analyze-sentiment", json={"feedback": text}).raise_for_status()
+
+    try:
+        results["http.screen_resume"] = measure(screen, files, args.iterations, args.concurrency)
+        results["http.analyze_sentiment"] = measure(analyze, corpus.make_feedback(60), args.iterations,
+                                                    args.concurrency)
+    finally:
+        server.shutdown()
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns:
+        list: Human-readable regressions (p95 slower or throughput lower than the baseline allows)
+    """
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{case}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{case}: throughput {current['throughput']}/s vs baseline {previous['throughput']}/s")
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{case}: {current['errors']} errors vs baseline {previous.get('errors', 0)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Comma-separated subset of {', '.join(CASES)}")
+    parser.add_argument("--iterations", type=int, default=40, help="Timed calls per case")
+    parser.add_argument("--corpus-size", type=int, default=8, help="Documents generated per format")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel clients for the HTTP cases")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median stand-in Gemini latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stand-in calls failing with 429/503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of stand-in replies with broken JSON")
+    parser.add_argument("--baseline", help="Compare against this saved run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown vs the baseline")
+    parser.add_argument("--save-baseline", help="Write this run's results to the given path")
+    args = parser.parse_args()
+
+    selected = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(selected) - set(CASES)
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    Config.STANDIN_LATENCY_SECONDS = args.latency
+    Config.STANDIN_ERROR_RATE = args.error_rate
+    Config.STANDIN_MALFORMED_RATE = args.malformed_rate
+
+    results = {}
+    for case in selected:
+        globals()[f"bench_{case}"](args, results)
+
+    print(f"{'case':24} {'ops/s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for case, stats in results.items():
+        print(f"{case:24} {stats['throughput']:9.1f} {stats['mean_ms']:9.2f} {stats['p50_ms']:9.2f} "
+              f"{stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f} {stats['errors']:7d}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
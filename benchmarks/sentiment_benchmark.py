@@ -0,0 +1,74 @@
+# benchmarks/sentiment_benchmark.py
+"""
+Compare local sentiment scoring throughput: per-call analyze() fields vs the bulk pass.
+
+Both paths produce the nltk_sentiment and keywords fields; the benchmark also
+checks that they agree for every text.
+
+Usage:
+    python benchmarks/sentiment_benchmark.py [--texts 20000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The analyzer builds a Gemini client on init; no request is sent in this benchmark
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder-key")
+
+from utils.sentiment_analyzer import SentimentAnalyzer  # noqa: E402
+
+PHRASES = [
+    "I really enjoy working with my team", "the workload has been overwhelming lately",
+    "my manager is supportive and gives clear feedback", "pay is below market and raises are rare",
+    "there are not enough growth opportunities", "the new hybrid policy is great",
+    "communication between departments is poor", "onboarding was smooth and well organized",
+    "I feel burned out but the culture is good", "benefits are excellent",
+    "meetings take up too much time", "leadership never explains decisions",
+]
+
+
+def make_feedback(count, seed=42):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        sentences = [rng.choice(PHRASES) for _ in range(rng.randint(1, 4))]
+        texts.append(". ".join(s.capitalize() for s in sentences) + rng.choice([".", "!", "", "?"]))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--unique", action="store_true", help="Make every text unique (no duplicate answers)")
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    texts = make_feedback(args.texts)
+    if args.unique:
+        texts = [f"{text} (response {i})" for i, text in enumerate(texts)]
+
+    start = time.perf_counter()
+    per_call = [{"nltk_sentiment": analyzer.nltk_sia.polarity_scores(text)["compound"],
+                 "keywords": analyzer._extract_keywords(text)} for text in texts]
+    per_call_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = analyzer.prescore_bulk(texts)
+    bulk_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(per_call, bulk) if a != b)
+    print(f"texts:     {len(texts)}")
+    print(f"per-call:  {len(texts) / per_call_seconds:10.0f} texts/s  ({per_call_seconds:.2f}s)")
+    print(f"bulk:      {len(texts) / bulk_seconds:10.0f} texts/s  ({bulk_seconds:.2f}s)")
+    print(f"speedup:   {per_call_seconds / bulk_seconds:10.1f}x")
+    print(f"mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
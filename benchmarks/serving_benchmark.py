@@ -0,0 +1,184 @@
+# benchmarks/serving_benchmark.py
+"""
+Compare the concurrent-request capacity of the gunicorn sync setup and the ASGI app.
+
+Both servers run the real app with the same number of worker processes, against
+the Gemini stand-in backend with a fixed model latency (--latency), so requests
+spend most of their time waiting on the model as they do in production. At each
+concurrency level, that many clients send requests back to back for --duration
+seconds. The report shows throughput, p50/p95 latency and errors per level, and
+each server's capacity: the highest level whose p95 stays within --slo times
+the model latency.
+
+Usage:
+    python benchmarks/serving_benchmark.py [--workers 2] [--levels 1,8,32,64] [--latency 0.5]
+        [--endpoint sentiment|screen] [--duration 10] [--slo 3]
+"""
+import os
+import sys
+import time
+import math
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus  # noqa: E402
+
+SERVERS = {
+    "gunicorn-sync": lambda port, workers: [sys.executable, "-m", "gunicorn", "-w", str(workers),
+                                            "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+    "asgi": lambda port, workers: [sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(workers),
+                                   "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(fraction * len(sorted_values))) - 1]
+
+
+def start_server(name, port, args, workdir):
+    env = dict(os.environ,
+               GEMINI_BACKEND="standin",
+               STANDIN_LATENCY_SECONDS=str(args.latency),
+               STANDIN_LATENCY_DISTRIBUTION="fixed",
+               CACHE_FOLDER=os.path.join(workdir, name, "cache"),
+               DATA_FOLDER=os.path.join(workdir, name, "data"),
+               # Every request should reach the model, and never wait on the client-side rate limiter
+               LLM_CACHE_ENABLED="false",
+               EXTRACTION_CACHE_ENABLED="false",
+               GEMINI_RPM_LIMIT="0",
+               GEMINI_TPM_LIMIT="0",
+               PYTHONUNBUFFERED="1")
+    process = subprocess.Popen(SERVERS[name](port, args.workers), cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with status {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"{name} did not start within 120s")
+
+
+def make_request(args):
+    """Return a function sending one request of the chosen kind with a session"""
+    rng = random.Random(3)
+    if args.endpoint == "screen":
+        resumes = corpus.make_resumes(8, formats=("txt",))
+        job_descriptions = [corpus.make_job_description(rng) for _ in range(5)]
+
+        def send(session, base_url, i):
+            _, file_name, data = resumes[i % len(resumes)]
+            return session.post(f"{base_url}/api/screen-resume",
+                                data={"job_description": job_descriptions[i % len(job_descriptions)]},
+                                files={"resume": (file_name, data)}, timeout=300)
+        return send
+
+    feedback = corpus.make_feedback(30)
+
+    def send(session, base_url, i):
+        return session.post(f"{base_url}/api/analyze-sentiment", json={"feedback": feedback[i % len(feedback)]},
+                            timeout=300)
+    return send
+
+
+def load(base_url, send, concurrency, duration):
+    """
+    Keep concurrency requests in flight for duration seconds
+
+    Returns:
+        dict: requests, errors, throughput and p50/p95 latency in milliseconds
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(index):
+        session = requests.Session()
+        i = index
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = send(session, base_url, i).ok
+            except requests.RequestException:
+                ok = False
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors.append(i)
+            i += concurrency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", default=",".join(SERVERS), help=f"Comma-separated subset of {', '.join(SERVERS)}")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes per server")
+    parser.add_argument("--levels", default="1,8,32,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stand-in Gemini latency in seconds")
+    parser.add_argument("--endpoint", choices=("sentiment", "screen"), default="sentiment")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--slo", type=float, default=3, help="p95 limit as a multiple of --latency")
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    send = make_request(args)
+    workdir = tempfile.mkdtemp(prefix="engagebot-serving-bench-")
+    slo_ms = args.slo * args.latency * 1000
+
+    print(f"{'server':14} {'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    capacity = {}
+    for name in [server.strip() for server in args.servers.split(",") if server.strip()]:
+        process = start_server(name, args.port, args, workdir)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            # One warm-up request per worker so model and client setup are not timed
+            load(base_url, send, args.workers, 0.01)
+            capacity[name] = 0
+            for level in levels:
+                stats = load(base_url, send, level, args.duration)
+                print(f"{name:14} {level:8d} {stats['throughput']:8.1f} {stats['p50_ms']:9.1f} "
+                      f"{stats['p95_ms']:9.1f} {stats['errors']:7d}")
+                if stats["p95_ms"] <= slo_ms and not stats["errors"]:
+                    capacity[name] = level
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    for name, level in capacity.items():
+        print(f"{name}: {level} concurrent clients within a p95 of {slo_ms:.0f}ms "
+              f"({args.workers} workers, {args.latency}s model latency)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/startup_benchmark.py
+"""
+Measure web worker boot time and idle memory with lazy vs preloaded OCR.
+
+Each run imports app.py in a fresh interpreter, the same work a gunicorn
+worker does at boot, and reports wall time and peak RSS.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, resource, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+from utils import ocr_engine
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "ocr_loaded": ocr_engine.is_loaded()
+}))
+"""
+
+
+def measure(preload, runs):
+    env = dict(os.environ, OCR_PRELOAD="true" if preload else "false")
+    # Initialization only configures the client; no request is sent
+    env.setdefault("GEMINI_API_KEY", "benchmark-placeholder-key")
+
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Startup run failed (preload={preload}):\n{proc.stderr[-2000:]}")
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def summarize(label, samples):
+    seconds = [s["seconds"] for s in samples]
+    rss = [s["max_rss_mb"] for s in samples]
+    print(f"{label:<10} boot median {statistics.median(seconds):6.2f}s   "
+          f"peak RSS median {statistics.median(rss):8.1f} MB   "
+          f"OCR loaded: {samples[0]['ocr_loaded']}")
+    return statistics.median(seconds), statistics.median(rss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lazy_time, lazy_rss = summarize("lazy", measure(False, args.runs))
+    try:
+        eager_time, eager_rss = summarize("preload", measure(True, args.runs))
+    except RuntimeError as e:
+        print(f"Preload run unavailable: {e}")
+        return
+
+    print(f"\nLazy loading saves {eager_time - lazy_time:.2f}s boot time and "
+          f"{eager_rss - lazy_rss:.1f} MB per worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,8 +18,135 @@ class Config:
     GEMINI_MAX_TOKENS = 1024  # Free tier often limits this
     GEMINI_TEMPERATURE = 0.7  # Controls randomness
     GEMINI_TOP_P = 1.0        # Sampling parameter
+    GEMINI_BATCH_MAX_TOKENS = int(os.getenv("GEMINI_BATCH_MAX_TOKENS", 8192))  # Output budget for batched prompts
+    # Ask for schema-constrained JSON when the installed google-generativeai supports it
+    GEMINI_JSON_MODE = os.getenv("GEMINI_JSON_MODE", "true").lower() == "true"
+    GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", 60))  # Per attempt
+    GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", 180))  # Whole call, including retries
+    GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 4))
+    GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", 1.0))  # Seconds; doubles on every retry
+    GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", 30.0))
+    GEMINI_RPM_LIMIT = int(os.getenv("GEMINI_RPM_LIMIT", 60))  # Requests per minute per process, 0 disables
+    GEMINI_TPM_LIMIT = int(os.getenv("GEMINI_TPM_LIMIT", 1000000))  # Prompt tokens per minute per process, 0 disables
+
+    # Model backend: "gemini" calls the API; "standin" answers locally with schema-valid JSON (load tests, CI)
+    GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini").lower()
+    STANDIN_LATENCY_SECONDS = float(os.getenv("STANDIN_LATENCY_SECONDS", 0.8))  # Median delay per call
+    STANDIN_LATENCY_DISTRIBUTION = os.getenv("STANDIN_LATENCY_DISTRIBUTION", "lognormal")  # fixed, uniform, lognormal
+    STANDIN_LATENCY_SIGMA = float(os.getenv("STANDIN_LATENCY_SIGMA", 0.4))  # Log-normal sigma, or +/- share for uniform
+    STANDIN_ERROR_RATE = float(os.getenv("STANDIN_ERROR_RATE", 0.0))  # Share of calls failing with 429/503
+    STANDIN_MALFORMED_RATE = float(os.getenv("STANDIN_MALFORMED_RATE", 0.0))  # Share of replies with broken JSON
+    STANDIN_SEED = int(os.getenv("STANDIN_SEED", 0))
+
+    # Prompt compaction (approximate tokens sent to Gemini per resume screening)
+    RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", 6000))
+    JOB_DESCRIPTION_TOKEN_BUDGET = int(os.getenv("JOB_DESCRIPTION_TOKEN_BUDGET", 2000))
+    # Send a parsed job profile (skills, experience, education, key requirements) along with the job description
+    JOB_PROFILE_ENABLED = os.getenv("JOB_PROFILE_ENABLED", "true").lower() == "true"
+    JOB_PROFILE_CACHE_SIZE = int(os.getenv("JOB_PROFILE_CACHE_SIZE", 256))
+    JOB_PROFILE_MAX_REQUIREMENTS = int(os.getenv("JOB_PROFILE_MAX_REQUIREMENTS", 15))
 
     # Uploads
     UPLOAD_FOLDER = os.path.join('static', 'uploads')  # Fixed path to match app.py
     MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 16 * 1024 * 1024))  # 16MB
-    ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
+
+    # OCR
+    OCR_LANGUAGES = ['en']
+    # Load EasyOCR/Torch at startup instead of on the first scanned document
+    OCR_PRELOAD = os.getenv("OCR_PRELOAD", "false").lower() == "true"
+    # PDF pages are rendered so their longer side is about this many pixels, within the zoom limits
+    OCR_TARGET_LONG_SIDE = int(os.getenv("OCR_TARGET_LONG_SIDE", 2100))
+    OCR_MIN_ZOOM = float(os.getenv("OCR_MIN_ZOOM", 1.0))
+    OCR_MAX_ZOOM = float(os.getenv("OCR_MAX_ZOOM", 4.0))
+    # Page images are converted to grayscale, deskewed, cropped to the text and shrunk until the
+    # median glyph is OCR_TARGET_TEXT_HEIGHT pixels tall before OCR. Off until benchmarks/ocr_benchmark.py
+    # has confirmed word recall with the EasyOCR models
+    OCR_PREPROCESS_ENABLED = os.getenv("OCR_PREPROCESS_ENABLED", "false").lower() == "true"
+    OCR_TARGET_TEXT_HEIGHT = int(os.getenv("OCR_TARGET_TEXT_HEIGHT", 20))
+    OCR_MAX_DESKEW_DEGREES = float(os.getenv("OCR_MAX_DESKEW_DEGREES", 10.0))
+    OCR_CROP_MARGIN = int(os.getenv("OCR_CROP_MARGIN", 16))  # Pixels of background kept around the text
+    OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", 8))  # Text lines recognized per EasyOCR batch
+    # A PDF page is OCR'd when its text layer is shorter than this and images cover enough of it
+    OCR_PAGE_MIN_CHARS = int(os.getenv("OCR_PAGE_MIN_CHARS", 50))
+    OCR_PAGE_MIN_IMAGE_COVERAGE = float(os.getenv("OCR_PAGE_MIN_IMAGE_COVERAGE", 0.3))
+    # Shared OCR service (python -m utils.ocr_service, or started by gunicorn.conf.py)
+    OCR_SERVICE_ENABLED = os.getenv("OCR_SERVICE_ENABLED", "false").lower() == "true"
+    # The service only listens on a loopback address, or on a unix socket when OCR_SERVICE_SOCKET is set
+    OCR_SERVICE_HOST = os.getenv("OCR_SERVICE_HOST", "127.0.0.1")
+    OCR_SERVICE_PORT = int(os.getenv("OCR_SERVICE_PORT", 50055))
+    OCR_SERVICE_SOCKET = os.getenv("OCR_SERVICE_SOCKET", "")
+    # Required: clients and service refuse to start without an explicit key (the service unpickles requests)
+    OCR_SERVICE_AUTHKEY = os.getenv("OCR_SERVICE_AUTHKEY", "")
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", 2))  # Model-holding OCR processes
+    # Without the service, scanned PDF pages can be OCR'd on a local process pool of this size;
+    # 1 (default) keeps OCR in the web process, 0 picks min(4, cores // OCR_TORCH_THREADS)
+    OCR_LOCAL_WORKERS = int(os.getenv("OCR_LOCAL_WORKERS", 1))
+    OCR_TORCH_THREADS = int(os.getenv("OCR_TORCH_THREADS", 1))  # Torch intra-op threads per OCR process
+    # Cores one request may occupy, so a long scanned upload cannot starve other requests
+    OCR_MAX_CORES_PER_REQUEST = int(os.getenv("OCR_MAX_CORES_PER_REQUEST", 4))
+    # A page not OCR'd this long after it was queued on the pool or service is skipped
+    OCR_PAGE_TIMEOUT_SECONDS = float(os.getenv("OCR_PAGE_TIMEOUT_SECONDS", 120))
+
+    # Caching
+    CACHE_FOLDER = os.getenv("CACHE_FOLDER", "cache")
+    EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+    EXTRACTION_CACHE_PATH = os.path.join(CACHE_FOLDER, 'extracted_text.sqlite3')
+    EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", 256 * 1024 * 1024))  # 256MB
+    # OCR text per page image, so a page seen in another upload is not OCR'd again
+    OCR_PAGE_CACHE_ENABLED = os.getenv("OCR_PAGE_CACHE_ENABLED", "true").lower() == "true"
+    OCR_PAGE_CACHE_PATH = os.path.join(CACHE_FOLDER, 'ocr_pages.sqlite3')
+    OCR_PAGE_CACHE_MAX_BYTES = int(os.getenv("OCR_PAGE_CACHE_MAX_BYTES", 64 * 1024 * 1024))  # 64MB
+
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 60 * 60))  # 1 day
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+    LLM_CACHE_DISK_ENABLED = os.getenv("LLM_CACHE_DISK_ENABLED", "false").lower() == "true"
+    LLM_CACHE_PATH = os.path.join(CACHE_FOLDER, 'llm_responses.sqlite3')
+
+    # Background jobs
+    DATA_FOLDER = os.getenv("DATA_FOLDER", "data")
+    JOB_QUEUE_PATH = os.path.join(DATA_FOLDER, 'jobs.sqlite3')
+    CANDIDATE_STORE_ENABLED = os.getenv("CANDIDATE_STORE_ENABLED", "true").lower() == "true"
+    CANDIDATE_STORE_PATH = os.path.join(DATA_FOLDER, 'candidates.sqlite3')
+    # Screenings (with the extracted resume text) older than this are deleted; 0 keeps them forever
+    CANDIDATE_STORE_RETENTION_SECONDS = int(os.getenv("CANDIDATE_STORE_RETENTION_SECONDS", 180 * 24 * 60 * 60))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))  # Worker threads per web worker process
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.5))
+    JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 24 * 60 * 60))
+    # Running jobs send a heartbeat; a job silent for JOB_STALE_SECONDS is re-queued, up to JOB_MAX_ATTEMPTS claims
+    JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", 5 * 60))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+
+    # Bulk feedback analysis
+    BULK_FEEDBACK_MAX_ITEMS = int(os.getenv("BULK_FEEDBACK_MAX_ITEMS", 50000))
+    SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 10))  # Feedback items per Gemini prompt
+    SENTIMENT_BATCH_MAX_CHARS = int(os.getenv("SENTIMENT_BATCH_MAX_CHARS", 12000))
+    SENTIMENT_BATCH_ITEM_MAX_CHARS = int(os.getenv("SENTIMENT_BATCH_ITEM_MAX_CHARS", 1500))  # Longer items go alone
+
+    # Sentiment routing: "gemini" sends every text to Gemini, "tiered" answers clear-cut short texts locally
+    SENTIMENT_ROUTING = os.getenv("SENTIMENT_ROUTING", "gemini").lower()
+    SENTIMENT_LOCAL_MIN_CONFIDENCE = float(os.getenv("SENTIMENT_LOCAL_MIN_CONFIDENCE", 0.6))  # |VADER compound|
+    SENTIMENT_LOCAL_MAX_WORDS = int(os.getenv("SENTIMENT_LOCAL_MAX_WORDS", 40))
+
+    # Batch screening
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 500))
+    BATCH_MAX_UNCOMPRESSED_BYTES = int(os.getenv("BATCH_MAX_UNCOMPRESSED_BYTES", 256 * 1024 * 1024))  # 256MB
+    BATCH_EXTRACT_WORKERS = int(os.getenv("BATCH_EXTRACT_WORKERS", os.cpu_count() or 2))
+    BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 4))  # Max parallel Gemini calls
+    # Local pre-screen: rank batches locally and send only the top resumes to Gemini
+    PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "true").lower() == "true"
+    PRESCREEN_TOP_N = int(os.getenv("PRESCREEN_TOP_N", 25))
+    PRESCREEN_INDEX_CACHE_SIZE = int(os.getenv("PRESCREEN_INDEX_CACHE_SIZE", 32))  # Requisitions kept in memory
+
+    # Observability: Prometheus metrics at /metrics; per-stage timings in a Server-Timing response header
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    # Worker processes write their metrics here so /metrics reports the whole server; gunicorn picks a
+    # temporary directory when unset. Unset under a single process, /metrics reports that process only
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_WRITE_INTERVAL = float(os.getenv("METRICS_WRITE_INTERVAL", 5))
+
+    # ASGI serving (uvicorn asgi:app): Gemini calls are awaited, blocking work runs on thread pools
+    ASGI_EXTRACT_WORKERS = int(os.getenv("ASGI_EXTRACT_WORKERS", os.cpu_count() or 2))  # Extraction and OCR hand-off
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", 16))  # Requests served by the Flask routes at once
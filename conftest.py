@@ -0,0 +1,23 @@
+# conftest.py
+import importlib
+
+import pytest
+
+from config import Config
+
+
+@pytest.fixture(scope="session")
+def web(tmp_path_factory):
+    """
+    The app module, imported with an instant offline model backend and its databases in a temporary folder
+    """
+    folder = tmp_path_factory.mktemp("web")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Config, "GEMINI_BACKEND", "standin")
+        patch.setattr(Config, "STANDIN_LATENCY_SECONDS", 0.0)
+        patch.setattr(Config, "LLM_CACHE_ENABLED", False)
+        patch.setattr(Config, "EXTRACTION_CACHE_PATH", str(folder / "extracted_text.sqlite3"))
+        patch.setattr(Config, "OCR_PAGE_CACHE_PATH", str(folder / "ocr_pages.sqlite3"))
+        patch.setattr(Config, "JOB_QUEUE_PATH", str(folder / "jobs.sqlite3"))
+        patch.setattr(Config, "CANDIDATE_STORE_PATH", str(folder / "candidates.sqlite3"))
+        return importlib.import_module("app")
@@ -0,0 +1,50 @@
+# gunicorn.conf.py
+import os
+import sys
+import glob
+import tempfile
+import subprocess
+from config import Config
+from utils.ocr_service import service_settings
+
+bind = f"0.0.0.0:{Config.PORT}"
+
+# Handle to the shared OCR service started by the master process
+_ocr_service = None
+
+
+def on_starting(server):
+    """
+    Prepare the shared metrics directory, and start one OCR service for all workers so OCR models are not
+    loaded per web worker
+    """
+    global _ocr_service
+    # Workers are forked after this, so they all see the directory; files of a previous run are removed
+    if not Config.METRICS_DIR:
+        Config.METRICS_DIR = tempfile.mkdtemp(prefix="resume-screener-metrics-")
+    for path in glob.glob(os.path.join(Config.METRICS_DIR, "metrics-*.json")):
+        os.remove(path)
+    server.log.info(f"Workers share metrics in {Config.METRICS_DIR}")
+
+    if Config.OCR_SERVICE_ENABLED:
+        # Refuse to start with a missing or public key, or a non-loopback address
+        service_settings()
+        _ocr_service = subprocess.Popen([sys.executable, "-m", "utils.ocr_service"])
+        server.log.info(f"Started OCR service (pid {_ocr_service.pid}) with {Config.OCR_WORKERS} workers")
+
+
+def post_worker_init(worker):
+    """
+    Start the background job workers and the metrics writer in each web worker; threads started before a
+    fork would be lost
+    """
+    web = sys.modules.get("app")
+    if web is not None:
+        web.job_workers.start()
+        web.REGISTRY.share(Config.METRICS_DIR, Config.METRICS_WRITE_INTERVAL)
+
+
+def on_exit(server):
+    if _ocr_service is not None and _ocr_service.poll() is None:
+        _ocr_service.terminate()
+        _ocr_service.wait(timeout=10)
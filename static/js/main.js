@@ -31,4 +31,50 @@ document.addEventListener('DOMContentLoaded', function() {
 
     window.addEventListener('scroll', checkReveal);
     checkReveal(); // Check on initial load
-});
\ No newline at end of file
+});
+
+/**
+ * Read a Server-Sent Events response body (from fetch, so POST bodies work)
+ * and call onEvent(name, data) for each event as soon as it arrives.
+ * Resolves once the stream ends.
+ */
+function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    function dispatch(block) {
+        let name = 'message';
+        const dataLines = [];
+        block.split('\n').forEach(line => {
+            if (line.startsWith('event:')) {
+                name = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trimStart());
+            }
+        });
+        if (dataLines.length > 0) {
+            onEvent(name, JSON.parse(dataLines.join('\n')));
+        }
+    }
+
+    function pump() {
+        return reader.read().then(({ done, value }) => {
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+                dispatch(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+            }
+            if (done) {
+                if (buffer.trim()) {
+                    dispatch(buffer);
+                }
+                return;
+            }
+            return pump();
+        });
+    }
+
+    return pump();
+}
@@ -34,28 +34,18 @@ document.addEventListener('DOMContentLoaded', function () {
 
             loadingIndicator.classList.remove('hidden');
             resultsContainer.classList.add('hidden');
+            clearResults();
 
             const formData = new FormData(form);
+            // Stream the analysis so fields render as the model writes them; without
+            // streaming fetch, queue the screening and poll for the result instead
+            const screening = window.ReadableStream ? streamScreening(formData) : queueScreening(formData);
 
-            fetch('/api/screen-resume', {
-                method: 'POST',
-                body: formData
-            })
-            .then(response => {
-                if (!response.ok) {
-                    return response.json().then(err => {
-                        throw new Error(err.error || 'Server responded with an error');
-                    });
-                }
-                return response.json();
-            })
+            screening
             .then(data => {
                 loadingIndicator.classList.add('hidden');
                 displayResults(data);
-                resultsContainer.classList.remove('hidden');
-
-                // Smooth scroll to results
-                resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                showResults();
             })
             .catch(error => {
                 loadingIndicator.classList.add('hidden');
@@ -64,60 +54,171 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 
-    function displayResults(data) {
-        // Main match score
-        matchPercentage.textContent = `${data.match_score}%`;
+    function rejectWithServerError(response) {
+        return response.json().then(err => {
+            throw new Error(err.error || 'Server responded with an error');
+        });
+    }
+
+    function showResults() {
+        if (resultsContainer.classList.contains('hidden')) {
+            resultsContainer.classList.remove('hidden');
+
+            // Smooth scroll to results
+            resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        }
+    }
+
+    function streamScreening(formData) {
+        return fetch('/api/screen-resume/stream', {
+            method: 'POST',
+            body: formData
+        })
+        .then(response => {
+            if (!response.ok) {
+                return rejectWithServerError(response);
+            }
+
+            let result = null;
+            return readEventStream(response, (name, data) => {
+                if (name === 'field') {
+                    // Reveal the results as soon as the first field is complete
+                    loadingIndicator.classList.add('hidden');
+                    showResults();
+                    renderField(data.name, data.value);
+                } else if (name === 'result' || name === 'error') {
+                    result = data;
+                }
+            })
+            .then(() => {
+                if (!result) {
+                    throw new Error('The connection closed before the screening finished');
+                }
+                if (result.error) {
+                    throw new Error(result.error);
+                }
+                return result;
+            });
+        });
+    }
+
+    function queueScreening(formData) {
+        // Queue the screening and poll for the result instead of holding the request open
+        formData.append('async', 'true');
+
+        return fetch('/api/screen-resume', {
+            method: 'POST',
+            body: formData
+        })
+        .then(response => {
+            if (!response.ok) {
+                return rejectWithServerError(response);
+            }
+            return response.json();
+        })
+        .then(job => pollJob(job.status_url));
+    }
+
+    function pollJob(statusUrl, interval = 1500) {
+        return new Promise((resolve, reject) => {
+            const check = () => {
+                fetch(statusUrl)
+                .then(response => response.json().then(job => ({ ok: response.ok, job })))
+                .then(({ ok, job }) => {
+                    if (!ok) {
+                        throw new Error(job.error || 'Could not fetch job status');
+                    }
+                    if (job.status === 'success') {
+                        resolve(job.result);
+                    } else if (job.status === 'failed') {
+                        reject(new Error((job.result && job.result.error) || 'Resume screening failed'));
+                    } else {
+                        setTimeout(check, interval);
+                    }
+                })
+                .catch(reject);
+            };
+            check();
+        });
+    }
+
+    function clearResults() {
+        matchPercentage.textContent = '--';
+        experienceMatch.textContent = 'Experience: ...';
+        educationMatch.textContent = 'Education: ...';
+        skillsMatchedList.innerHTML = '';
+        skillsMissingList.innerHTML = '';
+        if (recommendationsList) {
+            recommendationsList.innerHTML = '';
+        }
+        if (recommendationsText) {
+            recommendationsText.textContent = '';
+        }
+    }
+
+    // Render one top-level field of the analysis (called per field while streaming)
+    function renderField(name, value) {
+        if (name === 'match_score') {
+            renderScore(value);
+        } else if (name === 'experience_match') {
+            renderMatch(experienceMatch, 'Experience', value);
+        } else if (name === 'education_match') {
+            renderMatch(educationMatch, 'Education', value);
+        } else if (name === 'skills_matched') {
+            renderSkills(skillsMatchedList, value, 'skill-matched');
+        } else if (name === 'skills_missing') {
+            renderSkills(skillsMissingList, value, 'skill-missing');
+        }
+    }
+
+    function renderScore(score) {
+        matchPercentage.textContent = `${score}%`;
 
         const scoreCircle = document.querySelector('.score-circle');
         if (scoreCircle) {
-            scoreCircle.style.setProperty('--score-height', `${data.match_score}%`);
+            scoreCircle.style.setProperty('--score-height', `${score}%`);
 
             // Add color class based on score
             scoreCircle.className = 'score-circle';
-            if (data.match_score >= 80) {
+            if (score >= 80) {
                 scoreCircle.classList.add('score-high');
-            } else if (data.match_score >= 60) {
+            } else if (score >= 60) {
                 scoreCircle.classList.add('score-medium');
             } else {
                 scoreCircle.classList.add('score-low');
             }
         }
+    }
 
-        // Experience and education matches
-        experienceMatch.textContent = `Experience: ${data.experience_match ? 'Match' : 'No Match'}`;
-        educationMatch.textContent = `Education: ${data.education_match ? 'Match' : 'No Match'}`;
-
-        experienceMatch.previousElementSibling.className = data.experience_match ?
-            'fas fa-check-circle' : 'fas fa-times-circle';
-        educationMatch.previousElementSibling.className = data.education_match ?
-            'fas fa-check-circle' : 'fas fa-times-circle';
+    function renderMatch(element, label, matched) {
+        element.textContent = `${label}: ${matched ? 'Match' : 'No Match'}`;
+        element.previousElementSibling.className = matched ? 'fas fa-check-circle' : 'fas fa-times-circle';
+        element.previousElementSibling.style.color = matched ? 'var(--success-color)' : 'var(--danger-color)';
+    }
 
-        experienceMatch.previousElementSibling.style.color = data.experience_match ?
-            'var(--success-color)' : 'var(--danger-color)';
-        educationMatch.previousElementSibling.style.color = data.education_match ?
-            'var(--success-color)' : 'var(--danger-color)';
-
-        // Skills analysis
-        skillsMatchedList.innerHTML = '';
-        skillsMissingList.innerHTML = '';
+    function renderSkills(list, skills, className) {
+        list.innerHTML = '';
 
         // Sort skills alphabetically for better readability
-        const sortedMatchedSkills = [...data.skills_matched].sort();
-        const sortedMissingSkills = [...data.skills_missing].sort();
-
-        sortedMatchedSkills.forEach(skill => {
+        [...(skills || [])].sort().forEach(skill => {
             const li = document.createElement('li');
             li.textContent = skill;
-            li.className = 'skill-item skill-matched';
-            skillsMatchedList.appendChild(li);
+            li.className = `skill-item ${className}`;
+            list.appendChild(li);
         });
+    }
 
-        sortedMissingSkills.forEach(skill => {
-            const li = document.createElement('li');
-            li.textContent = skill;
-            li.className = 'skill-item skill-missing';
-            skillsMissingList.appendChild(li);
-        });
+    function displayResults(data) {
+        // Main match score
+        renderScore(data.match_score);
+
+        // Experience and education matches
+        renderMatch(experienceMatch, 'Experience', data.experience_match);
+        renderMatch(educationMatch, 'Education', data.education_match);
+
+        // Skills analysis
+        renderSkills(skillsMatchedList, data.skills_matched, 'skill-matched');
+        renderSkills(skillsMissingList, data.skills_missing, 'skill-missing');
 
         // AI Recommendations section
         if (recommendationsList) {
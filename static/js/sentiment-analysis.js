@@ -44,8 +44,8 @@ document.addEventListener('DOMContentLoaded', function() {
             const feedbackType = document.getElementById('feedback-type').value;
             const feedbackText = document.getElementById('feedback-text').value;
 
-            // Submit form via AJAX
-            fetch('/api/analyze-sentiment', {
+            // Submit form via AJAX; the analysis streams back so fields render as the model writes them
+            fetch('/api/analyze-sentiment/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -59,25 +59,42 @@ document.addEventListener('DOMContentLoaded', function() {
                 if (!response.ok) {
                     throw new Error('Server responded with an error');
                 }
-                return response.json();
+                if (!response.body) {
+                    // No streaming fetch in this browser: the whole stream arrives at once
+                    return response.text().then(text => parseEventText(text));
+                }
+
+                let result = null;
+                return readEventStream(response, (name, data) => {
+                    if (name === 'field') {
+                        revealResults();
+                        renderField(data.name, data.value);
+                    } else if (name === 'result' || name === 'error') {
+                        result = data;
+                    }
+                }).then(() => result);
             })
             .then(data => {
+                if (!data || data.error) {
+                    throw new Error((data && data.error) || 'The connection closed before the analysis finished');
+                }
+
                 // Hide loading indicator
                 loadingIndicator.classList.add('hidden');
 
-                // Prepare for animation
-                if (gaugeNeedle) {
-                    gaugeNeedle.style.transition = 'transform 1.5s cubic-bezier(0.34, 1.56, 0.64, 1)';
-                }
+                if (resultsContainer.classList.contains('hidden')) {
+                    // Display results with animation
+                    prepareGaugeAnimation();
+                    setTimeout(() => {
+                        displayResults(data);
+                        resultsContainer.classList.remove('hidden');
 
-                // Display results with animation
-                setTimeout(() => {
+                        // Add entrance animation to results
+                        animateResultsEntrance();
+                    }, 150);
+                } else {
                     displayResults(data);
-                    resultsContainer.classList.remove('hidden');
-
-                    // Add entrance animation to results
-                    animateResultsEntrance();
-                }, 150);
+                }
             })
             .catch(error => {
                 console.error('Error:', error);
@@ -87,6 +104,52 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Final event of a fully buffered event stream
+    function parseEventText(text) {
+        let result = null;
+        text.split('\n\n').forEach(block => {
+            const event = block.match(/^event: (.*)$/m);
+            const data = block.match(/^data: (.*)$/m);
+            if (event && data && (event[1] === 'result' || event[1] === 'error')) {
+                result = JSON.parse(data[1]);
+            }
+        });
+        return result;
+    }
+
+    function prepareGaugeAnimation() {
+        if (gaugeNeedle) {
+            gaugeNeedle.style.transition = 'transform 1.5s cubic-bezier(0.34, 1.56, 0.64, 1)';
+        }
+    }
+
+    // Show the results panel when the first streamed field arrives
+    function revealResults() {
+        if (!resultsContainer.classList.contains('hidden')) return;
+
+        loadingIndicator.classList.add('hidden');
+        prepareGaugeAnimation();
+        if (concernsList) concernsList.innerHTML = '';
+        if (positivesList) positivesList.innerHTML = '';
+        if (recommendationsText) recommendationsText.innerHTML = '';
+        sentimentInterpretation.textContent = '...';
+        resultsContainer.classList.remove('hidden');
+        animateResultsEntrance();
+    }
+
+    // Render one top-level field of the analysis (called per field while streaming)
+    function renderField(name, value) {
+        if (name === 'sentiment_score') {
+            renderGauge(value);
+        } else if (name === 'attrition_risk') {
+            renderRisk(value);
+        } else if (name === 'key_concerns') {
+            renderFactors(concernsList, value, "No significant concerns detected");
+        } else if (name === 'positive_factors') {
+            renderFactors(positivesList, value, "No specific positive factors highlighted");
+        }
+    }
+
     // Function to animate results entrance
     function animateResultsEntrance() {
         const elements = document.querySelectorAll('.result-summary, .factors-section, .recommendations');
@@ -107,9 +170,58 @@ document.addEventListener('DOMContentLoaded', function() {
         // Store data for PDF generation
         window.lastSentimentData = data;
 
+        renderGauge(data.sentiment_score);
+
+        // Set sentiment interpretation text with visual indicator
+        const interpretation = data.interpretation || 'Neutral';
+        sentimentInterpretation.textContent = interpretation;
+
+        // Apply color class to sentiment interpretation
+        updateSentimentColor(interpretation);
+
+        renderRisk(data.attrition_risk || 'Medium');
+        renderFactors(concernsList, data.key_concerns, "No significant concerns detected");
+        renderFactors(positivesList, data.positive_factors, "No specific positive factors highlighted");
+
+        // Set recommendations with improved formatting
+        if (recommendationsText) {
+            let recommendationsContent = '';
+
+            if (data.recommendations) {
+                // If recommendations is already formatted as a string
+                recommendationsContent = data.recommendations;
+            } else if (data.engagement_recommendations && data.engagement_recommendations.length > 0) {
+                // If we have engagement_recommendations array, format it with bullet points
+                recommendationsContent = "• " + data.engagement_recommendations.join("\n• ");
+            } else {
+                // Fallback if no recommendations found
+                recommendationsContent = "• Continue monitoring employee engagement\n• Consider follow-up discussions for more detailed feedback";
+            }
+
+            // Split into lines for better animation
+            const recLines = recommendationsContent.split("\n");
+            recommendationsText.innerHTML = '';
+
+            recLines.forEach((line, index) => {
+                const p = document.createElement('p');
+                p.textContent = line;
+                p.style.opacity = '0';
+                p.style.transform = 'translateY(10px)';
+                p.style.transition = 'opacity 0.3s ease, transform 0.3s ease';
+                recommendationsText.appendChild(p);
+
+                setTimeout(() => {
+                    p.style.opacity = '1';
+                    p.style.transform = 'translateY(0)';
+                }, 150 * index);
+            });
+        }
+    }
+
+    function renderGauge(score) {
         // Set sentiment gauge rotation based on sentiment score (-1 to 1)
         // Convert to 0-180 degrees for the gauge
-        const sentimentDegrees = ((data.sentiment_score + 1) / 2) * 180;
+        const sentimentDegrees = ((score + 1) / 2) * 180;
 
         // Update gauge needle with improved animation
         if (gaugeNeedle) {
@@ -117,15 +229,10 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         // Update gauge color based on sentiment score
-        updateGaugeColor(data.sentiment_score);
-
-        // Set sentiment interpretation text with visual indicator
-        const interpretation = data.interpretation || 'Neutral';
-        sentimentInterpretation.textContent = interpretation;
-
-        // Apply color class to sentiment interpretation
-        updateSentimentColor(interpretation);
+        updateGaugeColor(score);
+    }
 
+    function renderRisk(risk) {
         // Set attrition risk level with animation
         const riskPercentages = {
             'Low': 33,
@@ -139,7 +246,9 @@ document.addEventListener('DOMContentLoaded', function() {
             'High': 'var(--danger-color)'
         };
 
-        const risk = data.attrition_risk || 'Medium';
+        if (!(risk in riskPercentages)) {
+            risk = 'Medium';
+        }
 
         // Animate risk level
         if (riskLevel) {
@@ -155,43 +264,21 @@ document.addEventListener('DOMContentLoaded', function() {
             riskText.className = ''; // Reset classes
             riskText.classList.add(`risk-${risk.toLowerCase()}`);
         }
+    }
 
-        // Clear existing concerns and positives lists
-        if (concernsList) concernsList.innerHTML = '';
-        if (positivesList) positivesList.innerHTML = '';
-
-        // Populate concerns list with staggered animation
-        if (data.key_concerns && data.key_concerns.length > 0) {
-            data.key_concerns.forEach((concern, index) => {
-                const li = document.createElement('li');
-                li.textContent = concern;
-                li.style.opacity = '0';
-                li.style.transform = 'translateX(-10px)';
-                li.style.transition = 'opacity 0.3s ease, transform 0.3s ease';
-                concernsList.appendChild(li);
-
-                setTimeout(() => {
-                    li.style.opacity = '1';
-                    li.style.transform = 'translateX(0)';
-                }, 100 * index);
-            });
-        } else {
-            // Add a placeholder if no concerns
-            const li = document.createElement('li');
-            li.textContent = "No significant concerns detected";
-            li.classList.add('placeholder-text');
-            concernsList.appendChild(li);
-        }
+    function renderFactors(list, factors, placeholder) {
+        if (!list) return;
+        list.innerHTML = '';
 
-        // Populate positives list with staggered animation
-        if (data.positive_factors && data.positive_factors.length > 0) {
-            data.positive_factors.forEach((positive, index) => {
+        // Populate the list with staggered animation
+        if (factors && factors.length > 0) {
+            factors.forEach((factor, index) => {
                 const li = document.createElement('li');
-                li.textContent = positive;
+                li.textContent = factor;
                 li.style.opacity = '0';
                 li.style.transform = 'translateX(-10px)';
                 li.style.transition = 'opacity 0.3s ease, transform 0.3s ease';
-                positivesList.appendChild(li);
+                list.appendChild(li);
 
                 setTimeout(() => {
                     li.style.opacity = '1';
@@ -199,45 +286,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 }, 100 * index);
             });
         } else {
-            // Add a placeholder if no positives
+            // Add a placeholder if there is nothing to list
             const li = document.createElement('li');
-            li.textContent = "No specific positive factors highlighted";
+            li.textContent = placeholder;
             li.classList.add('placeholder-text');
-            positivesList.appendChild(li);
-        }
-
-        // Set recommendations with improved formatting
-        if (recommendationsText) {
-            let recommendationsContent = '';
-
-            if (data.recommendations) {
-                // If recommendations is already formatted as a string
-                recommendationsContent = data.recommendations;
-            } else if (data.engagement_recommendations && data.engagement_recommendations.length > 0) {
-                // If we have engagement_recommendations array, format it with bullet points
-                recommendationsContent = "• " + data.engagement_recommendations.join("\n• ");
-            } else {
-                // Fallback if no recommendations found
-                recommendationsContent = "• Continue monitoring employee engagement\n• Consider follow-up discussions for more detailed feedback";
-            }
-
-            // Split into lines for better animation
-            const recLines = recommendationsContent.split("\n");
-            recommendationsText.innerHTML = '';
-
-            recLines.forEach((line, index) => {
-                const p = document.createElement('p');
-                p.textContent = line;
-                p.style.opacity = '0';
-                p.style.transform = 'translateY(10px)';
-                p.style.transition = 'opacity 0.3s ease, transform 0.3s ease';
-                recommendationsText.appendChild(p);
-
-                setTimeout(() => {
-                    p.style.opacity = '1';
-                    p.style.transform = 'translateY(0)';
-                }, 150 * index);
-            });
+            list.appendChild(li);
         }
     }
 
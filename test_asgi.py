@@ -0,0 +1,132 @@
+# test_asgi.py
+import io
+import json
+import asyncio
+import threading
+
+import pytest
+from werkzeug.test import encode_multipart
+from werkzeug.datastructures import FileStorage
+
+from config import Config
+
+JOB = "Requirements:\n- 3+ years of experience with Python and SQL"
+RESUME = b"Jane Doe\nSkills\nPython, SQL, Docker\nExperience\nBackend developer building REST APIs, 2018 - 2023\n"
+
+
+@pytest.fixture
+def asgi(web):
+    import asgi
+    return asgi
+
+
+def call(asgi, method, path, body=b"", content_type=None, chunk_size=None):
+    """
+    Run one HTTP request through asgi.app
+
+    Returns:
+        tuple: (status, headers dict, body message dicts)
+    """
+    chunk_size = chunk_size or max(1, len(body))
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)] or [b""]
+    messages = [{"type": "http.request", "body": chunk, "more_body": n < len(chunks) - 1}
+                for n, chunk in enumerate(chunks)]
+    headers = [(b"host", b"testserver")]
+    if content_type:
+        headers.append((b"content-type", content_type.encode("latin-1")))
+    scope = {"type": "http", "method": method, "path": path, "root_path": "", "query_string": b"",
+             "headers": headers, "http_version": "1.1", "scheme": "http", "server": ("testserver", 80),
+             "client": ("127.0.0.1", 50000)}
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    start = sent[0]
+    assert start["type"] == "http.response.start"
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, sent[1:]
+
+
+def body_of(messages):
+    return b"".join(message.get("body", b"") for message in messages)
+
+
+def test_native_route_parses_the_upload_off_the_event_loop(asgi, monkeypatch):
+    threads = []
+    resume_upload = asgi.web.resume_upload
+
+    def recording_upload():
+        threads.append(threading.current_thread().name)
+        return resume_upload()
+
+    monkeypatch.setattr(asgi.web, "resume_upload", recording_upload)
+    boundary, body = encode_multipart({"job_description": JOB,
+                                       "resume": FileStorage(io.BytesIO(RESUME), "jane.txt")})
+
+    status, headers, messages = call(asgi, "POST", "/api/screen-resume", body,
+                                     f"multipart/form-data; boundary={boundary}", chunk_size=64)
+    result = json.loads(body_of(messages))
+    assert status == 200, result
+    assert result["status"] == "success" and result["file_name"] == "jane.txt"
+    assert headers["content-type"] == "application/json"
+    assert len(threads) == 1 and threads[0].startswith("asgi-extract")
+
+
+def test_native_route_validation_errors(asgi):
+    status, _, messages = call(asgi, "POST", "/api/analyze-sentiment", b"{}", "application/json")
+    assert status == 400
+    assert json.loads(body_of(messages)) == {"error": "No JSON data provided"}
+
+
+def test_other_routes_are_bridged_to_flask(asgi):
+    status, headers, messages = call(asgi, "GET", "/api/jobs/missing")
+    assert status == 404
+    assert json.loads(body_of(messages)) == {"error": "Job not found"}
+
+    status, headers, messages = call(asgi, "GET", "/metrics")
+    assert status == 200
+    assert b"http_request_duration_seconds" in body_of(messages)
+
+
+def test_streaming_routes_send_each_event_as_it_is_produced(asgi):
+    body = json.dumps({"feedback": "The team is great but the workload is heavy."}).encode()
+    status, headers, messages = call(asgi, "POST", "/api/analyze-sentiment/stream", body, "application/json")
+    assert status == 200
+    assert headers["content-type"].startswith("text/event-stream")
+    chunks = [message["body"] for message in messages if message["body"]]
+    assert chunks[0].startswith(b"event: start")
+    assert len(chunks) > 1
+    assert b"event: result" in chunks[-1]
+    assert messages[-1] == {"type": "http.response.body", "body": b""}
+
+
+def test_requests_are_not_dispatched_after_the_client_disconnects(asgi, monkeypatch):
+    calls = []
+    monkeypatch.setattr(asgi.web, "resume_upload", lambda: calls.append(True))
+    messages = [{"type": "http.request", "body": b"--partial", "more_body": True}, {"type": "http.disconnect"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/screen-resume", "root_path": "", "query_string": b"",
+             "headers": [(b"host", b"testserver")], "http_version": "1.1", "scheme": "http",
+             "server": ("testserver", 80), "client": ("127.0.0.1", 50000)}
+    asyncio.run(asgi.app(scope, receive, send))
+    assert sent == [] and calls == []
+
+
+def test_oversized_bodies_are_refused_before_routing(asgi, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_CONTENT_LENGTH", 1000)
+    body = b"x" * (1000 + 64 * 1024 + 1)
+    status, _, messages = call(asgi, "POST", "/api/screen-resume", body, "application/octet-stream",
+                               chunk_size=16 * 1024)
+    assert status == 413
+    assert b"Request Entity Too Large" in body_of(messages)
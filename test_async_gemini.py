@@ -0,0 +1,109 @@
+# test_async_gemini.py
+import json
+import time
+import asyncio
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from utils.gemini_api import GeminiAPI
+from utils.async_gemini import AsyncGeminiClient, TokenBucketLimiter, run_sync
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeTransport:
+    """Offline transport that plays back a script of errors, delays and replies"""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def generate(self, prompt, generation_config=None):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else '{"ok": true}'
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, float):
+            await asyncio.sleep(step)
+            step = '{"ok": true}'
+        return FakeResponse(step)
+
+
+def make_client(transport, **kwargs):
+    options = dict(timeout=1.0, deadline=5.0, max_retries=3, backoff_base=0.01, backoff_max=0.05)
+    options.update(kwargs)
+    return AsyncGeminiClient(transport, **options)
+
+
+def test_retries_quota_errors_then_succeeds():
+    transport = FakeTransport(api_exceptions.ResourceExhausted("quota"),
+                              api_exceptions.ServiceUnavailable("busy"), '{"match_score": 80}')
+    response = asyncio.run(make_client(transport).generate("prompt"))
+    assert response.text == '{"match_score": 80}'
+    assert transport.calls == 3
+
+
+def test_non_retryable_error_is_raised_immediately():
+    transport = FakeTransport(api_exceptions.InvalidArgument("bad request"))
+    with pytest.raises(api_exceptions.InvalidArgument):
+        asyncio.run(make_client(transport).generate("prompt"))
+    assert transport.calls == 1
+
+
+def test_gives_up_after_max_retries():
+    transport = FakeTransport(*[api_exceptions.TooManyRequests("slow down")] * 5)
+    with pytest.raises(api_exceptions.TooManyRequests):
+        asyncio.run(make_client(transport, max_retries=2).generate("prompt"))
+    assert transport.calls == 3
+
+
+def test_slow_attempt_times_out_and_is_retried():
+    transport = FakeTransport(0.5, '{"ok": 1}')
+    response = asyncio.run(make_client(transport, timeout=0.05).generate("prompt"))
+    assert response.text == '{"ok": 1}'
+    assert transport.calls == 2
+
+
+def test_deadline_bounds_the_whole_call():
+    transport = FakeTransport(*[0.5] * 10)
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(make_client(transport, timeout=0.1, deadline=0.3).generate("prompt"))
+    assert time.perf_counter() - start < 1.0
+
+
+def test_limiter_spaces_requests_beyond_the_budget():
+    limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=0)  # 10 per second
+    assert [limiter.reserve(1) for _ in range(600)][-1] == 0.0
+    wait = limiter.reserve(1)
+    assert 0.05 < wait <= 0.1
+
+
+def test_limiter_charges_prompt_tokens():
+    limiter = TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=6000)  # 100 tokens per second
+    assert limiter.reserve(6000) == 0.0
+    assert limiter.reserve(200) == pytest.approx(2.0, abs=0.05)
+
+
+def test_limiter_refunds_reservations_that_time_out():
+    limiter = TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=6000)  # 100 tokens per second
+    assert limiter.reserve(6000) == 0.0
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(make_client(FakeTransport(), limiter=limiter, deadline=0.05).generate("x" * 800))
+    # Without the refund the next caller would also wait for the abandoned request's 200 tokens (about 4s)
+    assert limiter.reserve(200) < 2.0
+
+def test_gemini_api_sync_and_async_paths_share_the_client():
+    api = GeminiAPI(model=object())
+    api.response_cache = None
+    api.async_client = make_client(FakeTransport(api_exceptions.ResourceExhausted("quota"),
+                                                 json.dumps({"match_score": 70}),
+                                                 json.dumps({"sentiment_score": 0.5})))
+    assert api.analyze_resume("Python developer", "Python role")["match_score"] == 70
+    result = run_sync(api.analyze_sentiment_async("Great team"))
+    assert result["sentiment_score"] == 0.5
+    assert result["engagement_recommendations"]
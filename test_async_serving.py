@@ -0,0 +1,82 @@
+# test_async_serving.py
+import io
+import time
+import asyncio
+import threading
+
+import pytest
+import nltk
+from werkzeug.datastructures import FileStorage
+
+try:
+    nltk.data.find('sentiment/vader_lexicon.zip')
+except LookupError:
+    pytest.skip("NLTK vader_lexicon is not installed", allow_module_level=True)
+
+from config import Config
+from utils import async_gemini
+from utils.gemini_api import GeminiAPI
+from utils.resume_processor import ResumeProcessor
+from utils.sentiment_analyzer import SentimentAnalyzer
+
+LATENCY = 0.2
+JOB = "Requirements:\n- 3+ years of experience with Python and SQL\n- Experience with AWS"
+RESUME = b"Jane Doe\nSkills\nPython, SQL, Docker\nExperience\nBackend developer building REST APIs, 2018 - 2023\n"
+FEEDBACK = "My manager is supportive, but the workload is overwhelming and pay is below market."
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    monkeypatch.setattr(Config, "GEMINI_BACKEND", "standin")
+    monkeypatch.setattr(Config, "STANDIN_LATENCY_SECONDS", LATENCY)
+    monkeypatch.setattr(Config, "STANDIN_LATENCY_DISTRIBUTION", "fixed")
+    monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "CANDIDATE_STORE_ENABLED", False)
+    monkeypatch.setattr(Config, "JOB_PROFILE_ENABLED", False)
+    # A fresh, unlimited rate limiter so earlier tests' calls do not delay these
+    monkeypatch.setattr(Config, "GEMINI_RPM_LIMIT", 0)
+    monkeypatch.setattr(async_gemini, "_limiter", None)
+
+
+@pytest.fixture
+def processor(standin):
+    processor = ResumeProcessor.__new__(ResumeProcessor)
+    processor.gemini_api = GeminiAPI()
+    processor.text_cache = processor.page_cache = processor.candidate_store = None
+    return processor
+
+
+def upload():
+    return FileStorage(stream=io.BytesIO(RESUME), filename="jane.txt")
+
+
+def test_async_screening_matches_the_sync_result(processor):
+    expected = processor.process(upload(), JOB)
+    assert asyncio.run(processor.process_async(upload(), JOB)) == expected
+    assert expected["status"] == "success"
+
+
+def test_async_sentiment_matches_the_sync_result(standin):
+    analyzer = SentimentAnalyzer()
+    expected = analyzer.analyze(FEEDBACK)
+    assert asyncio.run(analyzer.analyze_async(FEEDBACK)) == expected
+    assert expected["route"] == "gemini"
+
+
+def test_concurrent_requests_wait_on_the_model_together(standin):
+    analyzer = SentimentAnalyzer()
+
+    async def run():
+        return await asyncio.gather(*[analyzer.analyze_async(f"{FEEDBACK} ({i})") for i in range(20)])
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    assert time.perf_counter() - start < 5 * LATENCY
+    assert all(result["route"] == "gemini" for result in results)
+
+
+def test_run_async_uses_the_gemini_loop():
+    async def loop_thread():
+        return threading.current_thread().name
+
+    assert asyncio.run(async_gemini.run_async(loop_thread())) == "gemini-async-loop"
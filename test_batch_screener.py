@@ -0,0 +1,107 @@
+# test_batch_screener.py
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from config import Config
+from utils import batch_screener
+from utils.batch_screener import BatchScreener
+
+JOB = "Backend Engineer\nRequirements:\n- Python and SQL\n- Docker"
+
+
+def make_zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def upload(name, data):
+    return FileStorage(stream=io.BytesIO(data), filename=name)
+
+
+def test_zip_archives_are_expanded_and_unsupported_entries_reported():
+    archive = make_zip({"resumes/alice.txt": b"Alice", "resumes/bob.pdf": b"%PDF", "notes.exe": b"MZ",
+                        "__MACOSX/resumes/._alice.txt": b"", "resumes/": b""})
+    files, skipped = BatchScreener(None).collect_files(
+        [upload("batch.zip", archive), upload("carol.txt", b"Carol"), upload("dave.png", b"")])
+
+    assert files == [("alice.txt", b"Alice"), ("bob.pdf", b"%PDF"), ("carol.txt", b"Carol")]
+    assert [(item["file_name"], item["status"]) for item in skipped] == [("notes.exe", "failed"),
+                                                                         ("dave.png", "failed")]
+
+
+def test_invalid_zip_is_reported_per_file():
+    files, skipped = BatchScreener(None).collect_files([upload("broken.zip", b"not a zip")])
+    assert files == []
+    assert skipped[0]["error"] == "Invalid zip archive"
+
+
+def test_batch_limits(monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_MAX_UNCOMPRESSED_BYTES", 10)
+    with pytest.raises(ValueError, match="uncompressed size"):
+        BatchScreener(None).collect_files([upload("big.zip", make_zip({"a.txt": b"x" * 11}))])
+
+    monkeypatch.setattr(Config, "BATCH_MAX_UNCOMPRESSED_BYTES", 1024)
+    monkeypatch.setattr(Config, "BATCH_MAX_FILES", 2)
+    with pytest.raises(ValueError, match="maximum of 2"):
+        BatchScreener(None).collect_files([upload(f"{n}.txt", b"cv") for n in range(3)])
+
+
+def test_extraction_runs_in_spawned_workers_with_the_parent_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_EXTRACT_WORKERS", 1)
+    monkeypatch.setattr(Config, "EXTRACTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(Config, "EXTRACTION_CACHE_PATH", str(tmp_path / "text_cache.db"))
+    monkeypatch.setattr(Config, "OCR_PAGE_CACHE_ENABLED", False)
+    screener = BatchScreener(None)
+    try:
+        pool = screener._get_extract_pool()
+        assert pool._mp_context.get_start_method() == "spawn"
+        assert screener.extract_all([("alice.txt", b"Alice\nPython"), ("bob.txt", b"Bob\nExcel")]) == [
+            "Alice\nPython", "Bob\nExcel"]
+        # The worker used the cache path set here, not the one from the environment
+        assert (tmp_path / "text_cache.db").exists()
+    finally:
+        screener._get_extract_pool().shutdown(wait=True)
+
+
+@pytest.fixture
+def client(web, monkeypatch):
+    # Extraction runs on threads instead of worker processes holding their own ResumeProcessor
+    pool = ThreadPoolExecutor(2)
+    monkeypatch.setattr(batch_screener, "_worker_processor", web.resume_processor)
+    monkeypatch.setattr(web.batch_screener, "_get_extract_pool", lambda: pool)
+    yield web.app.test_client()
+    pool.shutdown(wait=True)
+
+
+def test_batch_endpoint_ranks_every_resume(client):
+    archive = make_zip({"alice.txt": b"Alice\nSkills\nPython, SQL, Docker\nBackend engineer since 2016",
+                        "bob.txt": b"Bob\nSkills\nExcel\nAccountant"})
+    response = client.post("/api/screen-resumes", data={
+        "job_description": JOB,
+        "resumes": [(io.BytesIO(archive), "batch.zip"), (io.BytesIO(b"GIF89a"), "photo.gif")],
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (3, 2, 1)
+    ranked = [result for result in body["results"] if "rank" in result]
+    assert [result["rank"] for result in ranked] == [1, 2]
+    assert ranked[0]["match_score"] >= ranked[1]["match_score"]
+    assert body["results"][-1]["file_name"] == "photo.gif"
+
+
+def test_batch_endpoint_validates_the_form(client):
+    assert client.post("/api/screen-resumes", data={"job_description": JOB}).status_code == 400
+    response = client.post("/api/screen-resumes", data={"resumes": [(io.BytesIO(b"cv"), "a.txt")]})
+    assert response.status_code == 400
+    response = client.post("/api/screen-resumes", data={"job_description": JOB,
+                                                         "resumes": [(io.BytesIO(b"x"), "a.exe")]})
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "failed"
@@ -0,0 +1,103 @@
+# test_candidate_store.py
+import time
+
+import pytest
+
+from utils.candidate_store import CandidateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.sqlite3"))
+    store.record({"file_name": "alice.pdf", "match_score": 88, "skills_matched": ["Python", "Kubernetes"],
+                  "skills_missing": ["Go"], "analysis_source": "gemini"},
+                 "Alice. Platform engineer running Kubernetes clusters.", "Platform Engineer\\nKubernetes",
+                 job_title="Platform Engineer")
+    store.record({"file_name": "bob.pdf", "match_score": 55, "skills_matched": ["python"],
+                  "skills_missing": ["Kubernetes"], "local_skill_match": {"matched": ["Docker"]}},
+                 "Bob. Python developer who packages apps with Docker.", "Platform Engineer\\nKubernetes",
+                 job_title="Platform Engineer")
+    store.record({"file_name": "carol.pdf", "match_score": 92, "skills_matched": ["Excel"], "skills_missing": []},
+                 "Carol. Accountant.", "Accountant", job_title="Accountant")
+    return store
+
+
+def test_filters_by_skill_score_and_job(store):
+    assert [c["file_name"] for c in store.search(skills=["kubernetes"])] == ["alice.pdf"]
+    assert [c["file_name"] for c in store.search(skills=["Python"])] == ["alice.pdf", "bob.pdf"]
+    assert [c["file_name"] for c in store.search(skills=["Docker"])] == ["bob.pdf"]
+    assert [c["file_name"] for c in store.search(min_score=80)] == ["carol.pdf", "alice.pdf"]
+    assert [c["file_name"] for c in store.search(job_title="platform", max_score=60)] == ["bob.pdf"]
+
+
+def test_full_text_search_over_resume_text(store):
+    assert [c["file_name"] for c in store.search(text="docker OR accountant")] == ["carol.pdf", "bob.pdf"]
+
+
+def test_rescreening_replaces_the_previous_entry(store):
+    first = store.search(skills=["Go"])
+    assert first == []
+    old_id = store.search(skills=["Kubernetes"])[0]["id"]
+    new_id = store.record({"file_name": "alice-v2.pdf", "match_score": 70, "skills_matched": ["Go"],
+                           "analysis_source": "gemini"},
+                          "Alice. Platform engineer running Kubernetes clusters.", "Platform Engineer\\nKubernetes")
+    assert new_id == old_id
+    candidate = store.get(new_id)
+    assert candidate["file_name"] == "alice-v2.pdf"
+    assert store.search(skills=["Kubernetes"]) == []
+    assert [c["file_name"] for c in store.search(skills=["Go"])] == ["alice-v2.pdf"]
+    assert candidate["resume_text"].startswith("Alice.")
+    assert len(store.search(job_title="Platform")) == 2
+    assert {job["title"]: job["candidates"] for job in store.jobs()} == {"Platform Engineer": 2, "Accountant": 1}
+
+
+def test_a_local_fallback_never_replaces_a_gemini_analysis(store):
+    alice = "Alice. Platform engineer running Kubernetes clusters."
+    kept_id = store.record({"file_name": "alice.pdf", "match_score": 30, "skills_matched": [],
+                            "analysis_source": "local"}, alice, "Platform Engineer\\nKubernetes")
+    assert store.get(kept_id)["match_score"] == 88
+    assert store.get(kept_id)["analysis_source"] == "gemini"
+
+    bob = "Bob. Python developer who packages apps with Docker."
+    bob_id = store.record({"file_name": "bob.pdf", "match_score": 40, "analysis_source": "local"}, bob,
+                          "Platform Engineer\\nKubernetes")
+    assert store.get(bob_id)["match_score"] == 40
+
+
+def test_screenings_can_be_deleted(store):
+    carol = store.search(job_title="Accountant")[0]["id"]
+    assert store.delete(carol)
+    assert not store.delete(carol)
+    assert store.get(carol) is None
+    assert store.search(text="accountant") == []
+    assert "Accountant" not in {job["title"] for job in store.jobs()}
+
+
+def test_old_screenings_are_purged(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.sqlite3"), retention_seconds=60)
+    store.record({"file_name": "old.pdf", "match_score": 10}, "Old resume.", "Job")
+    with store._connect() as conn:
+        conn.execute("UPDATE screenings SET created_at = ?", (time.time() - 120,))
+    store.record({"file_name": "new.pdf", "match_score": 20}, "New resume.", "Job")
+    assert store.purge() == 1
+    assert [c["file_name"] for c in store.search()] == ["new.pdf"]
+    assert store.search(text="old") == []
+
+
+def test_delete_endpoint(web, store, monkeypatch):
+    monkeypatch.setattr(web.resume_processor, "candidate_store", store)
+    client = web.app.test_client()
+    carol = store.search(job_title="Accountant")[0]["id"]
+    assert client.delete(f"/api/candidates/{carol}").get_json() == {"deleted": carol}
+    assert client.delete(f"/api/candidates/{carol}").status_code == 404
+    assert client.get(f"/api/candidates/{carol}").status_code == 404
+
+
+def test_cut_off_analyses_are_not_recorded(store):
+    from utils.resume_processor import ResumeProcessor
+    processor = ResumeProcessor.__new__(ResumeProcessor)
+    processor.candidate_store = store
+    results = {"file_name": "dave.pdf", "skills_matched": ["Python"], "truncated": True, "status": "success"}
+    processor._record_candidate(results, "Dave. Python developer.", "Python role", None)
+    assert "candidate_id" not in results
+    assert store.search(text="dave") == []
@@ -0,0 +1,61 @@
+# test_fast_sentiment.py
+import random
+
+import pytest
+import nltk
+
+try:
+    nltk.data.find('sentiment/vader_lexicon.zip')
+except LookupError:
+    pytest.skip("NLTK vader_lexicon is not installed", allow_module_level=True)
+
+from nltk.sentiment import SentimentIntensityAnalyzer
+from utils.fast_sentiment import VaderBatchScorer
+
+FEEDBACK = [
+    "",
+    "I love my team and the work is great!",
+    "The pay is NOT good but my manager is very supportive.",
+    "Honestly, I am kind of tired of the overtime...",
+    "Management never listens. Worst place I've worked!!!",
+    "Great benefits, great people, GREAT culture :)",
+    "Growth opportunities are at least okay, I guess??",
+    "It's not the worst, but it is hardly inspiring.",
+    "This place is the shit, yeah right.",
+    "Workload is fine. Communication could improve.",
+    "I don't feel valued, and I'm not sure I want to stay.",
+    "Excellent onboarding; mentors were helpful and kind.",
+]
+
+
+@pytest.fixture(scope="module")
+def sia():
+    return SentimentIntensityAnalyzer()
+
+
+def test_batch_scores_match_polarity_scores(sia):
+    scorer = VaderBatchScorer(sia)
+
+    expected = [sia.polarity_scores(text)["compound"] for text in FEEDBACK]
+
+    assert scorer.compound_scores(FEEDBACK) == expected
+
+
+def test_batch_scores_match_on_random_corpus(sia):
+    rng = random.Random(7)
+    vocabulary = list(sia.lexicon)[::50] + ["team", "pay", "the", "not", "very", "but", "this", "so",
+                                            "never", "kind", "of", "least", "HR", "GOOD", ":)", "don't"]
+    suffixes = ["", "", "", "!", "?", ".", ",", "!!", "...", "?!?"]
+    texts = [" ".join(rng.choice(vocabulary) + rng.choice(suffixes) for _ in range(rng.randint(0, 20)))
+             for _ in range(2000)]
+
+    scorer = VaderBatchScorer(sia)
+
+    assert scorer.compound_scores(texts) == [sia.polarity_scores(text)["compound"] for text in texts]
+
+
+def test_duplicate_texts_share_scores(sia):
+    scores = VaderBatchScorer(sia).compound_scores(["good job", "bad day", "good job"])
+
+    assert scores[0] == scores[2]
+    assert len(scores) == 3
@@ -0,0 +1,91 @@
+# test_job_profile.py
+import json
+
+from utils.gemini_api import GeminiAPI
+from utils.job_profile import JobProfile, get_job_profile, find_skills
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+About us:
+We are a fast growing HR tech company founded 10 years ago.
+
+Key Responsibilities
+- Design and build REST APIs in Python and Django
+- Own our PostgreSQL data model
+
+Requirements:
+- 5+ years of professional experience with Python
+- Experience with AWS and Docker
+- Bachelor's degree in Computer Science; Master's preferred
+
+Nice to have:
+- Kubernetes
+- Experience with Kafka
+"""
+
+
+class RecordingModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return type("Response", (), {"text": json.dumps({"match_score": 75})})()
+
+
+def test_profile_extracts_structured_requirements():
+    profile = JobProfile(JOB_DESCRIPTION)
+    assert profile.title == "Senior Backend Engineer"
+    assert profile.seniority == "senior"
+    assert profile.min_years_experience == 5
+    assert profile.education == "Bachelor's degree"
+    assert profile.required_skills == ["Python", "AWS", "Docker", "REST APIs", "Django", "PostgreSQL"]
+    assert profile.preferred_skills == ["Kubernetes", "Kafka"]
+    assert "Experience with Kafka" not in profile.key_requirements
+
+
+def test_profiles_are_cached_by_normalized_hash():
+    assert get_job_profile(JOB_DESCRIPTION) is get_job_profile(JOB_DESCRIPTION.replace("\n", "\n  "))
+
+
+def test_local_skill_match():
+    match = JobProfile(JOB_DESCRIPTION).match_skills("Python and Django developer, some AWS, learning Kafka")
+    assert match["matched"] == ["Python", "AWS", "Django"]
+    assert match["missing"] == ["Docker", "REST APIs", "PostgreSQL"]
+    assert match["preferred_matched"] == ["Kafka"]
+    assert match["coverage"] == 50
+
+
+def test_skill_aliases_respect_word_boundaries():
+    assert find_skills("C++ and C#, PostgreSQL, JavaScript, k8s") == ["C++", "C#", "PostgreSQL", "JavaScript",
+                                                                     "Kubernetes"]
+
+
+def test_prompt_carries_profile_ahead_of_the_description():
+    model = RecordingModel()
+    api = GeminiAPI(model=model)
+    api.response_cache = None
+    result = api.analyze_resume("Python developer", JOB_DESCRIPTION, get_job_profile(JOB_DESCRIPTION))
+    prompt = model.prompts[0]
+    assert prompt.index("Required skills: Python, AWS, Docker") < prompt.index("- Experience with Kafka")
+    assert "founded 10 years ago" in prompt
+    assert result["prompt_tokens"]["job_profile_used"] is True
+
+
+def test_fields_that_are_not_clearly_stated_are_left_out():
+    profile = JobProfile("Finance Analyst\n\nWe welcome graduate hires and report to the Engineering Manager.\n\n"
+                         "Requirements:\n- Advanced MS Excel\n- A degree in finance or economics")
+    assert (profile.seniority, profile.education) == (None, None)
+    assert "Seniority" not in profile.to_prompt() and "Education" not in profile.to_prompt()
+
+    profile = JobProfile("Graduate Data Analyst\n\nRequirements:\n- M.Sc. or Ph.D. in Statistics\n- SQL")
+    assert (profile.seniority, profile.education) == ("junior", "Master's degree")
+
+
+def test_everyday_words_are_not_skills():
+    text = ("We rest on Fridays, start each spring with a node offsite and excel at sales. Security badges "
+            "and communication are handled by the office.")
+    assert find_skills(text) == []
+    assert find_skills("Spring Boot and Node.js REST APIs, Microsoft Excel, strong communication skills, "
+                       "network security, B2B sales") == ["Spring", "Node.js", "REST APIs", "Excel",
+                                                         "Communication", "Security", "Sales"]
@@ -0,0 +1,140 @@
+# test_job_queue.py
+import os
+import sys
+import time
+import sqlite3
+import subprocess
+import threading
+
+import pytest
+
+from utils.job_queue import JobQueue, JobWorkerPool
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), retention_seconds=60, stale_seconds=0.2, max_attempts=2)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_jobs_are_claimed_once_and_finished_with_their_token(queue):
+    job_id = queue.enqueue("screen_resume", {"file_name": "cv.txt"}, b"resume")
+    assert queue.get(job_id)["status"] == "queued"
+
+    job = queue.claim()
+    assert (job["id"], job["payload"], job["file_data"], job["attempt"]) == (job_id, {"file_name": "cv.txt"},
+                                                                           b"resume", 1)
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == "running"
+
+    assert not queue.finish(job_id, {"match_score": 1}, "someone-else")
+    assert queue.finish(job_id, {"match_score": 80}, job["token"])
+    assert queue.get(job_id)["result"] == {"match_score": 80}
+    assert queue.get(job_id)["status"] == "success"
+    assert queue.get("missing") is None
+
+
+def test_heartbeats_keep_long_jobs_from_being_requeued(queue):
+    job_id = queue.enqueue("screen_resume", {})
+    job = queue.claim()
+    for _ in range(4):
+        time.sleep(0.1)
+        assert queue.heartbeat(job_id, job["token"])
+        queue.maintain()
+    assert queue.get(job_id)["status"] == "running"
+    assert queue.claim() is None
+
+
+def test_lost_jobs_are_requeued_and_the_old_claim_cannot_finish(queue):
+    job_id = queue.enqueue("screen_resume", {})
+    first = queue.claim()
+    time.sleep(0.3)
+    queue.maintain()
+    assert queue.get(job_id)["status"] == "queued"
+    assert not queue.heartbeat(job_id, first["token"])
+
+    second = queue.claim()
+    assert second["attempt"] == 2
+    assert not queue.finish(job_id, {"match_score": 1}, first["token"])
+    assert queue.finish(job_id, {"match_score": 2}, second["token"])
+    assert queue.get(job_id)["result"] == {"match_score": 2}
+
+
+def test_jobs_that_keep_losing_their_worker_fail(queue):
+    job_id = queue.enqueue("screen_resume", {}, b"file")
+    for _ in range(2):
+        assert queue.claim()["id"] == job_id
+        time.sleep(0.3)
+        queue.maintain()
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "abandoned" in job["result"]["error"]
+    assert queue.claim() is None
+
+
+def test_databases_without_claim_columns_are_upgraded(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                 "payload TEXT NOT NULL, file_data BLOB, result TEXT, created_at REAL NOT NULL, "
+                 "updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO jobs VALUES ('old', 'screen_resume', 'queued', '{}', NULL, NULL, 1, 1)")
+    conn.commit()
+    conn.close()
+
+    queue = JobQueue(path, retention_seconds=60, stale_seconds=60)
+    job = queue.claim()
+    assert (job["id"], job["attempt"]) == ("old", 1)
+    assert queue.finish("old", {"ok": True}, job["token"])
+
+
+def test_worker_pool_runs_jobs_and_sends_heartbeats(queue):
+    release = threading.Event()
+    pool = JobWorkerPool(queue, num_workers=1, poll_interval=0.02, heartbeat_interval=0.05)
+    pool.register("slow", lambda payload, file_data: release.wait(5) and {"echo": payload["n"]})
+    pool.register("broken", lambda payload, file_data: 1 / 0)
+    pool.start()
+    pool.start()
+    assert len([thread for thread in pool._threads if thread.name.startswith("job-worker")]) == 1
+
+    slow = queue.enqueue("slow", {"n": 7})
+    broken = queue.enqueue("broken", {})
+    unknown = queue.enqueue("unknown", {})
+    pool.notify()
+    # Running past stale_seconds is fine while the heartbeat thread keeps the claim alive
+    time.sleep(0.5)
+    queue.maintain()
+    assert queue.get(slow)["status"] == "running"
+    release.set()
+
+    assert wait_for(lambda: queue.get(unknown)["status"] == "failed")
+    assert queue.get(slow)["result"] == {"echo": 7}
+    assert "division by zero" in queue.get(broken)["result"]["error"]
+
+
+def test_importing_the_app_starts_no_job_threads(tmp_path):
+    child = ("import threading, app; "
+             "print(sorted(t.name for t in threading.enumerate() if t.name.startswith('job-')))")
+    env = dict(os.environ, GEMINI_BACKEND="standin", CACHE_FOLDER=str(tmp_path / "cache"),
+               DATA_FOLDER=str(tmp_path / "data"))
+    proc = subprocess.run([sys.executable, "-c", child], cwd=ROOT, env=env, capture_output=True, text=True,
+                          timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_the_first_request_starts_the_job_workers(web):
+    web.app.test_client().get("/metrics")
+    assert web.job_workers._pid == os.getpid()
+    assert all(thread.is_alive() for thread in web.job_workers._threads)
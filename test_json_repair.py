@@ -0,0 +1,115 @@
+# test_json_repair.py
+import json
+import time
+
+import pytest
+
+from utils.gemini_api import GeminiAPI
+from utils.json_repair import parse_json_response, PARSE_COUNTER
+from utils.response_cache import ResponseCache
+
+
+def test_plain_json_is_parsed_directly():
+    assert parse_json_response('{"match_score": 80}') == ({"match_score": 80}, "direct")
+
+
+def test_object_is_extracted_from_fences_and_prose():
+    text = 'Here is the analysis:\n```json\n{"a": {"b": [1, 2]}, "s": "brace } in string"}\n```\nThanks!'
+    assert parse_json_response(text) == ({"a": {"b": [1, 2]}, "s": "brace } in string"}, "extracted")
+
+
+def test_bracketed_prose_before_the_value_is_skipped():
+    assert parse_json_response('Filled in the {template} for you: {"a": 1}') == ({"a": 1}, "extracted")
+    assert parse_json_response('text {bad} then [x] then {"a":1}') == ({"a": 1}, "extracted")
+    with pytest.raises(ValueError):
+        parse_json_response('{bad} and {worse}')
+
+def test_comments_trailing_commas_and_raw_newlines_are_repaired():
+    text = '{\n  "match_score": 85,  // overall\n  "skills": ["Python", "AWS",],\n  "note": "two\nlines",\n}'
+    value, outcome = parse_json_response(text)
+    assert value == {"match_score": 85, "skills": ["Python", "AWS"], "note": "two\nlines"}
+    assert outcome == "repaired"
+
+
+@pytest.mark.parametrize("truncated, expected", [
+    ('{"score": 0.5, "concerns": ["pay", "hours"', {"score": 0.5}),
+    ('{"score": 0.5, "risk', {"score": 0.5}),
+    ('{"score": 0.5, "risk": ', {"score": 0.5}),
+    ('{"score": 0.5, "nested": {"a": tru', {"score": 0.5}),
+    ('{"skills": ["Python"], "match_score": 8', {"skills": ["Python"]}),
+    ('{"match_score": 80, "recommendation": "Do not', {"match_score": 80}),
+    ('{"a": {"b": [1, 2]}, "c": [3', {"a": {"b": [1, 2]}}),
+])
+def test_truncated_replies_keep_only_complete_elements(truncated, expected):
+    assert parse_json_response(truncated) == (expected, "truncated")
+
+
+@pytest.mark.parametrize("truncated, expected_type", [
+    ('{"match_score": 8', dict),
+    ('{"summary": "Good team, but', dict),
+    ('["Py', list),
+])
+def test_a_cut_off_first_value_is_never_closed(truncated, expected_type):
+    with pytest.raises(ValueError):
+        parse_json_response(truncated, expected=expected_type)
+
+
+def test_arrays_and_failures():
+    assert parse_json_response('Result: [{"id": "1"}, {"id": "2"', expected=list) == ([{"id": "1"}], "truncated")
+    assert parse_json_response('[{"id": "1"}, {"id": "2"},]', expected=list) == \
+        ([{"id": "1"}, {"id": "2"}], "repaired")
+    failed_before = PARSE_COUNTER.samples().get(("failed",), 0)
+    with pytest.raises(ValueError):
+        parse_json_response("no json here")
+    assert PARSE_COUNTER.samples()[("failed",)] == failed_before + 1
+
+
+def test_scan_is_linear_on_large_malformed_input():
+    text = "{" + '"k": [' * 2000 + "x" * 200000
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        parse_json_response(text)
+    assert time.perf_counter() - start < 2.0
+
+    text = "{x} " * 50000 + '{"a": 1}'
+    start = time.perf_counter()
+    assert parse_json_response(text) == ({"a": 1}, "extracted")
+    assert time.perf_counter() - start < 2.0
+
+
+def test_gemini_api_uses_repairing_parser():
+    api = GeminiAPI(model=object())
+    assert api._safe_json_parse('```json\n{"sentiment_score": 0.4,}\n```') == {"sentiment_score": 0.4}
+    assert api._safe_json_parse("nothing")["status"] == "failed"
+    assert json.loads(json.dumps(api._parse_json_array('[{"id": "1"}]'))) == [{"id": "1"}]
+
+
+def test_json_mode_is_requested_only_when_supported(monkeypatch):
+    import utils.gemini_api as gemini_api
+    monkeypatch.setattr(gemini_api, "SUPPORTS_JSON_MIME_TYPE", False)
+    assert GeminiAPI._json_mode_config(gemini_api.RESUME_SCHEMA) is None
+    assert GeminiAPI._json_mode_config(gemini_api.RESUME_SCHEMA, {"max_output_tokens": 10}) == {"max_output_tokens": 10}
+
+    monkeypatch.setattr(gemini_api, "SUPPORTS_JSON_MIME_TYPE", True)
+    monkeypatch.setattr(gemini_api, "SUPPORTS_RESPONSE_SCHEMA", True)
+    config = GeminiAPI._json_mode_config(gemini_api.RESUME_SCHEMA)
+    assert config["response_mime_type"] == "application/json"
+    assert config["response_schema"]["required"][0] == "match_score"
+
+
+def test_cut_off_replies_are_not_cached():
+    class CutOffModel:
+        calls = 0
+
+        def generate_content(self, prompt, **kwargs):
+            self.calls += 1
+            return type("Response", (), {"text": '{"skills_matched": ["Python"], "match_score": 8'})()
+
+    model = CutOffModel()
+    api = GeminiAPI(model=model)
+    api.response_cache = ResponseCache(ttl_seconds=60, max_entries=16)
+    for _ in range(2):
+        result = api.analyze_resume("Python developer", "Needs Python")
+        assert "match_score" not in result and result["truncated"] is True
+    assert model.calls == 2
+    assert api.response_cache.stats()["memory_entries"] == 0
@@ -0,0 +1,100 @@
+# test_metrics.py
+import os
+import sys
+import asyncio
+import subprocess
+
+from utils import async_gemini
+from utils.metrics import Registry, Trace, span, timed, activate_trace, deactivate_trace, STAGE_LATENCY
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_prometheus_exposition():
+    registry = Registry()
+    counter = registry.counter("widgets_total", "Widgets made", ("color",))
+    counter.inc(color='blue "navy"')
+    counter.inc(2, color="red")
+    histogram = registry.histogram("wait_seconds", "Waiting", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(3.0)
+
+    lines = registry.expose().splitlines()
+    assert "# TYPE widgets_total counter" in lines
+    assert 'widgets_total{color="blue \\"navy\\""} 1' in lines
+    assert 'widgets_total{color="red"} 2' in lines
+    assert "# TYPE wait_seconds histogram" in lines
+    assert 'wait_seconds_bucket{le="0.1"} 1' in lines
+    assert 'wait_seconds_bucket{le="1"} 1' in lines
+    assert 'wait_seconds_bucket{le="+Inf"} 2' in lines
+    assert "wait_seconds_count 2" in lines
+
+
+def test_spans_are_added_to_the_active_trace_only():
+    with span("test.outside"):
+        pass
+
+    trace = Trace()
+    token = activate_trace(trace)
+    try:
+        for _ in range(3):
+            with span("test.page"):
+                pass
+    finally:
+        deactivate_trace(token)
+
+    assert list(trace.stages()) == ["test.page"]
+    assert trace.stages()["test.page"][1] == 3
+    header = trace.server_timing()
+    assert header.startswith('test.page;dur=') and 'desc="x3"' in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+    assert STAGE_LATENCY.samples()[("test.outside",)]["count"] >= 1
+
+
+def test_trace_follows_calls_onto_the_gemini_loop():
+    @timed("test.remote")
+    def work():
+        return 42
+
+    async def remote():
+        await asyncio.sleep(0)
+        return work()
+
+    trace = Trace()
+    token = activate_trace(trace)
+    try:
+        assert async_gemini.run_sync(remote()) == 42
+    finally:
+        deactivate_trace(token)
+    assert "test.remote" in trace.stages()
+
+
+def test_shared_registries_expose_the_sum_over_processes(tmp_path):
+    child = ("from utils.metrics import REGISTRY; REGISTRY.share(%r, 60); "
+             "REGISTRY.counter('jobs_total', 'Jobs', ('kind',)).inc(5, kind='a'); "
+             "REGISTRY.histogram('job_seconds', 'Job time', buckets=(1.0,)).observe(2.0)" % str(tmp_path))
+    subprocess.run([sys.executable, "-c", child], cwd=ROOT, check=True, timeout=60)
+
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job time", buckets=(1.0,))
+    registry.share(str(tmp_path), interval=60)
+    counter.inc(kind="a")
+    counter.inc(kind="b")
+    histogram.observe(0.5)
+
+    lines = registry.expose().splitlines()
+    assert 'jobs_total{kind="a"} 6' in lines
+    assert 'jobs_total{kind="b"} 1' in lines
+    assert 'job_seconds_bucket{le="1"} 1' in lines
+    assert 'job_seconds_bucket{le="+Inf"} 2' in lines
+    assert "job_seconds_sum 2.5" in lines
+    assert len(list(tmp_path.glob("metrics-*.json"))) == 2
+
+
+def test_unshared_registries_expose_their_own_samples(tmp_path):
+    registry = Registry()
+    registry.share("")
+    registry.counter("jobs_total", "Jobs").inc()
+    assert "jobs_total 1" in registry.expose().splitlines()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,69 @@
+# test_model_backends.py
+import json
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from config import Config
+from utils.gemini_api import GeminiAPI
+from utils.model_backends import StandInModel, create_model
+from utils.async_gemini import RETRYABLE_ERRORS, run_sync
+
+JOB = "Requirements:\n- 3+ years of experience with Python and SQL\n- Experience with AWS"
+RESUME = "Jane Doe\nSkills\nPython, SQL, Docker\nExperience\nBackend developer, 2018 - 2023"
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    monkeypatch.setattr(Config, "GEMINI_BACKEND", "standin")
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "")
+    monkeypatch.setattr(Config, "STANDIN_LATENCY_SECONDS", 0.0)
+    monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", False)
+
+
+def test_standin_backend_needs_no_key_and_answers_from_the_prompt(standin):
+    api = GeminiAPI()
+    result = api.analyze_resume(RESUME, JOB)
+    assert isinstance(api.model, StandInModel)
+    assert set(result["skills_matched"]) == {"Python", "SQL"}
+    assert result["skills_missing"] == ["AWS"]
+    assert 0 <= result["match_score"] <= 100
+
+    sentiment = run_sync(api.analyze_sentiment_async("My manager is supportive and the team is great"))
+    assert sentiment["sentiment_score"] > 0
+    assert sentiment["attrition_risk"] in ("Low", "Medium", "High")
+
+
+def test_batch_replies_cover_every_item(standin):
+    results = GeminiAPI().analyze_sentiment_batch(["Pay is below market", "Benefits are excellent"])
+    assert len(results) == 2
+    assert results[0]["sentiment_score"] < results[1]["sentiment_score"]
+
+
+def test_replies_depend_only_on_prompt_and_seed():
+    prompt = f"Job Description:\n{JOB}\n\nResume:\n{RESUME}\n\nProvide a comprehensive analysis"
+    assert StandInModel(seed=1).reply(prompt) == StandInModel(seed=1).reply(prompt)
+    assert json.loads(StandInModel(seed=1).reply(prompt))["skills_missing"] == ["AWS"]
+
+
+def test_injected_errors_are_retryable():
+    model = StandInModel(latency=0, error_rate=1.0)
+    with pytest.raises(RETRYABLE_ERRORS):
+        model.generate_content("Employee Feedback: fine")
+    with pytest.raises((api_exceptions.ResourceExhausted, api_exceptions.ServiceUnavailable)):
+        model.generate_content("Employee Feedback: fine")
+
+
+def test_malformed_replies_go_through_json_repair():
+    model = StandInModel(latency=0)
+    api = GeminiAPI(model=model)
+    reply = model.reply("Employee Feedback: the team is great")
+    for variant in range(4):
+        parsed = api._safe_json_parse(model._mangle(reply, variant))
+        assert "error" not in parsed and "sentiment_score" in parsed
+    assert api._safe_json_parse(model._mangle(reply, 4))["status"] == "failed"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_model("gemini-1.5-flash-latest", {}, backend="nope")
@@ -0,0 +1,68 @@
+# test_ocr_engine.py
+import os
+import sys
+import types
+import subprocess
+import threading
+
+import pytest
+
+from config import Config
+from utils import ocr_engine
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def fake_easyocr(monkeypatch):
+    """Replace easyocr with a module whose Reader counts how often the models are loaded"""
+    loads = []
+
+    class Reader:
+        def __init__(self, languages):
+            loads.append(languages)
+
+        def readtext(self, image, batch_size=1):
+            return [([0, 0], "Jane", 0.9), ([0, 1], "Doe", 0.8)]
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=Reader))
+    monkeypatch.setattr(ocr_engine, "_reader", None)
+    return loads
+
+
+def test_reader_is_loaded_once_on_first_use(fake_easyocr):
+    assert not ocr_engine.is_loaded()
+    threads = [threading.Thread(target=ocr_engine.get_reader) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_easyocr == [Config.OCR_LANGUAGES]
+    assert ocr_engine.is_loaded()
+    assert ocr_engine.readtext(b"image") == "Jane Doe"
+
+
+def test_preload_loads_the_reader_with_the_processor(fake_easyocr, monkeypatch):
+    from utils.resume_processor import ResumeProcessor
+    monkeypatch.setattr(Config, "GEMINI_BACKEND", "standin")
+    monkeypatch.setattr(Config, "EXTRACTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "OCR_PAGE_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "CANDIDATE_STORE_ENABLED", False)
+
+    ResumeProcessor()
+    assert fake_easyocr == []
+    monkeypatch.setattr(Config, "OCR_PRELOAD", True)
+    ResumeProcessor()
+    assert len(fake_easyocr) == 1
+
+
+def test_importing_the_app_does_not_load_torch(tmp_path):
+    child = ("import sys, app; "
+             "print(sorted(name for name in ('easyocr', 'torch') if name in sys.modules))")
+    env = dict(os.environ, GEMINI_BACKEND="standin", OCR_PRELOAD="false",
+               CACHE_FOLDER=str(tmp_path / "cache"), DATA_FOLDER=str(tmp_path / "data"))
+    proc = subprocess.run([sys.executable, "-c", child], cwd=ROOT, env=env, capture_output=True, text=True,
+                          timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,121 @@
+# test_ocr_pool.py
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from config import Config
+from utils import ocr_pool
+from utils import ocr_service
+from utils.text_cache import TextCache
+from utils.resume_processor import ResumeProcessor
+
+
+class ThreadedOCR:
+    """Stands in for the OCR pool: later pages finish first, and concurrency per request is recorded"""
+
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self.submitted = 0
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(8)
+
+    def _readtext(self, image):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05 / (1 + image[0, 0, 0]))
+        with self._lock:
+            self.running -= 1
+        return f"page {image[0, 0, 0]}"
+
+    def submit(self, image):
+        self.submitted += 1
+        return self._executor.submit(self._readtext, image)
+
+
+def make_processor(tmp_path, cache=True):
+    processor = ResumeProcessor.__new__(ResumeProcessor)
+    processor.page_cache = TextCache(str(tmp_path / "pages.sqlite3"), 1024 * 1024) if cache else None
+    return processor
+
+
+def fake_pages(count):
+    def render(pdf_source, page_numbers=None):
+        for page_num in (range(count) if page_numbers is None else page_numbers):
+            yield np.full((4, 4, 3), page_num, dtype=np.uint8)
+    return render
+
+
+@pytest.fixture
+def local_pool(monkeypatch):
+    pool = ThreadedOCR(max_in_flight=2)
+    # The fake pages carry their page number in the pixels
+    monkeypatch.setattr(Config, "OCR_PREPROCESS_ENABLED", False)
+    monkeypatch.setattr(ocr_service, "get_client", lambda: None)
+    monkeypatch.setattr(ocr_pool, "get_pool", lambda: pool)
+    return pool
+
+
+def test_pages_come_back_in_order_with_a_per_request_cap(tmp_path, local_pool):
+    processor = make_processor(tmp_path, cache=False)
+    processor.iter_pdf_page_images = fake_pages(6)
+    assert processor.ocr_pdf_pages(b"") == [f"page {n}" for n in range(6)]
+    assert local_pool.peak <= 2
+
+
+def test_cached_pages_are_not_ocrd_again(tmp_path, local_pool):
+    processor = make_processor(tmp_path)
+    processor.iter_pdf_page_images = fake_pages(3)
+    first = processor.ocr_pdf_pages(b"")
+    second = processor.ocr_pdf_pages(b"", page_numbers=[2, 0])
+    assert second == [first[2], first[0]]
+    assert local_pool.submitted == 3
+
+
+def test_ocr_stays_in_process_unless_a_pool_is_configured(monkeypatch):
+    monkeypatch.setattr(Config, "OCR_SERVICE_ENABLED", False)
+    monkeypatch.setattr(Config, "OCR_LOCAL_WORKERS", 1)
+    assert ocr_pool.get_pool() is None
+
+
+def test_pool_size_and_pages_per_request(monkeypatch):
+    # 0 sizes the pool from the cores
+    monkeypatch.setattr(Config, "OCR_LOCAL_WORKERS", 0)
+    monkeypatch.setattr(Config, "OCR_TORCH_THREADS", 2)
+    monkeypatch.setattr(ocr_pool.os, "cpu_count", lambda: 6)
+    assert ocr_pool.pool_size() == 3
+    monkeypatch.setattr(Config, "OCR_MAX_CORES_PER_REQUEST", 4)
+    assert ocr_service.pages_per_request(2) == 2
+    assert ocr_pool.OCRPool(3, 2).max_in_flight == 2
+    monkeypatch.setattr(Config, "OCR_LOCAL_WORKERS", 1)
+    monkeypatch.setattr(Config, "OCR_SERVICE_ENABLED", False)
+    assert ocr_pool.get_pool() is None
+
+
+def test_pages_that_take_too_long_are_skipped(tmp_path, local_pool, monkeypatch):
+    monkeypatch.setattr(Config, "OCR_PAGE_TIMEOUT_SECONDS", 0.2)
+    release = threading.Event()
+    readtext = local_pool._readtext
+    # Page 0 hangs; the other pages finish normally
+    local_pool._readtext = lambda image: release.wait(5) if image[0, 0, 0] == 0 else readtext(image)
+    processor = make_processor(tmp_path)
+    processor.iter_pdf_page_images = fake_pages(3)
+
+    start = time.perf_counter()
+    texts = processor.ocr_pdf_pages(b"")
+    release.set()
+    assert time.perf_counter() - start < 1.0
+    assert texts[0].startswith("Error: OCR timed out") and texts[1:] == ["page 1", "page 2"]
+    assert processor.page_cache.get(processor._page_cache_key(np.full((4, 4, 3), 0, dtype=np.uint8))) is None
+
+
+def test_single_images_time_out_on_the_pool(monkeypatch):
+    monkeypatch.setattr(Config, "OCR_PAGE_TIMEOUT_SECONDS", 0.1)
+    pool = ocr_pool.OCRPool(2, 1)
+    monkeypatch.setattr(pool, "submit", lambda image: ThreadPoolExecutor(1).submit(time.sleep, 1))
+    assert pool.readtext(b"image").startswith("Error: OCR timed out")
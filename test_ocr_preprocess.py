@@ -0,0 +1,55 @@
+# test_ocr_preprocess.py
+import cv2
+import numpy as np
+import pytest
+
+from config import Config
+from utils import ocr_preprocess
+
+
+def make_page(text_scale=1.2, skew=0.0):
+    """White RGB page with a block of text lines, optionally rotated counter-clockwise"""
+    page = np.full((1400, 1000, 3), 255, dtype=np.uint8)
+    for line in range(12):
+        cv2.putText(page, f"Experienced engineer, line {line} of the summary", (120, 200 + line * 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, text_scale, (0, 0, 0), 2)
+    if skew:
+        page = np.dstack([ocr_preprocess.rotate(page[:, :, 0], skew)] * 3)
+    return page
+
+
+@pytest.mark.parametrize("skew", [0.0, 2.0, -3.5])
+def test_skew_is_estimated_and_removed(skew):
+    page = make_page(skew=skew)
+    gray = ocr_preprocess.to_grayscale(page)
+    assert ocr_preprocess.estimate_skew(ocr_preprocess._ink_mask(gray)) == pytest.approx(-skew, abs=0.3)
+    result = ocr_preprocess.preprocess(page)
+    assert ocr_preprocess.estimate_skew(ocr_preprocess._ink_mask(result)) == pytest.approx(0.0, abs=0.3)
+
+
+def test_output_is_cropped_grayscale_and_downscaled_to_the_target_glyph_height(monkeypatch):
+    monkeypatch.setattr(Config, "OCR_TARGET_TEXT_HEIGHT", 12)
+    page = make_page(text_scale=2.0)
+    result = ocr_preprocess.preprocess(page)
+    assert result.ndim == 2
+    assert result.shape[0] < page.shape[0] and result.shape[1] < page.shape[1]
+    _, glyph_height = ocr_preprocess.find_glyphs(ocr_preprocess._ink_mask(result))
+    assert glyph_height == pytest.approx(12, abs=2)
+
+
+def test_small_text_and_blank_pages_are_not_scaled():
+    blank = np.full((200, 300, 3), 255, dtype=np.uint8)
+    assert ocr_preprocess.preprocess(blank).shape == (200, 300)
+    small = make_page(text_scale=0.4)
+    _, before = ocr_preprocess.find_glyphs(ocr_preprocess._ink_mask(ocr_preprocess.to_grayscale(small)))
+    _, after = ocr_preprocess.find_glyphs(ocr_preprocess._ink_mask(ocr_preprocess.preprocess(small)))
+    assert after == before
+
+
+def test_prepare_decodes_encoded_images_only_when_enabled(monkeypatch):
+    encoded = cv2.imencode(".png", make_page())[1].tobytes()
+    monkeypatch.setattr(Config, "OCR_PREPROCESS_ENABLED", True)
+    assert ocr_preprocess.prepare(encoded).ndim == 2
+    assert ocr_preprocess.prepare(b"not an image") == b"not an image"
+    monkeypatch.setattr(Config, "OCR_PREPROCESS_ENABLED", False)
+    assert ocr_preprocess.prepare(encoded) is encoded
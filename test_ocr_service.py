@@ -0,0 +1,38 @@
+# test_ocr_service.py
+import pytest
+
+from config import Config
+from utils import ocr_service
+
+
+@pytest.fixture
+def service_config(monkeypatch):
+    monkeypatch.setattr(Config, "OCR_SERVICE_AUTHKEY", "s3cret-ocr-key")
+    monkeypatch.setattr(Config, "OCR_SERVICE_HOST", "127.0.0.1")
+    monkeypatch.setattr(Config, "OCR_SERVICE_PORT", 50055)
+    monkeypatch.setattr(Config, "OCR_SERVICE_SOCKET", "")
+
+
+@pytest.mark.parametrize("key", ["", "dev-secret"])
+def test_refuses_a_missing_or_public_key(service_config, monkeypatch, key):
+    monkeypatch.setattr(Config, "OCR_SERVICE_AUTHKEY", key)
+    with pytest.raises(ValueError, match="OCR_SERVICE_AUTHKEY"):
+        ocr_service.service_settings()
+    with pytest.raises(ValueError):
+        ocr_service.OCRClient()
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "10.0.0.5", "ocr.internal", "::"])
+def test_refuses_non_loopback_addresses(service_config, monkeypatch, host):
+    monkeypatch.setattr(Config, "OCR_SERVICE_HOST", host)
+    with pytest.raises(ValueError, match="loopback"):
+        ocr_service.service_settings()
+
+
+def test_loopback_or_unix_socket(service_config, monkeypatch):
+    assert ocr_service.service_settings() == (("127.0.0.1", 50055), b"s3cret-ocr-key")
+    monkeypatch.setattr(Config, "OCR_SERVICE_HOST", "::1")
+    assert ocr_service.service_settings()[0] == ("::1", 50055)
+    monkeypatch.setattr(Config, "OCR_SERVICE_HOST", "0.0.0.0")
+    monkeypatch.setattr(Config, "OCR_SERVICE_SOCKET", "/run/engagebot/ocr.sock")
+    assert ocr_service.service_settings()[0] == "/run/engagebot/ocr.sock"
@@ -0,0 +1,45 @@
+# test_prescreen.py
+from utils.job_profile import skills_match_score
+from utils.prescreen import PrescreenIndex, prescreen
+
+JOB_DESCRIPTION = """Data Engineer
+
+Requirements:
+- 3+ years of experience with Python and SQL
+- Experience with Spark and Airflow
+- Familiarity with AWS
+"""
+
+RESUMES = [
+    "Accountant with GAAP and Excel experience. Payroll processing.",
+    "Data engineer: Python, SQL, Spark, Airflow pipelines on AWS for 4 years.",
+    "Backend developer using Python and SQL. Some AWS.",
+    "Graphic designer, Figma and branding.",
+]
+
+
+def test_index_is_incremental_and_ignores_duplicates():
+    index = PrescreenIndex()
+    assert index.add("a", "python sql spark")
+    assert index.add("b", "excel payroll")
+    assert not index.add("a", "python sql spark")
+    assert len(index) == 2
+    first = index.score("python spark", ["a", "b"])
+    index.add("c", "python django")
+    # A new document changes term weights without a rebuild
+    second = index.score("python spark", ["a", "b", "c"])
+    assert first[1] == second[1] == 0.0
+    assert second[0] != first[0]
+    assert second[2] > 0
+
+
+def test_prescreen_shortlists_the_best_matches_in_input_order():
+    ranking = prescreen(JOB_DESCRIPTION, RESUMES, top_n=2)
+    assert [r["prescreen_rank"] for r in ranking] == [3, 1, 2, 4]
+    assert [r["shortlisted"] for r in ranking] == [False, True, True, False]
+    assert ranking == prescreen(JOB_DESCRIPTION, RESUMES, top_n=2)
+
+
+def test_skills_match_score_matches_the_fallback():
+    assert skills_match_score(["Python", "SQL", "AWS"], ["Spark"]) == 75
+    assert skills_match_score([], []) == 50
@@ -0,0 +1,142 @@
+# test_response_cache.py
+import json
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.gemini_api import GeminiAPI
+from utils.response_cache import ResponseCache
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Stand-in for genai.GenerativeModel that counts upstream calls"""
+
+    def __init__(self, text=None, delay=0.0):
+        self.text = text or json.dumps({"match_score": 80, "skills_matched": ["Python"], "skills_missing": []})
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return StubResponse(self.text)
+
+
+def make_api(model, tmp_path=None, ttl=60):
+    api = GeminiAPI(model=model)
+    api.response_cache = ResponseCache(ttl_seconds=ttl, max_entries=16,
+                                       disk_path=str(tmp_path / "llm.sqlite3") if tmp_path else None)
+    return api
+
+
+def test_identical_requests_hit_cache():
+    model = StubModel()
+    api = make_api(model)
+
+    first = api.analyze_resume("Python developer", "Needs Python")
+    # Whitespace-only differences normalize to the same prompt
+    second = api.analyze_resume("Python   developer", "Needs Python ")
+
+    assert first == second
+    assert model.calls == 1
+    assert api.response_cache.stats()["memory_hits"] == 1
+
+
+def test_cached_results_are_isolated_copies():
+    api = make_api(StubModel())
+
+    first = api.analyze_resume("resume", "job")
+    first["skills_matched"].append("Mutated")
+
+    assert api.analyze_resume("resume", "job")["skills_matched"] == ["Python"]
+
+
+def test_errors_are_not_cached():
+    model = StubModel(text="not json at all")
+    api = make_api(model)
+
+    assert "error" in api.analyze_resume("resume", "job")
+    assert "error" in api.analyze_resume("resume", "job")
+    assert model.calls == 2
+
+
+def test_ttl_expiry():
+    model = StubModel()
+    api = make_api(model, ttl=0.05)
+
+    api.analyze_resume("resume", "job")
+    time.sleep(0.1)
+    api.analyze_resume("resume", "job")
+
+    assert model.calls == 2
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    model = StubModel(delay=0.2)
+    api = make_api(model)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: api.analyze_resume("resume", "job"), range(8)))
+
+    assert model.calls == 1
+    assert all(r == results[0] for r in results)
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    sentiment = json.dumps({"sentiment_score": 0.5, "engagement_recommendations": ["a", "b", "c"]})
+    model = StubModel(text=sentiment)
+
+    make_api(model, tmp_path).analyze_sentiment("Great team")
+    result = make_api(model, tmp_path).analyze_sentiment("Great team")
+
+    assert result["sentiment_score"] == 0.5
+    assert model.calls == 1
+
+
+def test_key_depends_on_model_and_config():
+    base = ResponseCache.make_key("prompt", "model-a", {"temperature": 0.7})
+
+    assert base != ResponseCache.make_key("prompt", "model-b", {"temperature": 0.7})
+    assert base != ResponseCache.make_key("prompt", "model-a", {"temperature": 0.2})
+
+
+def test_a_caller_arriving_during_the_computation_never_computes_again(tmp_path):
+    cache = ResponseCache(ttl_seconds=60, max_entries=16, disk_path=str(tmp_path / "llm.sqlite3"))
+    computing, late_lookup, leader_done = threading.Event(), threading.Event(), threading.Event()
+    calls = []
+    connect = cache._connect
+
+    @contextmanager
+    def slow_connect():
+        with connect() as conn:
+            yield conn
+        # A late caller that looks the key up outside the lock finishes its lookup only after the leader is done
+        if threading.current_thread().name == "late":
+            late_lookup.set()
+            leader_done.wait(5)
+
+    def compute():
+        calls.append(threading.current_thread().name)
+        computing.set()
+        late_lookup.wait(0.5)
+        return {"value": 1}
+
+    cache._connect = slow_connect
+    leader = threading.Thread(target=cache.get_or_compute, args=("key", compute), name="leader")
+    late = threading.Thread(target=cache.get_or_compute, args=("key", compute), name="late")
+    leader.start()
+    computing.wait(5)
+    late.start()
+    leader.join()
+    leader_done.set()
+    late.join()
+
+    assert calls == ["leader"]
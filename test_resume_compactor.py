@@ -0,0 +1,106 @@
+# test_resume_compactor.py
+from utils.resume_compactor import (PAGE_BREAK, compact_resume, compact_job_description, dedupe_repeated_lines,
+                                     normalize_text, split_pages, split_sections)
+
+RESUME_PAGES = [
+    """Jane Doe - Resume
+Jane Doe
+jane@example.com  |  +1 555 0100
+SUMMARY
+Backend engineer with 6 years of Python experience.
+SKILLS
+Python, Django, PostgreSQL, AWS, Docker
+Page 1 of 3""",
+    """Jane Doe - Resume
+EXPERIENCE
+Senior Engineer, Acme Corp (2020 - present)
+Built data pipelines in Python and   AWS.
+Page 2 of 3""",
+    """Jane Doe - Resume
+Education
+B.Sc. Computer Science, State University
+Hobbies
+Chess, hiking, photography, baking, travel
+References
+Available on request
+Page 3 of 3""",
+]
+RESUME = PAGE_BREAK.join(RESUME_PAGES)
+
+
+def test_normalize_collapses_whitespace_and_drops_debris():
+    lines = normalize_text("Built   pipelines\t in Python\n\n\n\n•\nDone")
+    assert lines == ["Built pipelines in Python", "", "Done"]
+
+
+def test_only_page_numbers_at_page_edges_are_dropped():
+    pages = split_pages(PAGE_BREAK.join([
+        "1\nJane Doe\nPhone\n5551234567\nEducation\nState University\n2019\nPage 1 of 2",
+        "Experience\nAcme Corp\n2015\n2",
+    ]))
+    lines = dedupe_repeated_lines(pages)
+    assert lines == ["Jane Doe", "Phone", "5551234567", "Education", "State University", "2019", "",
+                     "Experience", "Acme Corp", "2015"]
+    # Under budget nothing is dropped at all
+    assert "1\nJane Doe" in compact_resume(PAGE_BREAK.join(["1\nJane Doe\n5551234567", "2015"]))["text"]
+
+
+def test_repeated_headers_are_kept_once_over_budget_and_sections_detected():
+    result = compact_resume(RESUME, "Python AWS engineer", token_budget=110)
+    assert result["text"].count("Jane Doe - Resume") == 1
+    assert "Page" not in result["text"]
+    assert result["sections"] == ["contact", "summary", "skills", "experience", "education",
+                                  "interests", "references"]
+    assert result["saved_tokens"] > 0
+
+
+def test_budget_keeps_core_sections_and_drops_low_priority_ones():
+    result = compact_resume(RESUME, "Python AWS engineer", token_budget=75)
+    assert {"skills", "experience", "education"} <= set(result["sections"])
+    assert "references" in result["omitted_sections"]
+    assert result["compacted_tokens"] <= 75
+    # Kept sections stay in document order
+    assert result["text"].index("SKILLS") < result["text"].index("EXPERIENCE") < result["text"].index("Education")
+
+
+def test_single_long_line_is_cut_at_a_word_within_budget():
+    ocr_text = " ".join(["python"] * 2000)
+    result = compact_resume(ocr_text, token_budget=100)
+    assert 0 < result["compacted_tokens"] <= 100
+    assert result["text"].endswith("python")
+
+
+def test_job_description_is_cut_at_a_line_boundary():
+    job = "\n".join(f"Requirement {i}: experience with distributed systems" for i in range(200))
+    result = compact_job_description(job, token_budget=100)
+    assert result["compacted_tokens"] <= 100
+    assert result["text"].splitlines()[-1].endswith("systems")
+
+
+def test_split_sections_starts_with_contact():
+    sections = split_sections(["Jane", "Skills:", "Python"])
+    assert sections == [("contact", ["Jane"]), ("skills", ["Skills:", "Python"])]
+
+
+def test_resumes_under_budget_are_not_deduped():
+    result = compact_resume(RESUME, "Python AWS engineer")
+    assert result["text"].count("Jane Doe - Resume") == 3
+
+
+def test_lines_repeated_inside_pages_are_kept():
+    role = "Software Engineer\nJan 2020 - Dec 2021\nResponsibilities:\nBuilt services"
+    pages = split_pages(PAGE_BREAK.join([
+        f"Jane Doe\n{role}\n{role}\nPage 1",
+        f"Jane Doe\n{role}\n{role}\nPage 2",
+        f"Jane Doe\n{role}\nReferences on request\nPage 3",
+    ]))
+    lines = dedupe_repeated_lines(pages)
+    assert lines.count("Jane Doe") == 1
+    assert lines.count("Software Engineer") == 5
+    assert lines.count("Responsibilities:") == 5
+    assert sum(line.startswith("Jan 20") for line in lines) == 5
+
+
+def test_single_page_text_only_collapses_consecutive_duplicates():
+    text = "Engineer\nEngineer\nEngineer\n2020 - 2021\nDone\nEngineer"
+    assert dedupe_repeated_lines(split_pages(text)) == ["Engineer", "2020 - 2021", "Done", "Engineer"]
@@ -0,0 +1,123 @@
+# test_resume_extraction.py
+import io
+
+import numpy as np
+import fitz
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from config import Config
+from utils import ocr_pool
+from utils import ocr_service
+from utils.resume_processor import ResumeProcessor
+
+
+def make_pdf(pages, size=(612, 792)):
+    """
+    PDF with one page per entry: a string is drawn as text, None leaves the page blank, and
+    "scan" covers the page with an image, as a scanner would
+    """
+    document = fitz.open()
+    for text in pages:
+        page = document.new_page(width=size[0], height=size[1])
+        if text == "scan":
+            page.insert_image(page.rect, pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 60, 80), False))
+        elif text:
+            page.insert_text((50, 60), text, fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """ResumeProcessor without caches whose in-process OCR records the images it is given"""
+    processor = ResumeProcessor.__new__(ResumeProcessor)
+    processor.text_cache = processor.page_cache = processor.candidate_store = None
+    processor.ocr_calls = []
+
+    def fake_ocr(image):
+        processor.ocr_calls.append(image)
+        return f"ocr page {len(processor.ocr_calls)}"
+
+    processor.extract_text_with_easyocr = fake_ocr
+    monkeypatch.setattr(Config, "OCR_PREPROCESS_ENABLED", False)
+    monkeypatch.setattr(ocr_service, "get_client", lambda: None)
+    monkeypatch.setattr(ocr_pool, "get_pool", lambda: None)
+    return processor
+
+
+def test_pages_render_to_rgb_arrays_at_the_target_size(processor, tmp_path):
+    data = make_pdf(["first", "second", "third"])
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(data)
+
+    images = list(processor.iter_pdf_page_images(data))
+    assert len(images) == 3
+    assert all(image.dtype == np.uint8 and image.shape[2] == 3 for image in images)
+    assert abs(max(images[0].shape[:2]) - Config.OCR_TARGET_LONG_SIDE) <= 2
+
+    subset = list(processor.iter_pdf_page_images(str(path), page_numbers=[2, 0]))
+    assert [image.shape for image in subset] == [images[2].shape, images[0].shape]
+
+
+def test_zoom_is_clamped(processor, monkeypatch):
+    monkeypatch.setattr(Config, "OCR_TARGET_LONG_SIDE", 100)
+    monkeypatch.setattr(Config, "OCR_MIN_ZOOM", 1.0)
+    image = next(processor.iter_pdf_page_images(make_pdf(["x"], size=(300, 400))))
+    assert image.shape[:2] == (400, 300)
+
+    monkeypatch.setattr(Config, "OCR_TARGET_LONG_SIDE", 10000)
+    monkeypatch.setattr(Config, "OCR_MAX_ZOOM", 2.0)
+    image = next(processor.iter_pdf_page_images(make_pdf(["x"], size=(300, 400))))
+    assert image.shape[:2] == (800, 600)
+
+
+def test_pages_are_ocrd_from_memory(processor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert processor.ocr_pdf_pages(make_pdf([None, None])) == ["ocr page 1", "ocr page 2"]
+    assert all(isinstance(image, np.ndarray) for image in processor.ocr_calls)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_scanned_pages_are_ocrd_once_even_when_mostly_blank(processor):
+    processor.extract_text_with_easyocr = lambda image: processor.ocr_calls.append(image) or "p."
+    assert processor._extract_text_from_bytes(make_pdf(["scan", "scan", "scan"]), "resume.pdf") == "p.\n\fp.\n\fp.\n"
+    assert len(processor.ocr_calls) == 3
+
+
+def test_short_text_layers_are_ocrd_as_a_fallback(processor):
+    text = processor._extract_text_from_bytes(make_pdf(["Jane Doe", "scan"]), "resume.pdf")
+    # The scanned page is OCR'd first, then the text page because the whole text is still short
+    assert text == "ocr page 2\n\focr page 1\n"
+    assert len(processor.ocr_calls) == 2
+
+
+def test_uploads_over_the_size_limit_are_refused_without_reading_them_whole(processor, monkeypatch):
+    class Stream(io.BytesIO):
+        def __init__(self, data):
+            super().__init__(data)
+            self.reads = []
+
+        def read(self, size=-1):
+            self.reads.append(size)
+            return super().read(size)
+
+    monkeypatch.setattr(Config, "MAX_CONTENT_LENGTH", 16)
+    stream = Stream(b"x" * 1000)
+    text = processor.extract_text(FileStorage(stream=stream, filename="cv.txt"))
+    assert text.startswith("Error: File exceeds the maximum upload size of 16 bytes")
+    assert stream.reads == [17]
+
+    exact = processor.extract_text(FileStorage(stream=io.BytesIO(b"Jane Doe, Python"), filename="cv.txt"))
+    assert exact == "Jane Doe, Python"
+
+
+def test_uploads_are_not_written_to_disk(processor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = make_pdf(["Jane Doe\nSenior Python developer with ten years of experience building APIs and data "
+                     "pipelines on AWS"])
+    text = processor.extract_text(FileStorage(stream=io.BytesIO(data), filename="cv.pdf"))
+    assert text.startswith("Jane Doe")
+    assert processor.ocr_calls == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,120 @@
+# test_sentiment_routing.py
+import json
+import time
+import types
+import threading
+
+import pytest
+import nltk
+
+try:
+    nltk.data.find('sentiment/vader_lexicon.zip')
+except LookupError:
+    pytest.skip("NLTK vader_lexicon is not installed", allow_module_level=True)
+
+from config import Config
+from utils.gemini_api import GeminiAPI
+from utils.sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setattr(Config, "SENTIMENT_ROUTING", "tiered")
+    # The analyzer builds a Gemini client on init; every Gemini call is replaced below
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "test-placeholder-key")
+    analyzer = SentimentAnalyzer()
+    analyzer.gemini_calls = []
+
+    def analyze_sentiment(text):
+        analyzer.gemini_calls.append(text)
+        return {"sentiment_score": 0.1, "attrition_risk": "Medium"}
+
+    def analyze_sentiment_batch(texts):
+        analyzer.gemini_calls.extend(texts)
+        return [{"sentiment_score": 0.1, "attrition_risk": "Medium"} for _ in texts]
+
+    analyzer.gemini_api.analyze_sentiment = analyze_sentiment
+    analyzer.gemini_api.analyze_sentiment_batch = analyze_sentiment_batch
+    return analyzer
+
+
+def test_clear_cut_feedback_is_answered_locally(analyzer):
+    result = analyzer.analyze("I love my team, the culture is great and wonderful!")
+    assert result["route"] == "local"
+    assert result["interpretation"] == "Very Positive"
+    assert result["attrition_risk"] == "Low"
+    assert result["engagement_recommendations"]
+    assert analyzer.gemini_calls == []
+
+
+def test_ambiguous_or_long_feedback_escalates(analyzer):
+    assert analyzer.analyze("The office is on the third floor.")["route"] == "gemini"
+    long_text = "I love my team and the culture is great. " * 20
+    assert analyzer.analyze(long_text)["route"] == "gemini"
+    assert len(analyzer.gemini_calls) == 2
+
+
+def test_bulk_keeps_input_order_across_routes(analyzer):
+    texts = ["Great amazing wonderful team!", "The office is on the third floor.",
+             "Terrible awful horrible manager!", "It is a job."]
+    results = list(analyzer.analyze_bulk(list(enumerate(texts))))
+    assert [r["id"] for r in results] == [0, 1, 2, 3]
+    assert [r["route"] for r in results] == ["local", "gemini", "local", "gemini"]
+    assert analyzer.gemini_calls == [texts[1], texts[3]]
+
+
+def test_routing_off_sends_everything_to_gemini(analyzer, monkeypatch):
+    monkeypatch.setattr(Config, "SENTIMENT_ROUTING", "gemini")
+    assert analyzer.analyze("I love my team, the culture is great and wonderful!")["route"] == "gemini"
+
+
+def test_failed_batches_and_long_items_run_in_parallel_off_the_request_thread(analyzer, monkeypatch):
+    monkeypatch.setattr(Config, "SENTIMENT_ROUTING", "gemini")
+    monkeypatch.setattr(Config, "BATCH_LLM_CONCURRENCY", 4)
+    monkeypatch.setattr(Config, "SENTIMENT_BATCH_SIZE", 3)
+    monkeypatch.setattr(Config, "SENTIMENT_BATCH_ITEM_MAX_CHARS", 200)
+    threads = []
+
+    def analyze_sentiment(text):
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return {"sentiment_score": 0.1, "attrition_risk": "Medium", "summary": text}
+
+    def failing_batch(texts):
+        raise RuntimeError("batch failed")
+
+    analyzer.gemini_api.analyze_sentiment = analyze_sentiment
+    analyzer.gemini_api.analyze_sentiment_batch = failing_batch
+    texts = ["It is a job.", "The office is on the third floor.", "Meetings are on Monday.", "x " * 150]
+
+    start = time.perf_counter()
+    results = list(analyzer.analyze_bulk(list(enumerate(texts))))
+    assert time.perf_counter() - start < 0.35
+    assert [r["summary"] for r in results] == texts
+    assert threading.current_thread() not in threads
+
+
+def test_items_left_out_of_a_batch_reply_are_retried_alone(analyzer, monkeypatch):
+    monkeypatch.setattr(Config, "SENTIMENT_ROUTING", "gemini")
+    analyzer.gemini_api.analyze_sentiment_batch = lambda texts: [
+        None if n == 1 else {"sentiment_score": 0.5, "attrition_risk": "Low"} for n, _ in enumerate(texts)]
+    texts = ["It is a job.", "The office is on the third floor.", "Meetings are on Monday."]
+
+    results = list(analyzer.analyze_bulk([("same", text) for text in texts]))
+    assert [r["sentiment_score"] for r in results] == [0.5, 0.1, 0.5]
+    assert [r["id"] for r in results] == ["same"] * 3
+    assert analyzer.gemini_calls == [texts[1]]
+
+
+def test_batch_replies_are_mapped_back_by_position(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", False)
+
+    class BatchModel:
+        def generate_content(self, prompt, **kwargs):
+            # Out of order, with a repeated and an unknown position
+            return types.SimpleNamespace(text=json.dumps([
+                {"id": "2", "sentiment_score": 0.2}, {"id": "1", "sentiment_score": 0.1},
+                {"id": "1", "sentiment_score": 0.9}, {"id": "7", "sentiment_score": 0.7}]))
+
+    results = GeminiAPI(model=BatchModel()).analyze_sentiment_batch(["a", "b", "c"])
+    assert [r and r["sentiment_score"] for r in results] == [0.1, 0.2, None]
@@ -0,0 +1,118 @@
+# test_streaming.py
+import json
+import asyncio
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from utils.gemini_api import GeminiAPI
+from utils.json_repair import parse_partial_json
+from utils.async_gemini import AsyncGeminiClient, iterate_sync
+from utils.response_cache import ResponseCache
+
+
+class StreamingTransport:
+    """Offline transport that streams each scripted reply in small chunks, or raises scripted errors"""
+
+    def __init__(self, *script, chunk_size=8):
+        self.script = list(script)
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    async def stream(self, prompt, generation_config=None):
+        self.calls += 1
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        for i in range(0, len(step), self.chunk_size):
+            yield step[i:i + self.chunk_size]
+
+
+def make_client(transport, **kwargs):
+    options = dict(timeout=1.0, deadline=5.0, max_retries=3, backoff_base=0.01, backoff_max=0.05)
+    options.update(kwargs)
+    return AsyncGeminiClient(transport, **options)
+
+
+def collect(client):
+    async def run():
+        return [chunk async for chunk in client.stream("prompt")]
+    return asyncio.run(run())
+
+
+def test_stream_retries_errors_before_the_first_chunk():
+    transport = StreamingTransport(api_exceptions.ServiceUnavailable("busy"), '{"ok": true}')
+    assert "".join(collect(make_client(transport))) == '{"ok": true}'
+    assert transport.calls == 2
+
+
+def test_stream_does_not_retry_after_output_was_yielded():
+    class FailingMidway(StreamingTransport):
+        async def stream(self, prompt, generation_config=None):
+            self.calls += 1
+            yield '{"a": 1, '
+            raise api_exceptions.ServiceUnavailable("dropped")
+
+    transport = FailingMidway()
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        collect(make_client(transport))
+    assert transport.calls == 1
+
+
+def test_iterate_sync_relays_items_and_errors():
+    async def numbers():
+        yield 1
+        yield 2
+        raise ValueError("boom")
+
+    received = []
+    with pytest.raises(ValueError):
+        for item in iterate_sync(numbers()):
+            received.append(item)
+    assert received == [1, 2]
+
+
+def test_partial_json_closes_the_open_value():
+    value, complete = parse_partial_json('{"match_score": 80, "skills_matched": ["Python", "SQ')
+    assert value == {"match_score": 80, "skills_matched": ["Python", "SQ"]}
+    assert not complete
+    assert parse_partial_json('{"a": 1}') == ({"a": 1}, True)
+    assert parse_partial_json('Sure, here') == (None, False)
+
+
+def test_fields_are_reported_once_complete_and_match_the_final_result():
+    reply = {"match_score": 72, "skills_matched": ["Python", "Flask"], "skills_missing": ["AWS"],
+             "experience_match": True}
+    api = GeminiAPI(model=object())
+    api.response_cache = None
+    api.async_client = make_client(StreamingTransport(json.dumps(reply), chunk_size=5))
+
+    events = list(api.stream_resume_analysis("Python developer", "Python role"))
+    fields = [(event[1], event[2]) for event in events if event[0] == "field"]
+    assert fields == list(reply.items())
+    assert "".join(event[1] for event in events if event[0] == "delta") == json.dumps(reply)
+
+    kind, result = events[-1]
+    assert kind == "result"
+    assert result["match_score"] == 72
+    assert "prompt_tokens" in result
+
+
+def test_stream_failure_ends_with_an_error_result():
+    api = GeminiAPI(model=object())
+    api.response_cache = None
+    api.async_client = make_client(StreamingTransport(api_exceptions.InvalidArgument("bad request")))
+
+    events = list(api.stream_sentiment("Great team"))
+    assert events[-1][0] == "result"
+    assert events[-1][1]["status"] == "failed"
+
+
+def test_cut_off_streams_are_not_cached():
+    api = GeminiAPI(model=object())
+    api.response_cache = ResponseCache(ttl_seconds=60, max_entries=16)
+    api.async_client = make_client(StreamingTransport('{"match_score": 72, "skills_matched": ["Py'))
+
+    result = list(api.stream_resume_analysis("Python developer", "Python role"))[-1][1]
+    assert result["match_score"] == 72 and "skills_matched" not in result
+    assert api.response_cache.stats()["memory_entries"] == 0
@@ -0,0 +1,87 @@
+# test_text_cache.py
+import sqlite3
+
+import pytest
+
+from utils import text_cache
+from utils.text_cache import TextCache
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Record every connection the cache opens and the statements run on it"""
+    opened, statements = [], []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(text_cache.sqlite3, "connect", tracking_connect)
+    return opened, statements
+
+
+def is_closed(conn):
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_keys_depend_on_content_and_qualifiers():
+    key = TextCache.make_key(b"resume", "v1", ".pdf")
+    assert key.startswith("v1:.pdf:")
+    assert key != TextCache.make_key(b"resume", "v2", ".pdf")
+
+
+def test_connections_are_closed(tmp_path, connections):
+    opened, _ = connections
+    cache = TextCache(str(tmp_path / "cache.sqlite3"), 1024)
+    cache.put("a", "alpha")
+    assert cache.get("a") == "alpha"
+    assert cache.get("b") is None
+    cache.stats()
+    assert opened and all(is_closed(conn) for conn in opened)
+
+
+def test_lookups_do_not_write_until_flushed(tmp_path, connections):
+    _, statements = connections
+    cache = TextCache(str(tmp_path / "cache.sqlite3"), 1024)
+    cache.put("a", "alpha")
+    del statements[:]
+
+    for _ in range(5):
+        assert cache.get("a") == "alpha"
+    assert cache.get("missing") is None
+    assert not [sql for sql in statements if sql.startswith("UPDATE")]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (5, 1, 1)
+    assert stats["hit_rate"] == round(5 / 6, 4)
+
+
+def test_flushes_after_a_number_of_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_cache, "FLUSH_EVERY", 3)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TextCache(path, 1024)
+    for _ in range(3):
+        cache.get("missing")
+    # Another process sees the counters without this one flushing again
+    assert TextCache(path, 1024).stats()["misses"] == 3
+
+
+def test_evicts_least_recently_read_entries(tmp_path):
+    cache = TextCache(str(tmp_path / "cache.sqlite3"), 10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    # A buffered hit still protects "a" from eviction
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.stats()["evictions"] == 1
+    cache.put("huge", "x" * 11)
+    assert cache.get("huge") is None
@@ -0,0 +1,380 @@
+"""
+Asynchronous Gemini client with deadlines, retries and client-side rate limiting.
+
+Every call waits for a slot in a process-wide token bucket (requests and prompt
+tokens per minute), runs under a per-attempt timeout and an overall deadline,
+and retries quota and transient server errors with exponential backoff and
+full jitter. The transport is pluggable so tests can drive the client with a
+fake model instead of the network.
+
+Synchronous callers (the Flask views and job workers) use run_sync(), or
+iterate_sync() for streamed replies, which run coroutines on one background
+event loop per process so the model's async gRPC channel is created once and
+reused. Async callers on another loop (the ASGI app) await run_async().
+"""
+import os
+import time
+import queue
+import random
+import asyncio
+import logging
+import threading
+
+from google.api_core import exceptions as api_exceptions
+
+from config import Config
+from utils.metrics import REGISTRY, current_trace, activate_trace, deactivate_trace
+
+logger = logging.getLogger(__name__)
+
+# Quota and transient upstream failures worth another attempt
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    api_exceptions.TooManyRequests,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.GatewayTimeout,
+    api_exceptions.DeadlineExceeded,
+)
+
+REQUEST_COUNTER = REGISTRY.counter("gemini_requests_total", "Gemini calls by final outcome", ("outcome",))
+RETRY_COUNTER = REGISTRY.counter("gemini_retries_total", "Gemini attempts that were retried", ("reason",))
+LIMITER_WAIT = REGISTRY.histogram("gemini_rate_limit_wait_seconds", "Time spent waiting for a rate-limit slot")
+
+
+def estimate_tokens(text):
+    """Rough prompt token count (about four characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+class TokenBucketLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets shared by all callers in the process.
+
+    Callers reserve capacity up front and are told how long to wait for it, so
+    waiting happens outside the lock and reservations are served in order.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        """
+        Args:
+            requests_per_minute (int): Request budget, 0 for unlimited
+            tokens_per_minute (int): Prompt token budget, 0 for unlimited
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens):
+        """
+        Take one request and the given tokens from the buckets
+
+        Returns:
+            float: Seconds to wait before the reserved capacity is available
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+
+            wait = 0.0
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60.0
+                self._requests = min(self.requests_per_minute, self._requests + elapsed * rate) - 1
+                if self._requests < 0:
+                    wait = max(wait, -self._requests / rate)
+            if self.tokens_per_minute:
+                rate = self.tokens_per_minute / 60.0
+                # A single prompt larger than the whole budget still gets through after a full refill
+                tokens = min(tokens, self.tokens_per_minute)
+                self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * rate) - tokens
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / rate)
+            return wait
+
+    def refund(self, tokens):
+        """Give back a reservation whose request was never sent"""
+        with self._lock:
+            if self.requests_per_minute:
+                self._requests = min(self.requests_per_minute, self._requests + 1)
+            if self.tokens_per_minute:
+                self._tokens = min(self.tokens_per_minute, self._tokens + min(tokens, self.tokens_per_minute))
+
+    async def acquire(self, tokens):
+        """Wait until a request of the given token size may be sent"""
+        wait = self.reserve(tokens)
+        LIMITER_WAIT.observe(wait)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Timed out or cancelled while waiting: later callers should not pay for this request
+                self.refund(tokens)
+                raise
+
+
+class GenAITransport:
+    """Sends prompts through a google.generativeai model"""
+
+    def __init__(self, model):
+        """
+        Args:
+            model: genai.GenerativeModel, or any object exposing generate_content(_async)
+        """
+        self.model = model
+
+    async def generate(self, prompt, generation_config=None):
+        kwargs = {"generation_config": generation_config} if generation_config else {}
+        if hasattr(self.model, "generate_content_async"):
+            return await self.model.generate_content_async(prompt, **kwargs)
+        # Synchronous models (e.g. test stubs) run in a thread so the loop stays free
+        return await asyncio.to_thread(self.model.generate_content, prompt, **kwargs)
+
+    async def stream(self, prompt, generation_config=None):
+        """Yield the reply text chunk by chunk as the model produces it"""
+        kwargs = {"generation_config": generation_config} if generation_config else {}
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        else:
+            # Models without a streaming channel deliver the whole reply as one chunk
+            response = await asyncio.to_thread(self.model.generate_content, prompt, **kwargs)
+            yield response.text
+
+
+class AsyncGeminiClient:
+    """Rate-limited Gemini calls with per-attempt timeouts, an overall deadline and retries"""
+
+    def __init__(self, transport, limiter=None, timeout=None, deadline=None, max_retries=None,
+                 backoff_base=None, backoff_max=None):
+        """
+        Args:
+            transport: Object with an async generate(prompt, generation_config) method
+            limiter (TokenBucketLimiter): Shared rate limiter, or None to send immediately
+            timeout (float): Seconds allowed per attempt (default: Config.GEMINI_TIMEOUT_SECONDS)
+            deadline (float): Seconds allowed for the whole call (default: Config.GEMINI_DEADLINE_SECONDS)
+            max_retries (int): Retries after the first attempt (default: Config.GEMINI_MAX_RETRIES)
+            backoff_base (float): First backoff ceiling in seconds (default: Config.GEMINI_BACKOFF_BASE)
+            backoff_max (float): Largest backoff ceiling in seconds (default: Config.GEMINI_BACKOFF_MAX)
+        """
+        self.transport = transport
+        self.limiter = limiter
+        self.timeout = Config.GEMINI_TIMEOUT_SECONDS if timeout is None else timeout
+        self.deadline = Config.GEMINI_DEADLINE_SECONDS if deadline is None else deadline
+        self.max_retries = Config.GEMINI_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = Config.GEMINI_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = Config.GEMINI_BACKOFF_MAX if backoff_max is None else backoff_max
+
+    def _backoff(self, attempt):
+        # Full jitter: spreads retries from concurrent callers instead of retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _wait_for_slot(self, loop, give_up_at, tokens):
+        if self.limiter is not None:
+            await asyncio.wait_for(self.limiter.acquire(tokens), timeout=max(0.0, give_up_at - loop.time()))
+        remaining = give_up_at - loop.time()
+        if remaining <= 0:
+            REQUEST_COUNTER.inc(outcome="deadline")
+            raise asyncio.TimeoutError(f"Gemini deadline of {self.deadline}s exceeded")
+        return remaining
+
+    async def _retry_or_raise(self, error, attempt, loop, give_up_at):
+        """Sleep before the next attempt, or re-raise once retries or time are used up"""
+        delay = self._backoff(attempt)
+        if attempt >= self.max_retries or loop.time() + delay >= give_up_at:
+            REQUEST_COUNTER.inc(outcome="exhausted")
+            raise error
+        RETRY_COUNTER.inc(reason=type(error).__name__)
+        logger.warning(f"Gemini call failed ({type(error).__name__}: {error}); "
+                       f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def generate(self, prompt, generation_config=None):
+        """
+        Send a prompt, retrying quota and transient errors until the deadline
+
+        Args:
+            prompt (str): Prompt text
+            generation_config (dict): Optional overrides for the model's generation config
+
+        Returns:
+            The transport's response object
+
+        Raises:
+            asyncio.TimeoutError: The deadline passed before a successful attempt
+            Exception: The last error, once it is not retryable or retries are exhausted
+        """
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + self.deadline
+        tokens = estimate_tokens(prompt)
+
+        attempt = 0
+        while True:
+            remaining = await self._wait_for_slot(loop, give_up_at, tokens)
+            try:
+                response = await asyncio.wait_for(self.transport.generate(prompt, generation_config),
+                                                  timeout=min(self.timeout, remaining))
+                REQUEST_COUNTER.inc(outcome="success")
+                return response
+            except RETRYABLE_ERRORS as e:
+                await self._retry_or_raise(e, attempt, loop, give_up_at)
+                attempt += 1
+            except Exception:
+                REQUEST_COUNTER.inc(outcome="error")
+                raise
+
+    async def stream(self, prompt, generation_config=None):
+        """
+        Send a prompt and yield the reply text as it arrives
+
+        The per-attempt timeout applies to the gap between chunks and the deadline
+        to the whole reply. Errors before the first chunk are retried like
+        generate(); once text has been yielded the error is raised instead, since
+        a retry would replay output the caller has already consumed.
+
+        Args:
+            prompt (str): Prompt text
+            generation_config (dict): Optional overrides for the model's generation config
+
+        Yields:
+            str: Reply text chunks
+        """
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + self.deadline
+        tokens = estimate_tokens(prompt)
+
+        attempt = 0
+        while True:
+            await self._wait_for_slot(loop, give_up_at, tokens)
+            started = False
+            chunks = self.transport.stream(prompt, generation_config).__aiter__()
+            try:
+                while True:
+                    remaining = give_up_at - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError(f"Gemini deadline of {self.deadline}s exceeded")
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=min(self.timeout, remaining))
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    yield chunk
+                REQUEST_COUNTER.inc(outcome="success")
+                return
+            except RETRYABLE_ERRORS as e:
+                if started:
+                    REQUEST_COUNTER.inc(outcome="error")
+                    raise
+                await self._retry_or_raise(e, attempt, loop, give_up_at)
+                attempt += 1
+            except Exception:
+                REQUEST_COUNTER.inc(outcome="error")
+                raise
+
+
+_limiter = None
+_loop = None
+_loop_pid = None
+_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide rate limiter configured from Config"""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = TokenBucketLimiter(Config.GEMINI_RPM_LIMIT, Config.GEMINI_TPM_LIMIT)
+        return _limiter
+
+
+def _get_loop():
+    global _loop, _loop_pid
+    with _lock:
+        # A forked worker inherits the parent's loop object but not its thread
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="gemini-async-loop", daemon=True).start()
+        return _loop
+
+
+async def _traced(coro, trace):
+    token = activate_trace(trace)
+    try:
+        return await coro
+    finally:
+        deactivate_trace(token)
+
+
+def submit(coro):
+    """
+    Schedule a coroutine on the background Gemini event loop
+
+    The caller's request trace, if any, stays active in the coroutine so its
+    stages are reported with the request.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the coroutine's result
+    """
+    trace = current_trace()
+    if trace is not None:
+        coro = _traced(coro, trace)
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def run_sync(coro):
+    """Run a coroutine on the background Gemini event loop and block for its result"""
+    return submit(coro).result()
+
+
+async def run_async(coro):
+    """
+    Await a coroutine on the background Gemini event loop from another event loop (e.g. the ASGI server's)
+
+    The model's channel and the rate limiter belong to the background loop, so
+    coroutines using them must run there. Cancelling the caller cancels the coroutine.
+    """
+    return await asyncio.wrap_future(submit(coro))
+
+
+def iterate_sync(async_iterable):
+    """
+    Consume an async iterator on the background Gemini event loop from synchronous code
+
+    Items are handed over as soon as they are produced. Closing the returned
+    generator early (e.g. when an HTTP client disconnects) cancels the producer.
+
+    Yields:
+        Items of the async iterator; its exception, if any, is re-raised here
+    """
+    items = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in async_iterable:
+                items.put((item, None))
+        except BaseException as e:
+            items.put((done, e))
+            raise
+        items.put((done, None))
+
+    future = submit(pump())
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        future.cancel()
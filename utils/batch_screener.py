@@ -0,0 +1,233 @@
+import io
+import os
+import logging
+import threading
+import traceback
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.datastructures import FileStorage
+from utils.job_profile import get_job_profile
+from utils.prescreen import prescreen
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# ResumeProcessor owned by each extraction pool worker process
+_worker_processor = None
+
+
+def _config_values():
+    """Settings to hand to spawned workers, which would otherwise only see the environment"""
+    return {name: value for name, value in vars(Config).items()
+            if name.isupper() and isinstance(value, (str, int, float, bool, list, tuple, set, dict, type(None)))}
+
+
+def _init_extraction_worker(config_values):
+    """Create one extraction-only ResumeProcessor per pool worker so OCR models load once per process"""
+    global _worker_processor
+    for name, value in config_values.items():
+        setattr(Config, name, value)
+    from utils.resume_processor import ResumeProcessor
+    _worker_processor = ResumeProcessor.for_extraction()
+
+
+def _extract_in_worker(file_name, data):
+    """Run ResumeProcessor.extract_text on raw file bytes inside a pool worker"""
+    resume_file = FileStorage(stream=io.BytesIO(data), filename=file_name)
+    return _worker_processor.extract_text(resume_file)
+
+
+class BatchScreener:
+    """Screens many resumes against a single job description"""
+
+    def __init__(self, resume_processor):
+        """
+        Args:
+            resume_processor: ResumeProcessor used for the Gemini analysis step
+        """
+        self.resume_processor = resume_processor
+        self._extract_pool = None
+        self._pool_lock = threading.Lock()
+        # Shared by all batch requests, so the cap on parallel Gemini calls is per process
+        self._llm_pool = ThreadPoolExecutor(max_workers=Config.BATCH_LLM_CONCURRENCY,
+                                            thread_name_prefix="batch-llm")
+
+    def _get_extract_pool(self):
+        with self._pool_lock:
+            if self._extract_pool is None:
+                # Spawned, not forked: the web process already runs threads (Gemini loop, job workers)
+                # whose locks a forked child could inherit mid-use
+                self._extract_pool = ProcessPoolExecutor(max_workers=Config.BATCH_EXTRACT_WORKERS,
+                                                         mp_context=multiprocessing.get_context("spawn"),
+                                                         initializer=_init_extraction_worker,
+                                                         initargs=(_config_values(),))
+                logger.info(f"Started extraction pool with {Config.BATCH_EXTRACT_WORKERS} workers")
+            return self._extract_pool
+
+    def _reset_extract_pool(self):
+        with self._pool_lock:
+            if self._extract_pool is not None:
+                self._extract_pool.shutdown(wait=False, cancel_futures=True)
+                self._extract_pool = None
+
+    def collect_files(self, uploads):
+        """
+        Expand uploaded files and zip archives into a flat list of resumes
+
+        Args:
+            uploads: List of werkzeug FileStorage objects
+
+        Returns:
+            tuple: (list of (file_name, bytes), list of per-file error dicts)
+        """
+        files = []
+        skipped = []
+        total_bytes = 0
+
+        for upload in uploads:
+            if not upload or not upload.filename:
+                continue
+
+            file_ext = os.path.splitext(upload.filename)[1].lower()
+            if file_ext == '.zip':
+                try:
+                    with zipfile.ZipFile(upload.stream) as archive:
+                        for entry in archive.infolist():
+                            name = os.path.basename(entry.filename)
+                            if entry.is_dir() or not name or entry.filename.startswith('__MACOSX/'):
+                                continue
+                            entry_ext = os.path.splitext(name)[1].lower()
+                            if entry_ext[1:] not in Config.ALLOWED_EXTENSIONS:
+                                skipped.append(self._failed(name, f"File type {entry_ext} not allowed"))
+                                continue
+                            # Check declared size before inflating to guard against zip bombs
+                            total_bytes += entry.file_size
+                            if total_bytes > Config.BATCH_MAX_UNCOMPRESSED_BYTES:
+                                raise ValueError("Batch exceeds the maximum uncompressed size")
+                            files.append((name, archive.read(entry)))
+                except zipfile.BadZipFile:
+                    skipped.append(self._failed(upload.filename, "Invalid zip archive"))
+            elif file_ext[1:] in Config.ALLOWED_EXTENSIONS:
+                data = upload.read()
+                total_bytes += len(data)
+                if total_bytes > Config.BATCH_MAX_UNCOMPRESSED_BYTES:
+                    raise ValueError("Batch exceeds the maximum uncompressed size")
+                files.append((upload.filename, data))
+            else:
+                skipped.append(self._failed(upload.filename, f"File type {file_ext} not allowed"))
+
+            if len(files) > Config.BATCH_MAX_FILES:
+                raise ValueError(f"Batch exceeds the maximum of {Config.BATCH_MAX_FILES} resumes")
+
+        return files, skipped
+
+    def extract_all(self, files):
+        """
+        Extract text for every resume on the process pool
+
+        Args:
+            files: List of (file_name, bytes)
+
+        Returns:
+            list: Extracted text (or extraction error message) per file, in input order
+        """
+        try:
+            pool = self._get_extract_pool()
+            futures = [pool.submit(_extract_in_worker, name, data) for name, data in files]
+            return [future.result() for future in futures]
+        except Exception as e:
+            # A crashed worker breaks the whole pool; rebuild it next time and finish inline
+            logger.error(f"Extraction pool failed, falling back to inline extraction: {e}")
+            traceback.print_exc()
+            self._reset_extract_pool()
+            return [self.resume_processor.extract_text(FileStorage(stream=io.BytesIO(data), filename=name))
+                    for name, data in files]
+
+    def screen(self, uploads, job_description):
+        """
+        Screen a batch of resumes and rank them by match score
+
+        Args:
+            uploads: List of werkzeug FileStorage objects (resumes or zip archives)
+            job_description: Job description string
+
+        Returns:
+            dict: Ranked results and batch summary
+        """
+        files, skipped = self.collect_files(uploads)
+        if not files:
+            return {"error": "No supported resume files found in upload", "status": "failed",
+                    "results": skipped}
+
+        logger.info(f"Screening batch of {len(files)} resumes")
+        texts = self.extract_all(files)
+
+        # Parse the job description once for the whole batch
+        job_profile = get_job_profile(job_description) if Config.JOB_PROFILE_ENABLED else None
+        ranking = self._prescreen(texts, job_description)
+
+        futures = []
+        for (name, _), text, rank in zip(files, texts, ranking):
+            if rank is None or rank["shortlisted"]:
+                futures.append(self._llm_pool.submit(self.resume_processor.analyze_text,
+                                                     text, name, job_description, job_profile))
+            else:
+                futures.append(None)
+        results = []
+        for (name, _), text, rank, future in zip(files, texts, ranking, futures):
+            if future is not None:
+                result = future.result()
+            else:
+                result = self.resume_processor.analyze_text_locally(text, name, job_description, job_profile)
+            if rank is not None and result.get("status") == "success":
+                result.update(rank)
+            results.append(result)
+
+        succeeded = [r for r in results if r.get("status") == "success"]
+        failed = [r for r in results if r.get("status") != "success"] + skipped
+        for (name, _), result in zip(files, results):
+            result.setdefault("file_name", name)
+
+        # Shortlisted candidates first, highest match first; failures are listed after all ranked candidates
+        succeeded.sort(key=lambda r: (r.get("shortlisted", True), self._score(r)), reverse=True)
+        for rank, result in enumerate(succeeded, start=1):
+            result["rank"] = rank
+
+        return {
+            "results": succeeded + failed,
+            "total": len(files) + len(skipped),
+            "succeeded": len(succeeded),
+            "failed": len(failed),
+            "status": "success"
+        }
+
+    def _prescreen(self, texts, job_description):
+        """
+        Rank extracted texts locally when the batch is larger than the shortlist
+
+        Returns:
+            list: Pre-screen ranking per text, or None for texts that are not ranked
+        """
+        valid = [i for i, text in enumerate(texts) if not self.resume_processor.is_extraction_error(text)]
+        ranking = [None] * len(texts)
+        if not Config.PRESCREEN_ENABLED or len(valid) <= Config.PRESCREEN_TOP_N:
+            return ranking
+
+        for i, rank in zip(valid, prescreen(job_description, [texts[i] for i in valid])):
+            ranking[i] = rank
+        shortlisted = sum(1 for rank in ranking if rank and rank["shortlisted"])
+        logger.info(f"Pre-screen shortlisted {shortlisted} of {len(valid)} resumes for AI analysis")
+        return ranking
+
+    @staticmethod
+    def _score(result):
+        try:
+            return float(result.get("match_score", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _failed(file_name, message):
+        return {"file_name": file_name, "error": message, "status": "failed"}
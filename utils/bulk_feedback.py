@@ -0,0 +1,64 @@
+import io
+import csv
+import json
+
+# Column names accepted for the feedback text in CSV uploads, in order of preference
+TEXT_COLUMNS = ('feedback', 'text', 'comment', 'response')
+
+
+def _to_item(index, entry):
+    """Normalize a string or {"id", "feedback"} object into an (id, text) pair"""
+    if isinstance(entry, str):
+        return str(index), entry
+    if isinstance(entry, dict):
+        text = next((entry[c] for c in TEXT_COLUMNS if entry.get(c)), '')
+        return str(entry.get('id') or index), str(text)
+    raise ValueError(f"Item {index} must be a string or an object with a 'feedback' field")
+
+
+def parse_feedback_items(data, content_type, file_name=None, max_items=None):
+    """
+    Parse a bulk feedback upload into (id, text) pairs
+
+    Args:
+        data (bytes): Request body or uploaded file content
+        content_type (str): MIME type of the data
+        file_name (str): Uploaded file name, used to detect CSV and NDJSON files
+        max_items (int): Optional limit on the number of items
+
+    Returns:
+        list: (item_id, feedback_text) pairs, skipping empty feedback
+
+    Raises:
+        ValueError: If the payload cannot be parsed
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    file_name = (file_name or '').lower()
+    text = data.decode('utf-8-sig', errors='replace')
+
+    if content_type == 'text/csv' or file_name.endswith('.csv'):
+        reader = csv.DictReader(io.StringIO(text))
+        fields = {f.strip().lower(): f for f in (reader.fieldnames or [])}
+        if not any(c in fields for c in TEXT_COLUMNS):
+            raise ValueError(f"CSV must have one of these columns: {', '.join(TEXT_COLUMNS)}")
+        entries = [{k.strip().lower(): v for k, v in row.items() if k} for row in reader]
+    elif content_type in ('application/x-ndjson', 'application/jsonl') or file_name.endswith(('.ndjson', '.jsonl')):
+        try:
+            entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid NDJSON: {e}")
+    else:
+        try:
+            entries = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if isinstance(entries, dict):
+            entries = entries.get('items', entries.get('feedback'))
+        if not isinstance(entries, list):
+            raise ValueError("JSON body must be an array of feedback items")
+
+    items = [_to_item(index, entry) for index, entry in enumerate(entries, start=1)]
+    items = [(item_id, feedback.strip()) for item_id, feedback in items if feedback and feedback.strip()]
+    if max_items and len(items) > max_items:
+        raise ValueError(f"Too many feedback items: {len(items)} (maximum {max_items})")
+    return items
@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import contextmanager
+
+from utils.job_profile import job_description_hash
+
+logger = logging.getLogger(__name__)
+
+# Expired screenings are purged by record() at most this often
+PURGE_INTERVAL = 60.0
+
+SUMMARY_COLUMNS = ("s.id, s.jd_hash, j.title, s.file_name, s.match_score, s.analysis_source, "
+                   "s.recommendation, s.skills_matched, s.skills_missing, s.created_at")
+
+
+class CandidateStore:
+    """Screening results, extracted text and job descriptions stored in SQLite with full-text search"""
+
+    def __init__(self, path, retention_seconds=0):
+        """
+        Args:
+            path (str): Location of the SQLite database file
+            retention_seconds (int): Age after which screenings are deleted; 0 keeps them forever
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._purged = 0.0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    jd_hash TEXT PRIMARY KEY,
+                    title TEXT,
+                    job_description TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS screenings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    jd_hash TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    file_name TEXT,
+                    match_score REAL,
+                    analysis_source TEXT,
+                    recommendation TEXT,
+                    skills_matched TEXT NOT NULL,
+                    skills_missing TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (jd_hash, text_hash)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS screenings_job_score ON screenings (jd_hash, match_score)")
+            conn.execute("CREATE INDEX IF NOT EXISTS screenings_score ON screenings (match_score)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS screening_skills (
+                    screening_id INTEGER NOT NULL,
+                    skill TEXT NOT NULL COLLATE NOCASE,
+                    matched INTEGER NOT NULL,
+                    PRIMARY KEY (screening_id, skill)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS screening_skills_skill ON screening_skills (skill, matched)")
+            # rowid is the screening id
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS resume_text USING fts5(text)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, analysis, resume_text, job_description, job_title=None, jd_hash=None):
+        """
+        Store a successful screening; re-screening the same resume for the same job replaces the old entry,
+        except that a Gemini analysis is never replaced by a local fallback one
+
+        Args:
+            analysis (dict): Result of ResumeProcessor.analyze_text
+            resume_text (str): Extracted resume text
+            job_description (str): Job description string
+            job_title (str): Optional job title (e.g. from the job profile)
+            jd_hash (str): Job description hash (computed from the text when omitted)
+
+        Returns:
+            int: Screening id
+        """
+        jd_hash = jd_hash or job_description_hash(job_description)
+        text_hash = hashlib.sha256(resume_text.encode('utf-8')).hexdigest()
+        matched = self._skill_list(analysis.get("skills_matched"))
+        local_matched = (analysis.get("local_skill_match") or {}).get("matched") or []
+        matched += [skill for skill in local_matched if skill.lower() not in {s.lower() for s in matched}]
+        missing = [skill for skill in self._skill_list(analysis.get("skills_missing"))
+                   if skill.lower() not in {s.lower() for s in matched}]
+        try:
+            match_score = float(analysis.get("match_score"))
+        except (TypeError, ValueError):
+            match_score = None
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, ?)", (jd_hash, job_title, job_description, now))
+            # The id is kept on replacement; the WHERE skips the update when it would overwrite a Gemini analysis
+            replaced = conn.execute(
+                "INSERT INTO screenings (jd_hash, text_hash, file_name, match_score, analysis_source, recommendation, "
+                "skills_matched, skills_missing, analysis, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (jd_hash, text_hash) DO UPDATE SET file_name = excluded.file_name, "
+                "match_score = excluded.match_score, analysis_source = excluded.analysis_source, "
+                "recommendation = excluded.recommendation, skills_matched = excluded.skills_matched, "
+                "skills_missing = excluded.skills_missing, analysis = excluded.analysis, "
+                "created_at = excluded.created_at "
+                "WHERE screenings.analysis_source IS NOT 'gemini' OR excluded.analysis_source = 'gemini'",
+                (jd_hash, text_hash, analysis.get("file_name"), match_score, analysis.get("analysis_source"),
+                 analysis.get("recommendation") if isinstance(analysis.get("recommendation"), str) else None,
+                 json.dumps(matched), json.dumps(missing), json.dumps(analysis, default=str), now)).rowcount
+            screening_id = conn.execute("SELECT id FROM screenings WHERE jd_hash = ? AND text_hash = ?",
+                                        (jd_hash, text_hash)).fetchone()[0]
+            if replaced:
+                conn.execute("DELETE FROM screening_skills WHERE screening_id = ?", (screening_id,))
+                conn.execute("DELETE FROM resume_text WHERE rowid = ?", (screening_id,))
+                conn.executemany("INSERT OR IGNORE INTO screening_skills VALUES (?, ?, ?)",
+                                 [(screening_id, skill, 1) for skill in matched]
+                                 + [(screening_id, skill, 0) for skill in missing])
+                conn.execute("INSERT INTO resume_text (rowid, text) VALUES (?, ?)", (screening_id, resume_text))
+            else:
+                logger.info(f"Kept the Gemini analysis of screening {screening_id} over a "
+                            f"{analysis.get('analysis_source')} one")
+
+        if self.retention_seconds and now - self._purged >= PURGE_INTERVAL:
+            self._purged = now
+            self.purge()
+        return screening_id
+
+    @staticmethod
+    def _skill_list(skills):
+        if not isinstance(skills, list):
+            return []
+        unique = {}
+        for skill in skills:
+            if isinstance(skill, str) and skill.strip():
+                unique.setdefault(skill.strip().lower(), skill.strip())
+        return list(unique.values())
+
+    @staticmethod
+    def _delete(conn, screening_ids):
+        params = [(screening_id,) for screening_id in screening_ids]
+        conn.executemany("DELETE FROM screening_skills WHERE screening_id = ?", params)
+        conn.executemany("DELETE FROM resume_text WHERE rowid = ?", params)
+        conn.executemany("DELETE FROM screenings WHERE id = ?", params)
+
+    def delete(self, screening_id):
+        """
+        Delete one screening with its extracted text
+
+        Returns:
+            bool: False if the screening was unknown
+        """
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM screenings WHERE id = ?", (screening_id,)).fetchone() is None:
+                return False
+            self._delete(conn, [screening_id])
+            conn.execute("DELETE FROM jobs WHERE jd_hash NOT IN (SELECT jd_hash FROM screenings)")
+        return True
+
+    def purge(self):
+        """
+        Delete screenings older than the retention period, and jobs left without screenings
+
+        Returns:
+            int: Number of screenings deleted
+        """
+        if not self.retention_seconds:
+            return 0
+        with self._connect() as conn:
+            expired = [row[0] for row in conn.execute("SELECT id FROM screenings WHERE created_at < ?",
+                                                      (time.time() - self.retention_seconds,))]
+            self._delete(conn, expired)
+            conn.execute("DELETE FROM jobs WHERE jd_hash NOT IN (SELECT jd_hash FROM screenings)")
+        if expired:
+            logger.info(f"Purged {len(expired)} screenings older than {self.retention_seconds}s")
+        return len(expired)
+
+    def search(self, skills=None, min_score=None, max_score=None, jd_hash=None, job_title=None, text=None,
+               limit=50, offset=0):
+        """
+        Find past screenings
+
+        Args:
+            skills (list): Skills the candidate must have matched (all of them, case-insensitive)
+            min_score (float): Lowest match score
+            max_score (float): Highest match score
+            jd_hash (str): Only screenings for this job description
+            job_title (str): Only screenings for jobs whose title contains this text
+            text (str): FTS5 query over the extracted resume text
+            limit (int): Maximum number of results
+            offset (int): Results to skip, for paging
+
+        Returns:
+            list: Screening summaries, highest match score first
+        """
+        where, params = [], []
+        for skill in skills or []:
+            where.append("EXISTS (SELECT 1 FROM screening_skills k "
+                         "WHERE k.screening_id = s.id AND k.skill = ? AND k.matched = 1)")
+            params.append(skill)
+        if min_score is not None:
+            where.append("s.match_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            where.append("s.match_score <= ?")
+            params.append(max_score)
+        if jd_hash:
+            where.append("s.jd_hash = ?")
+            params.append(jd_hash)
+        if job_title:
+            where.append("j.title LIKE ?")
+            params.append(f"%{job_title}%")
+        if text:
+            where.append("s.id IN (SELECT rowid FROM resume_text WHERE resume_text MATCH ?)")
+            params.append(text)
+
+        query = f"SELECT {SUMMARY_COLUMNS} FROM screenings s LEFT JOIN jobs j ON j.jd_hash = s.jd_hash"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY s.match_score DESC, s.id DESC LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            rows = conn.execute(query, params + [limit, offset]).fetchall()
+        return [self._summary(row) for row in rows]
+
+    @staticmethod
+    def _summary(row):
+        return {
+            "id": row[0], "jd_hash": row[1], "job_title": row[2], "file_name": row[3], "match_score": row[4],
+            "analysis_source": row[5], "recommendation": row[6], "skills_matched": json.loads(row[7]),
+            "skills_missing": json.loads(row[8]), "created_at": row[9]
+        }
+
+    def get(self, screening_id):
+        """
+        Look up one screening with its full analysis and extracted text
+
+        Returns:
+            dict: Screening, or None if unknown
+        """
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {SUMMARY_COLUMNS}, s.analysis, t.text FROM screenings s "
+                               "LEFT JOIN jobs j ON j.jd_hash = s.jd_hash "
+                               "LEFT JOIN resume_text t ON t.rowid = s.id WHERE s.id = ?",
+                               (screening_id,)).fetchone()
+        if row is None:
+            return None
+        screening = self._summary(row)
+        screening["analysis"] = json.loads(row[10])
+        screening["resume_text"] = row[11]
+        return screening
+
+    def jobs(self):
+        """
+        List the job descriptions candidates were screened against
+
+        Returns:
+            list: jd_hash, title, candidate count, best and average match score per job, newest first
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT j.jd_hash, j.title, j.created_at, COUNT(s.id), MAX(s.match_score), "
+                                "AVG(s.match_score) FROM jobs j LEFT JOIN screenings s ON s.jd_hash = j.jd_hash "
+                                "GROUP BY j.jd_hash ORDER BY j.created_at DESC").fetchall()
+        return [{"jd_hash": row[0], "title": row[1], "created_at": row[2], "candidates": row[3],
+                 "best_score": row[4], "average_score": round(row[5], 1) if row[5] is not None else None}
+                for row in rows]
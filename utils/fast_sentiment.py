@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class _PreTokenizedText:
+    """Stand-in for nltk's SentiText built from tokens that were already split once"""
+
+    def __init__(self, words_and_emoticons, is_cap_diff):
+        self.words_and_emoticons = words_and_emoticons
+        self.is_cap_diff = is_cap_diff
+
+
+class VaderBatchScorer:
+    """
+    Scores many texts with NLTK VADER in one pass.
+
+    Each text is tokenized once. Texts that contain none of VADER's context rules
+    (boosters, negations, "but", "least", idioms, mixed ALL CAPS) score as the
+    normalized sum of their lexicon valences, computed from a precomputed valence
+    array. The rest run VADER's own rule methods on the pre-split tokens. Either
+    way the compound score is identical to polarity_scores(text)['compound'].
+    """
+
+    def __init__(self, sia):
+        """
+        Args:
+            sia: nltk.sentiment.SentimentIntensityAnalyzer whose lexicon and rules are reproduced
+        """
+        self.sia = sia
+        constants = sia.constants
+
+        words = list(sia.lexicon)
+        self._lexicon_index = {word: i for i, word in enumerate(words)}
+        self._valences = np.array([sia.lexicon[word] for word in words], dtype=np.float64)
+
+        # Any of these tokens or phrases means a lexicon word's valence may be modified by context
+        self._modifiers = (frozenset(constants.BOOSTER_DICT) | frozenset(constants.NEGATE)
+                           | {"least", "so", "this", "but", "never", "kind"})
+        self._phrases = tuple(f" {phrase} " for phrase in
+                              list(constants.SPECIAL_CASE_IDIOMS) + [k for k in constants.BOOSTER_DICT if " " in k])
+        self._punc_list = frozenset(constants.PUNC_LIST)
+        self._punc_chars = "".join(sorted(set("".join(constants.PUNC_LIST))))
+        self._remove_punctuation = constants.REGEX_REMOVE_PUNCTUATION
+
+    def _tokenize(self, text):
+        """Split text into VADER's words_and_emoticons (whitespace tokens with one edge punctuation run removed)"""
+        words_only = {w for w in self._remove_punctuation.sub("", text).split() if len(w) > 1}
+        tokens = []
+        for token in text.split():
+            if len(token) <= 1:
+                continue
+            trailing = token[len(token.rstrip(self._punc_chars)):]
+            if trailing in self._punc_list and token[:-len(trailing)] in words_only:
+                token = token[:-len(trailing)]
+            else:
+                leading = token[:len(token) - len(token.lstrip(self._punc_chars))]
+                if leading in self._punc_list and token[len(leading):] in words_only:
+                    token = token[len(leading):]
+            tokens.append(token)
+        return tokens
+
+    @staticmethod
+    def _is_cap_diff(tokens):
+        upper = sum(1 for token in tokens if token.isupper())
+        return 0 < len(tokens) - upper < len(tokens)
+
+    def _needs_full_rules(self, tokens, lowered):
+        if self._is_cap_diff(tokens):
+            return True
+        for word in lowered:
+            if word in self._modifiers or "n't" in word:
+                return True
+        joined = f" {' '.join(lowered)} "
+        return any(phrase in joined for phrase in self._phrases)
+
+    def _full_rules_compound(self, text, tokens):
+        """Mirror SentimentIntensityAnalyzer.polarity_scores without re-tokenizing the text"""
+        sia = self.sia
+        sentitext = _PreTokenizedText(tokens, self._is_cap_diff(tokens))
+        sentiments = []
+        for item in tokens:
+            valence = 0
+            i = tokens.index(item)
+            if (i < len(tokens) - 1 and item.lower() == "kind" and tokens[i + 1].lower() == "of") \
+                    or item.lower() in sia.constants.BOOSTER_DICT:
+                sentiments.append(valence)
+                continue
+            sentiments = sia.sentiment_valence(valence, sentitext, item, i, sentiments)
+        sentiments = sia._but_check(tokens, sentiments)
+        return sia.score_valence(sentiments, text)["compound"]
+
+    def compound_scores(self, texts):
+        """
+        Compute VADER compound scores for many texts
+
+        Args:
+            texts (list): Feedback texts
+
+        Returns:
+            list: Compound score per text, equal to polarity_scores(text)['compound']
+        """
+        unique = {}
+        owners, lexicon_ids = [], []
+        full_scores = {}
+
+        for text in texts:
+            if text in unique:
+                continue
+            n = unique[text] = len(unique)
+            tokens = self._tokenize(text)
+            lowered = [token.lower() for token in tokens]
+            if self._needs_full_rules(tokens, lowered):
+                full_scores[n] = self._full_rules_compound(text, tokens)
+                continue
+            for word in lowered:
+                index = self._lexicon_index.get(word)
+                if index is not None:
+                    owners.append(n)
+                    lexicon_ids.append(index)
+
+        # bincount adds weights in token order, matching VADER's left-to-right sum exactly
+        sums = np.bincount(np.array(owners, dtype=np.intp),
+                           weights=self._valences[np.array(lexicon_ids, dtype=np.intp)],
+                           minlength=len(unique))
+
+        # Punctuation emphasis, as in SentimentIntensityAnalyzer._punctuation_emphasis
+        unique_texts = list(unique)
+        exclamations = np.minimum([t.count("!") for t in unique_texts], 4) if unique_texts else np.zeros(0)
+        questions = np.array([t.count("?") for t in unique_texts], dtype=np.float64)
+        emphasis = exclamations * 0.292 + np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+        sums = np.where(sums > 0, sums + emphasis, np.where(sums < 0, sums - emphasis, sums))
+        compounds = sums / np.sqrt(sums * sums + 15)
+
+        scores = [full_scores[n] if n in full_scores else round(float(compounds[n]), 4)
+                  for n in range(len(unique_texts))]
+        return [scores[unique[text]] for text in texts]
+
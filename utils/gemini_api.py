@@ -1,73 +1,346 @@
 import os
 import json
-import re
+import time
 import logging
 import google.generativeai as genai
 from config import Config
+from utils.response_cache import ResponseCache
+from utils import async_gemini
+from utils.async_gemini import AsyncGeminiClient, GenAITransport, estimate_tokens
+from utils.resume_compactor import compact_resume, compact_job_description
+from utils.metrics import REGISTRY, span, timed, record_stage
+from utils.model_backends import create_model
+from utils.json_repair import parse_json_response, parse_partial_json
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+PROMPT_TOKENS = REGISTRY.counter("resume_prompt_tokens_total",
+                                 "Estimated resume and job description tokens before and after compaction", ("stage",))
+
+# Response schemas for the model's JSON mode, mirroring the structures described in the prompts
+_STRING_LIST = {"type": "ARRAY", "items": {"type": "STRING"}}
+RESUME_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "match_score": {"type": "INTEGER"},
+        "skills_matched": _STRING_LIST,
+        "skills_missing": _STRING_LIST,
+        "experience_match": {"type": "BOOLEAN"},
+        "education_match": {"type": "BOOLEAN"},
+        "key_strengths": _STRING_LIST,
+        "improvement_areas": _STRING_LIST,
+        "recommendation": {"type": "STRING"}
+    },
+    "required": ["match_score", "skills_matched", "skills_missing", "recommendation"]
+}
+SENTIMENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "sentiment_score": {"type": "NUMBER"},
+        "attrition_risk": {"type": "STRING", "enum": ["Low", "Medium", "High"]},
+        "key_concerns": _STRING_LIST,
+        "positive_factors": _STRING_LIST,
+        "satisfaction_areas": {
+            "type": "OBJECT",
+            "properties": {area: {"type": "INTEGER"} for area in
+                           ["compensation", "work_environment", "management", "career_growth", "work_life_balance"]}
+        },
+        "engagement_recommendations": _STRING_LIST,
+        "summary": {"type": "STRING"}
+    },
+    "required": ["sentiment_score", "attrition_risk", "key_concerns", "positive_factors",
+                 "engagement_recommendations", "summary"]
+}
+SENTIMENT_BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": dict(SENTIMENT_SCHEMA, properties=dict(SENTIMENT_SCHEMA["properties"], id={"type": "STRING"}),
+                  required=["id"] + SENTIMENT_SCHEMA["required"])
+}
+
+
+def _json_mode_support():
+    """Which structured output options the installed google-generativeai accepts"""
+    try:
+        fields = set(genai.GenerationConfig.__dataclass_fields__)
+    except AttributeError:
+        return False, False
+    return "response_mime_type" in fields, "response_schema" in fields
+
+
+SUPPORTS_JSON_MIME_TYPE, SUPPORTS_RESPONSE_SCHEMA = _json_mode_support()
+
 
 class GeminiAPI:
     """Handles interactions with Google's Gemini API"""
 
-    def __init__(self):
-        """Initialize the Gemini API with configuration"""
+    def __init__(self, model=None):
+        """
+        Initialize the Gemini API with configuration
+
+        Args:
+            model: Optional pre-built model object exposing generate_content (used for offline testing)
+        """
         try:
-            # Get API key from Config, which should load from environment variables
-            api_key = Config.GEMINI_API_KEY
+            self.model_name = Config.GEMINI_MODEL_NAME
+            self.generation_config = {
+                "temperature": Config.GEMINI_TEMPERATURE,
+                "top_p": Config.GEMINI_TOP_P,
+                "max_output_tokens": Config.GEMINI_MAX_TOKENS
+            }
+
+            # A pre-built model (tests), otherwise the backend chosen by Config.GEMINI_BACKEND
+            self.model = model if model is not None else create_model(self.model_name, self.generation_config)
+
+            # Every call goes through the async client for deadlines, retries and rate limiting
+            self.async_client = AsyncGeminiClient(GenAITransport(self.model), limiter=async_gemini.get_limiter())
+
+            # Identical prompts are answered from cache instead of paying Gemini latency and quota
+            self.response_cache = None
+            if Config.LLM_CACHE_ENABLED:
+                self.response_cache = ResponseCache(
+                    ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+                    max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+                    disk_path=Config.LLM_CACHE_PATH if Config.LLM_CACHE_DISK_ENABLED else None
+                )
+
+            if Config.GEMINI_JSON_MODE and not SUPPORTS_JSON_MIME_TYPE:
+                logger.info("Installed google-generativeai has no JSON response mode; parsing free-form replies")
+            logger.info(f"Gemini API initialized with model: {self.model_name}")
+
+        except Exception as e:
+            logger.error(f"Failed to initialize Gemini API: {str(e)}")
+            raise
 
-            if not api_key or api_key == "my_gemini_key" or api_key == "your-api-key-here":
-                logger.error("Invalid or missing Gemini API key. Please set a valid key in your .env file.")
-                raise ValueError("Invalid Gemini API key configuration")
+    def _generate_json(self, prompt, generation_config=None, expected=dict):
+        """
+        Send a prompt to the model and parse the JSON reply, using the response cache when enabled
 
-            # Configure the Gemini client
-            genai.configure(api_key=api_key)
+        Args:
+            prompt (str): Prompt text
+            generation_config (dict): Optional overrides for the model's generation config
+            expected (type): dict or list
 
-            # Initialize the model with configuration
-            self.model = genai.GenerativeModel(
-                model_name=Config.GEMINI_MODEL_NAME,
-                generation_config={
-                    "temperature": Config.GEMINI_TEMPERATURE,
-                    "top_p": Config.GEMINI_TOP_P,
-                    "max_output_tokens": Config.GEMINI_MAX_TOKENS
-                }
-            )
+        Returns:
+            Parsed response, or an error dict with status "failed"
+        """
+        if self.response_cache is None:
+            return self._call_model(prompt, generation_config, expected)[0]
 
-            logger.info(f"Gemini API initialized with model: {Config.GEMINI_MODEL_NAME}")
+        config = dict(self.generation_config, **(generation_config or {}))
+        key = ResponseCache.make_key(prompt, self.model_name, config)
+        complete = []
 
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini API: {str(e)}")
-            raise
+        def compute():
+            result, reply_complete = self._call_model(prompt, generation_config, expected)
+            complete.append(reply_complete)
+            return result
+
+        # Failed calls, unparseable and cut-off replies are never cached so the next request retries upstream
+        return self.response_cache.get_or_compute(
+            key, compute, should_cache=lambda result: all(complete) and not self._is_error(result))
+
+    async def _generate_json_async(self, prompt, generation_config=None, expected=dict):
+        """Async counterpart of _generate_json (cache hits are shared, but concurrent misses are not coalesced)"""
+        if self.response_cache is None:
+            return (await self._call_model_async(prompt, generation_config, expected))[0]
+
+        config = dict(self.generation_config, **(generation_config or {}))
+        key = ResponseCache.make_key(prompt, self.model_name, config)
+        result = self.response_cache.get(key)
+        if result is None:
+            result, complete = await self._call_model_async(prompt, generation_config, expected)
+            if complete and not self._is_error(result):
+                self.response_cache.set(key, result)
+        return result
+
+    @staticmethod
+    def _is_error(result):
+        return isinstance(result, dict) and "error" in result
+
+    @staticmethod
+    def _json_mode_config(schema, generation_config=None):
+        """
+        Generation config overrides asking for schema-constrained JSON, when the client library supports it
+
+        Args:
+            schema (dict): Response schema
+            generation_config (dict): Other overrides to keep
+
+        Returns:
+            dict: Overrides, or None when there are none
+        """
+        overrides = dict(generation_config or {})
+        if Config.GEMINI_JSON_MODE and SUPPORTS_JSON_MIME_TYPE:
+            overrides["response_mime_type"] = "application/json"
+            if SUPPORTS_RESPONSE_SCHEMA:
+                overrides["response_schema"] = schema
+        return overrides or None
+
+    def _call_model(self, prompt, generation_config=None, expected=dict):
+        return async_gemini.run_sync(self._call_model_async(prompt, generation_config, expected))
+
+    async def _call_model_async(self, prompt, generation_config=None, expected=dict):
+        """
+        Returns:
+            tuple: (parsed reply or an error dict with status "failed", whether the reply was complete)
+        """
+        with span("gemini.network"):
+            response = await self.async_client.generate(prompt, generation_config)
+
+        if not hasattr(response, 'text'):
+            logger.error("Invalid response format from Gemini API - missing text attribute")
+            return {"error": "Invalid API response format", "status": "failed"}, False
+
+        logger.info("Successfully received response from Gemini API")
+        with span("gemini.parse"):
+            return self._parse_reply(response.text, expected)
 
-    def analyze_resume(self, resume_text: str, job_description: str) -> dict:
+    def _stream_json(self, prompt, generation_config=None):
+        """
+        Stream a prompt's JSON reply, reporting top-level fields as soon as each one is complete
+
+        A field counts as complete once the model has started the next one (or closed
+        the object), so values are never revised after they are reported. Cache hits
+        are replayed as if streamed, and replies are cached like _generate_json.
+
+        Yields:
+            tuple: ("delta", text chunk), ("field", name, value), then finally ("result", parsed reply
+            or an error dict with status "failed")
+        """
+        key = None
+        if self.response_cache is not None:
+            config = dict(self.generation_config, **(generation_config or {}))
+            key = ResponseCache.make_key(prompt, self.model_name, config)
+            cached = self.response_cache.get(key)
+            if isinstance(cached, dict):
+                for name, value in cached.items():
+                    yield "field", name, value
+                yield "result", cached
+                return
+
+        text = ""
+        reported = set()
+        started = time.perf_counter()
+        for chunk in async_gemini.iterate_sync(self.async_client.stream(prompt, generation_config)):
+            if not text:
+                record_stage("gemini.first_chunk", time.perf_counter() - started)
+            text += chunk
+            yield "delta", chunk
+            partial, complete = parse_partial_json(text)
+            if not isinstance(partial, dict):
+                continue
+            names = list(partial) if complete else list(partial)[:-1]
+            for name in names:
+                if name not in reported:
+                    reported.add(name)
+                    yield "field", name, partial[name]
+
+        record_stage("gemini.stream", time.perf_counter() - started)
+        logger.info("Finished streaming response from Gemini API")
+        with span("gemini.parse"):
+            result, complete = self._parse_reply(text)
+        if key is not None and complete and not self._is_error(result):
+            self.response_cache.set(key, result)
+        yield "result", result
+
+    def analyze_resume(self, resume_text: str, job_description: str, job_profile=None) -> dict:
         """
         Analyze a resume against a job description
 
         Args:
             resume_text (str): The text content of the resume
             job_description (str): The job description to match against
+            job_profile (JobProfile): Parsed job description sent in place of the full text, if informative enough
 
         Returns:
             dict: Analysis results with match scores and recommendations
         """
-        # Truncate inputs if they're too long
-        max_length = 30000  # Safety limit
-        if len(resume_text) > max_length:
-            logger.warning(f"Resume text truncated from {len(resume_text)} to {max_length} characters")
-            resume_text = resume_text[:max_length] + "... [truncated]"
+        try:
+            prompt, token_usage = self._resume_prompt(resume_text, job_description, job_profile)
+            logger.info("Sending request to Gemini API for resume analysis")
+            return self._with_token_usage(
+                self._generate_json(prompt, generation_config=self._json_mode_config(RESUME_SCHEMA)), token_usage)
+
+        except Exception as e:
+            logger.error(f"Error during resume analysis API call: {str(e)}")
+            return {"error": f"API error: {str(e)}", "status": "failed"}
+
+    async def analyze_resume_async(self, resume_text: str, job_description: str, job_profile=None) -> dict:
+        """Async version of analyze_resume"""
+        try:
+            prompt, token_usage = self._resume_prompt(resume_text, job_description, job_profile)
+            logger.info("Sending async request to Gemini API for resume analysis")
+            result = await self._generate_json_async(prompt, generation_config=self._json_mode_config(RESUME_SCHEMA))
+            return self._with_token_usage(result, token_usage)
+
+        except Exception as e:
+            logger.error(f"Error during resume analysis API call: {str(e)}")
+            return {"error": f"API error: {str(e)}", "status": "failed"}
+
+    def stream_resume_analysis(self, resume_text: str, job_description: str, job_profile=None):
+        """
+        Streaming version of analyze_resume
 
-        if len(job_description) > max_length:
-            logger.warning(f"Job description truncated from {len(job_description)} to {max_length} characters")
-            job_description = job_description[:max_length] + "... [truncated]"
+        Yields:
+            tuple: _stream_json events; the final ("result", ...) carries the same dict analyze_resume returns
+        """
+        try:
+            prompt, token_usage = self._resume_prompt(resume_text, job_description, job_profile)
+            logger.info("Sending streaming request to Gemini API for resume analysis")
+            for event in self._stream_json(prompt, generation_config=self._json_mode_config(RESUME_SCHEMA)):
+                if event[0] == "result":
+                    event = ("result", self._with_token_usage(event[1], token_usage))
+                yield event
+
+        except Exception as e:
+            logger.error(f"Error during streaming resume analysis API call: {str(e)}")
+            yield "result", {"error": f"API error: {str(e)}", "status": "failed"}
+
+    @staticmethod
+    @timed("gemini.prompt")
+    def _resume_prompt(resume_text, job_description, job_profile=None):
+        """
+        Build the resume analysis prompt from compacted inputs, with the parsed job profile ahead of the job description
+
+        Returns:
+            tuple: (prompt, token usage dict with original, sent and saved token estimates)
+        """
+        # Keep the most relevant resume sections within the token budget instead of cutting blindly
+        resume = compact_resume(resume_text, job_description, Config.RESUME_TOKEN_BUDGET)
+        job = compact_job_description(job_description, Config.JOB_DESCRIPTION_TOKEN_BUDGET)
+        job_text = f"Job Description:\n{job['text']}"
+        profile_used = job_profile is not None and job_profile.is_informative()
+        if profile_used:
+            # The profile is a summary for the model to check against, never a replacement for what the JD says
+            profile_text = job_profile.to_prompt()
+            job_text = f"Job Profile (parsed from the job description):\n{profile_text}\n\n{job_text}"
+            job = dict(job, compacted_tokens=estimate_tokens(profile_text) + job["compacted_tokens"])
+        resume_text = resume["text"]
+
+        original = resume["original_tokens"] + job["original_tokens"]
+        sent = resume["compacted_tokens"] + job["compacted_tokens"]
+        token_usage = {
+            "original_tokens": original,
+            "sent_tokens": sent,
+            "saved_tokens": max(0, original - sent),
+            "saved_percent": round(100.0 * max(0, original - sent) / original, 1) if original else 0.0,
+            "resume_sections": resume["sections"],
+            "omitted_sections": resume["omitted_sections"],
+            "truncated_sections": resume["truncated_sections"],
+            "job_profile_used": profile_used
+        }
+        PROMPT_TOKENS.inc(original, stage="original")
+        PROMPT_TOKENS.inc(sent, stage="sent")
+        if resume["omitted_sections"] or resume["truncated_sections"]:
+            logger.info(f"Resume compacted to budget: omitted {resume['omitted_sections']}, "
+                        f"truncated {resume['truncated_sections']}")
 
         prompt = f"""
 You are an AI HR assistant specialized in resume screening. Analyze the resume text and job description below.
 
-Job Description:
-{job_description}
+{job_text}
 
 Resume:
 {resume_text}
@@ -86,21 +359,14 @@ Provide a comprehensive analysis in JSON format with the following structure:
 
 Be objective and thorough in your analysis. Focus specifically on the alignment between the resume and the job requirements.
         """
+        return prompt, token_usage
 
-        try:
-            logger.info("Sending request to Gemini API for resume analysis")
-            response = self.model.generate_content(prompt)
-
-            if not hasattr(response, 'text'):
-                logger.error("Invalid response format from Gemini API - missing text attribute")
-                return {"error": "Invalid API response format", "status": "failed"}
-
-            logger.info("Successfully received response from Gemini API")
-            return self._safe_json_parse(response.text)
-
-        except Exception as e:
-            logger.error(f"Error during resume analysis API call: {str(e)}")
-            return {"error": f"API error: {str(e)}", "status": "failed"}
+    @staticmethod
+    def _with_token_usage(result, token_usage):
+        # Reported per request so the savings from compaction are visible to callers
+        if isinstance(result, dict) and "error" not in result:
+            result["prompt_tokens"] = token_usage
+        return result
 
     def analyze_sentiment(self, feedback_text: str) -> dict:
         """
@@ -112,13 +378,57 @@ Be objective and thorough in your analysis. Focus specifically on the alignment
         Returns:
             dict: Analysis results with sentiment scores and recommendations
         """
+        try:
+            logger.info("Sending request to Gemini API for sentiment analysis")
+            result = self._generate_json(self._sentiment_prompt(feedback_text),
+                                         generation_config=self._json_mode_config(SENTIMENT_SCHEMA))
+            return self._with_default_recommendations(result)
+
+        except Exception as e:
+            logger.error(f"Error during sentiment analysis API call: {str(e)}")
+            return {"error": f"API error: {str(e)}", "status": "failed"}
+
+    async def analyze_sentiment_async(self, feedback_text: str) -> dict:
+        """Async version of analyze_sentiment"""
+        try:
+            logger.info("Sending async request to Gemini API for sentiment analysis")
+            result = await self._generate_json_async(self._sentiment_prompt(feedback_text),
+                                                     generation_config=self._json_mode_config(SENTIMENT_SCHEMA))
+            return self._with_default_recommendations(result)
+
+        except Exception as e:
+            logger.error(f"Error during sentiment analysis API call: {str(e)}")
+            return {"error": f"API error: {str(e)}", "status": "failed"}
+
+    def stream_sentiment(self, feedback_text: str):
+        """
+        Streaming version of analyze_sentiment
+
+        Yields:
+            tuple: _stream_json events; the final ("result", ...) carries the same dict analyze_sentiment returns
+        """
+        try:
+            logger.info("Sending streaming request to Gemini API for sentiment analysis")
+            for event in self._stream_json(self._sentiment_prompt(feedback_text),
+                                           generation_config=self._json_mode_config(SENTIMENT_SCHEMA)):
+                if event[0] == "result":
+                    event = ("result", self._with_default_recommendations(event[1]))
+                yield event
+
+        except Exception as e:
+            logger.error(f"Error during streaming sentiment analysis API call: {str(e)}")
+            yield "result", {"error": f"API error: {str(e)}", "status": "failed"}
+
+    @staticmethod
+    @timed("gemini.prompt")
+    def _sentiment_prompt(feedback_text):
         # Truncate input if it's too long
         max_length = 30000  # Safety limit
         if len(feedback_text) > max_length:
             logger.warning(f"Feedback text truncated from {len(feedback_text)} to {max_length} characters")
             feedback_text = feedback_text[:max_length] + "... [truncated]"
 
-        prompt = f"""
+        return f"""
 You are an AI HR analyst specialized in sentiment analysis. Analyze the employee feedback below.
 
 Employee Feedback:
@@ -148,30 +458,86 @@ Be objective and detailed in your analysis. Focus on detecting both explicit and
 IMPORTANT: Always provide at least 3 engagement_recommendations, even if the feedback is very positive.
         """
 
-        try:
-            logger.info("Sending request to Gemini API for sentiment analysis")
-            response = self.model.generate_content(prompt)
+    @staticmethod
+    def _with_default_recommendations(result):
+        # Ensure engagement_recommendations are always present
+        if "engagement_recommendations" not in result or not result["engagement_recommendations"]:
+            result["engagement_recommendations"] = [
+                "Conduct regular check-ins to maintain employee satisfaction",
+                "Continue reinforcing positive aspects of workplace culture",
+                "Consider implementing a formal recognition program"
+            ]
+        return result
+
+    def analyze_sentiment_batch(self, texts):
+        """
+        Analyze several short feedback texts in a single Gemini call
 
-            if not hasattr(response, 'text'):
-                logger.error("Invalid response format from Gemini API - missing text attribute")
-                return {"error": "Invalid API response format", "status": "failed"}
+        Items are numbered by position in the prompt, so repeated or odd caller ids cannot collide.
 
-            logger.info("Successfully received response from Gemini API")
-            result = self._safe_json_parse(response.text)
+        Args:
+            texts (list): Feedback texts
 
-            # Ensure engagement_recommendations are always present
-            if "engagement_recommendations" not in result or not result["engagement_recommendations"]:
-                result["engagement_recommendations"] = [
-                    "Conduct regular check-ins to maintain employee satisfaction",
-                    "Continue reinforcing positive aspects of workplace culture",
-                    "Consider implementing a formal recognition program"
-                ]
+        Returns:
+            list: Analysis per text in input order; None for texts the model skipped or mangled
+        """
+        payload = json.dumps([{"id": str(position), "feedback": text} for position, text in enumerate(texts, 1)],
+                             ensure_ascii=False)
 
-            return result
+        prompt = f"""
+You are an AI HR analyst specialized in sentiment analysis. Analyze each employee feedback item below independently.
+
+Feedback items (JSON array):
+{payload}
+
+Return ONLY a JSON array with exactly one object per input item, in the same order, each with this structure:
+{{
+    "id": "1",  // The id of the feedback item, copied exactly
+    "sentiment_score": 0.75,  // Overall sentiment from -1 (negative) to 1 (positive)
+    "attrition_risk": "Low",  // Attrition risk: Low, Medium, or High
+    "key_concerns": ["Work-life balance"],  // Main concerns identified
+    "positive_factors": ["Team collaboration"],  // Positive aspects mentioned
+    "satisfaction_areas": {{"compensation": 7, "work_environment": 8, "management": 6, "career_growth": 4, "work_life_balance": 5}},
+    "engagement_recommendations": ["Provide more career development opportunities", "...", "..."],  // At least 3
+    "summary": "Brief summary"
+}}
+
+Keep every list short and the summary to one sentence.
+        """
+
+        try:
+            logger.info(f"Sending batch of {len(texts)} feedback items to Gemini API")
+            result = self._generate_json(prompt,
+                                         generation_config=self._json_mode_config(
+                                             SENTIMENT_BATCH_SCHEMA,
+                                             {"max_output_tokens": Config.GEMINI_BATCH_MAX_TOKENS}),
+                                         expected=list)
+            results = [None] * len(texts)
+            if not isinstance(result, list):
+                logger.warning(f"Batch sentiment analysis failed: {result.get('error')}")
+                return results
+
+            for entry in result:
+                if not (isinstance(entry, dict) and "id" in entry and "sentiment_score" in entry):
+                    continue
+                position = str(entry.pop("id")).strip()
+                # Only the first answer for each position counts
+                if position.isdigit() and 1 <= int(position) <= len(texts) and results[int(position) - 1] is None:
+                    results[int(position) - 1] = entry
+            return results
 
         except Exception as e:
-            logger.error(f"Error during sentiment analysis API call: {str(e)}")
-            return {"error": f"API error: {str(e)}", "status": "failed"}
+            logger.error(f"Error during batch sentiment analysis API call: {str(e)}")
+            return [None] * len(texts)
+
+    def _parse_json_array(self, text):
+        """
+        Parse a JSON array from an LLM response, tolerating markdown fences, surrounding prose and truncation
+
+        Returns:
+            list: Parsed array, or an error dict with status "failed"
+        """
+        return self._parse_reply(text, expected=list)[0]
 
     def _safe_json_parse(self, text):
         """
@@ -183,42 +549,44 @@ IMPORTANT: Always provide at least 3 engagement_recommendations, even if the fee
         Returns:
             dict: Parsed JSON object or error message
         """
+        return self._parse_reply(text)[0]
+
+    def _parse_reply(self, text, expected=dict):
+        """
+        Parse a JSON object or array from an LLM response
+
+        Args:
+            text (str): The text response from the API
+            expected (type): dict or list
+
+        Returns:
+            tuple: (parsed value or an error dict with status "failed", whether the reply was complete); a
+                reply cut off mid-way keeps only its complete elements and must not be cached or stored
+        """
+        kind = "JSON array" if expected is list else "JSON"
         if not text or not isinstance(text, str):
             logger.error(f"Invalid text input for JSON parsing: {type(text)}")
-            return {"error": "Empty or invalid response text", "status": "failed"}
+            return {"error": "Empty or invalid response text", "status": "failed"}, False
 
         # Log a sample of the response for debugging
         preview = text[:100] + ("..." if len(text) > 100 else "")
         logger.info(f"Parsing API response text (preview): {preview}")
 
         try:
-            # First try direct JSON parsing
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # If that fails, try to extract JSON using regex
-            try:
-                # Look for content between curly braces (including nested braces)
-                matches = re.search(r'(\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\}))*\}))*\})', text, re.DOTALL)
-                if matches:
-                    json_text = matches.group(1)
-                    return json.loads(json_text)
-                else:
-                    # Try to find JSON-like content with markdown code block syntax
-                    matches = re.search(r'```(?:json)?(.*?)```', text, re.DOTALL)
-                    if matches:
-                        json_text = matches.group(1).strip()
-                        return json.loads(json_text)
-                    else:
-                        logger.error("Failed to find valid JSON structure in response")
-                        return {
-                            "error": "Failed to parse JSON from API response",
-                            "raw_response": text.strip(),
-                            "status": "failed"
-                        }
-            except Exception as e:
-                logger.error(f"Error in JSON extraction and parsing: {str(e)}")
-                return {
-                    "error": f"JSON parsing error: {str(e)}",
-                    "raw_response": text.strip(),
-                    "status": "failed"
-                }
\ No newline at end of file
+            # Plain JSON first; otherwise one linear scan extracts, cleans and if needed repairs the value
+            result, outcome = parse_json_response(text, expected=expected)
+        except ValueError as e:
+            logger.error(f"Failed to find valid {kind} in response: {e}")
+            return {
+                "error": f"Failed to parse {kind} from API response",
+                "raw_response": text.strip(),
+                "status": "failed"
+            }, False
+
+        if outcome == "repaired":
+            logger.warning("Repaired malformed JSON in API response")
+        elif outcome == "truncated":
+            logger.warning("API response was cut off; kept only its complete fields")
+            if isinstance(result, dict):
+                result["truncated"] = True
+        return result, outcome != "truncated"
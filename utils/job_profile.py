@@ -0,0 +1,262 @@
+"""
+Job description pre-parsing.
+
+A job description is parsed once into a JobProfile (title, seniority, minimum
+years of experience, education level, required and preferred skills, and the
+key requirement lines) and cached by its hash. Screening prompts carry the
+profile ahead of the compacted job description, and the same skill vocabulary
+is used to match resumes locally. Fields the description does not state clearly
+are left empty rather than guessed.
+"""
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+from config import Config
+from utils.async_gemini import estimate_tokens
+from utils.resume_compactor import normalize_text
+
+# Canonical skill name -> aliases (case-insensitive, matched as whole words). Aliases that are also everyday
+# English words ("rest", "spring", "excel", "sales") only count with their technical context
+SKILLS = {
+    'Python': ['python'], 'Java': ['java'], 'JavaScript': ['javascript', 'js', 'es6'],
+    'TypeScript': ['typescript'], 'C++': ['c++', 'cpp'], 'C#': ['c#', 'csharp'], '.NET': ['.net', 'dotnet'],
+    'Go': ['golang'], 'Rust': ['rust'], 'Ruby': ['ruby'], 'PHP': ['php'], 'Scala': ['scala'],
+    'Kotlin': ['kotlin'], 'Swift': ['swift'], 'SQL': ['sql'], 'Bash': ['bash', 'shell scripting'],
+    'Django': ['django'], 'Flask': ['flask'], 'FastAPI': ['fastapi'],
+    'Spring': ['spring boot', 'spring framework', 'spring mvc'],
+    'Node.js': ['node.js', 'nodejs'], 'React': ['react', 'react.js', 'reactjs'],
+    'Angular': ['angular'], 'Vue': ['vue', 'vue.js'], 'HTML': ['html', 'html5'], 'CSS': ['css', 'css3'],
+    'REST APIs': ['restful', 'rest api', 'rest apis'], 'GraphQL': ['graphql'], 'gRPC': ['grpc'],
+    'PostgreSQL': ['postgresql', 'postgres'], 'MySQL': ['mysql'], 'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'], 'Elasticsearch': ['elasticsearch'], 'Kafka': ['kafka'], 'RabbitMQ': ['rabbitmq'],
+    'Spark': ['spark', 'pyspark'], 'Hadoop': ['hadoop'], 'Airflow': ['airflow'], 'Snowflake': ['snowflake'],
+    'AWS': ['aws', 'amazon web services'], 'Azure': ['azure'], 'GCP': ['gcp', 'google cloud'],
+    'Docker': ['docker'], 'Kubernetes': ['kubernetes', 'k8s'], 'Terraform': ['terraform'],
+    'CI/CD': ['ci/cd', 'continuous integration', 'jenkins', 'github actions'], 'Git': ['git'],
+    'Linux': ['linux', 'unix'], 'Microservices': ['microservices', 'microservice'],
+    'Machine Learning': ['machine learning', 'ml'], 'Deep Learning': ['deep learning'],
+    'NLP': ['nlp', 'natural language processing'], 'Computer Vision': ['computer vision'],
+    'TensorFlow': ['tensorflow'], 'PyTorch': ['pytorch'], 'scikit-learn': ['scikit-learn', 'sklearn'],
+    'Pandas': ['pandas'], 'NumPy': ['numpy'], 'Data Analysis': ['data analysis', 'data analytics'],
+    'Statistics': ['statistics', 'statistical'], 'Tableau': ['tableau'], 'Power BI': ['power bi'],
+    'Excel': ['microsoft excel', 'ms excel', 'excel spreadsheets'], 'ETL': ['etl'],
+    'Data Engineering': ['data engineering'],
+    'Agile': ['agile', 'scrum', 'kanban'], 'Project Management': ['project management', 'pmp'],
+    'Product Management': ['product management'], 'Business Analysis': ['business analysis'],
+    'Leadership': ['leadership', 'team lead', 'people management'],
+    'Communication': ['communication skills', 'verbal communication', 'written communication'],
+    'Stakeholder Management': ['stakeholder management'],
+    'Salesforce': ['salesforce'], 'SAP': ['sap'], 'Jira': ['jira'], 'Figma': ['figma'],
+    'UX Design': ['ux', 'user experience'],
+    'Security': ['cybersecurity', 'information security', 'network security', 'application security'],
+    'Testing': ['unit testing', 'test automation', 'qa', 'selenium', 'pytest'],
+    'Recruiting': ['recruiting', 'recruitment', 'talent acquisition'], 'Payroll': ['payroll'],
+    'HRIS': ['hris', 'workday'], 'Accounting': ['accounting', 'gaap'], 'Financial Modeling': ['financial modeling'],
+    'Sales': ['business development', 'b2b sales', 'inside sales'], 'Marketing': ['marketing', 'seo', 'sem'],
+    'Customer Service': ['customer service', 'customer support'],
+}
+_ALIAS_TO_SKILL = {alias: skill for skill, aliases in SKILLS.items() for alias in aliases}
+SKILL_PATTERN = re.compile(
+    r'(?<![\w+#.])(' + '|'.join(re.escape(alias) for alias in sorted(_ALIAS_TO_SKILL, key=len, reverse=True))
+    + r')(?![\w+#])', re.IGNORECASE)
+
+YEARS_PATTERN = re.compile(r'(\d{1,2})\s*\+?\s*(?:(?:-|to|–)\s*\d{1,2}\s*)?\+?\s*(?:years?|yrs?)', re.IGNORECASE)
+# Matched against the job title only; the body mentions levels in passing ("reports to the Engineering Manager")
+SENIORITY_LEVELS = [
+    ('intern', r'\bintern(ship)?\b'), ('junior', r'\b(junior|jr\.?|entry[- ]level|graduate)\b'),
+    ('mid', r'\b(mid[- ]level|intermediate)\b'), ('senior', r'\b(senior|sr\.?)\b'),
+    ('lead', r'\b(lead|staff|principal|architect)\b'), ('manager', r'\b(manager|head of|director)\b'),
+]
+# Explicit degree names only: a bare "MS" (MS Excel, MS Office) or "degree in" says nothing about the level
+EDUCATION_LEVELS = [
+    ('Diploma', r'\b(associate\'?s? degree|(high school|college) diploma)(?!\w)'),
+    ("Bachelor's degree", r'\b(bachelor\'s|bachelors degree|bachelor of|b\.sc\.?|bsc|b\.tech|btech|b\.s\.|b\.a\.|'
+                          r'undergraduate degree)(?!\w)'),
+    ("Master's degree", r'\b(master\'s|masters degree|master of|m\.sc\.?|msc|m\.tech|mtech|m\.s\.|mba)(?!\w)'),
+    ('PhD', r'\b(ph\.?d\.?|doctorate|doctoral degree)(?!\w)'),
+]
+
+SECTION_KINDS = [
+    ('preferred', r'(nice to have|preferred|bonus|plus|desired|good to have)'),
+    ('required', r'(requirements?|qualifications?|must have|what you\'ll (bring|need)|you have|skills|'
+                 r'who you are|experience)'),
+    ('responsibilities', r'(responsibilities|what you\'ll do|the role|duties|you will)'),
+]
+
+
+def _heading_kind(line):
+    """Return the kind of section a heading line starts, 'other' for unknown headings, or None"""
+    if len(line) > 60:
+        return None
+    key = line.rstrip(':').strip().lower()
+    for kind, pattern in SECTION_KINDS:
+        if line.endswith(':'):
+            if re.search(pattern, key):
+                return kind
+        # Without a colon only short heading-like lines count ("Key Responsibilities", "Skills and Experience"),
+        # not bullets that merely mention a keyword ("Experience with Kafka")
+        elif re.fullmatch(r"(\w+ )?" + pattern + r"( (and|&) [\w']+)?", key):
+            return kind
+    return 'other' if line.endswith(':') and len(line.split()) <= 6 else None
+
+
+def find_skills(text):
+    """Canonical skills mentioned in text, in order of first mention"""
+    found = OrderedDict()
+    for match in SKILL_PATTERN.finditer(text):
+        found[_ALIAS_TO_SKILL[match.group(1).lower()]] = True
+    return list(found)
+
+
+class JobProfile:
+    """Structured summary of a job description, parsed locally"""
+
+    def __init__(self, job_description):
+        """
+        Args:
+            job_description (str): Full job description text
+        """
+        self.jd_hash = job_description_hash(job_description)
+        self.original_tokens = estimate_tokens(job_description)
+
+        lines = [line for line in normalize_text(job_description) if line]
+        self.title = lines[0] if lines and len(lines[0]) <= 80 and _heading_kind(lines[0]) is None else ''
+
+        sections = {'required': [], 'preferred': [], 'responsibilities': [], 'other': []}
+        kind = 'other'
+        for line in lines[1:] if self.title else lines:
+            heading = _heading_kind(line)
+            if heading is not None:
+                kind = heading
+                continue
+            sections[kind].append(line.lstrip('-•*·▪◦ ').strip())
+
+        # Company blurbs and benefits only count when the description has no recognizable sections
+        requirement_lines = sections['required'] + sections['responsibilities'] or sections['other']
+        self.required_skills = find_skills('\n'.join([self.title] + requirement_lines))
+        self.preferred_skills = [skill for skill in find_skills('\n'.join(sections['preferred']))
+                                 if skill not in self.required_skills]
+
+        experience_lines = [line for line in requirement_lines if 'experience' in line.lower()]
+        years = [int(match.group(1)) for match in YEARS_PATTERN.finditer('\n'.join(experience_lines))]
+        self.min_years_experience = max(years) if years else None
+
+        self.seniority = self._first_level(SENIORITY_LEVELS, [self.title])
+        self.education = self._lowest_level(EDUCATION_LEVELS, '\n'.join(requirement_lines))
+
+        # Requirements first, then responsibilities, capped so the profile stays compact
+        self.key_requirements = (sections['required'] + sections['responsibilities'])[:Config.JOB_PROFILE_MAX_REQUIREMENTS]
+
+    @staticmethod
+    def _first_level(levels, texts):
+        for text in texts:
+            for name, pattern in levels:
+                if re.search(pattern, text, re.IGNORECASE):
+                    return name
+        return None
+
+    @staticmethod
+    def _lowest_level(levels, text):
+        # "Bachelor's required, Master's preferred" means a Bachelor's is the requirement
+        for name, pattern in levels:
+            if re.search(pattern, text, re.IGNORECASE):
+                return name
+        return None
+
+    def is_informative(self):
+        """Whether the profile captured enough to stand in for the full job description"""
+        return bool(self.required_skills) and bool(self.key_requirements)
+
+    def match_skills(self, resume_text):
+        """
+        Match the profile's skills against resume text locally
+
+        Returns:
+            dict: matched and missing required skills, matched preferred skills and coverage (0-100)
+        """
+        resume_skills = set(find_skills(resume_text))
+        matched = [skill for skill in self.required_skills if skill in resume_skills]
+        missing = [skill for skill in self.required_skills if skill not in resume_skills]
+        coverage = int(100 * len(matched) / len(self.required_skills)) if self.required_skills else None
+        return {
+            "matched": matched,
+            "missing": missing,
+            "preferred_matched": [skill for skill in self.preferred_skills if skill in resume_skills],
+            "coverage": coverage
+        }
+
+    def to_prompt(self):
+        """Render the profile as compact text for the screening prompt"""
+        parts = []
+        if self.title:
+            parts.append(f"Title: {self.title}")
+        if self.seniority:
+            parts.append(f"Seniority: {self.seniority}")
+        if self.min_years_experience is not None:
+            parts.append(f"Minimum experience: {self.min_years_experience} years")
+        if self.education:
+            parts.append(f"Education: {self.education}")
+        parts.append(f"Required skills: {', '.join(self.required_skills)}")
+        if self.preferred_skills:
+            parts.append(f"Preferred skills: {', '.join(self.preferred_skills)}")
+        parts.append("Key requirements:")
+        parts.extend(f"- {line}" for line in self.key_requirements)
+        return '\n'.join(parts)
+
+    def to_dict(self):
+        return {
+            "jd_hash": self.jd_hash,
+            "title": self.title,
+            "seniority": self.seniority,
+            "min_years_experience": self.min_years_experience,
+            "education": self.education,
+            "required_skills": list(self.required_skills),
+            "preferred_skills": list(self.preferred_skills),
+            "key_requirements": list(self.key_requirements)
+        }
+
+
+def skills_match_score(skills_matched, skills_missing):
+    """
+    Simple match score from the share of matched skills, used when no model score is available
+
+    Returns:
+        int: 0-100, or 50 when no skills are known either way
+    """
+    total_skills = len(skills_matched) + len(skills_missing)
+    if total_skills > 0:
+        return int((len(skills_matched) / total_skills) * 100)
+    return 50  # Default score
+
+
+def job_description_hash(job_description):
+    """Hash of the job description with whitespace normalized"""
+    return hashlib.sha256(' '.join(job_description.split()).encode('utf-8')).hexdigest()
+
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def get_job_profile(job_description):
+    """
+    Return the parsed profile for a job description, parsing it only on first use
+
+    Returns:
+        JobProfile: Cached by job description hash (least recently used profiles are dropped)
+    """
+    key = job_description_hash(job_description)
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+            return profile
+
+    profile = JobProfile(job_description)
+    with _profiles_lock:
+        _profiles[key] = profile
+        while len(_profiles) > Config.JOB_PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    return profile
@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Persistent job queue stored in SQLite, shared by all worker processes on the host"""
+
+    def __init__(self, path, retention_seconds, stale_seconds, max_attempts=3):
+        """
+        Args:
+            path (str): Location of the SQLite database file
+            retention_seconds (int): How long finished jobs are kept for status polling
+            stale_seconds (int): Running jobs without a heartbeat for this long are assumed lost
+            max_attempts (int): Claims per job; a job lost this many times is marked failed instead of re-queued
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    file_data BLOB,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claim_token TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    heartbeat_at REAL
+                )
+            """)
+            # Databases created before claims were tracked
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in (("claim_token", "TEXT"), ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind, payload, file_data=None):
+        """
+        Add a job to the queue
+
+        Args:
+            kind (str): Job type used to pick a handler
+            payload (dict): JSON-serializable job arguments
+            file_data (bytes): Optional uploaded file content
+
+        Returns:
+            str: Job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (id, kind, status, payload, file_data, created_at, updated_at) "
+                         "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                         (job_id, kind, json.dumps(payload), file_data, now, now))
+        return job_id
+
+    def claim(self):
+        """
+        Atomically take the oldest queued job
+
+        Returns:
+            dict: Job with id, kind, payload, file_data, the claim token that heartbeat() and finish() must
+                present, and the attempt number; or None if the queue is empty
+        """
+        token = uuid.uuid4().hex
+        with self._connect() as conn:
+            try:
+                # IMMEDIATE takes the write lock up front so two workers can never claim the same job
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT id, kind, payload, file_data, attempts FROM jobs WHERE status = 'queued' "
+                                   "ORDER BY created_at LIMIT 1").fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                conn.execute("UPDATE jobs SET status = 'running', claim_token = ?, attempts = attempts + 1, "
+                             "heartbeat_at = ?, updated_at = ? WHERE id = ?", (token, now, now, row[0]))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "file_data": row[3],
+                "token": token, "attempt": row[4] + 1}
+
+    def heartbeat(self, job_id, token):
+        """
+        Record that the claimed job is still being worked on
+
+        Returns:
+            bool: False if the claim was lost (the job was re-queued or failed by maintain)
+        """
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND claim_token = ? "
+                                "AND status = 'running'", (time.time(), job_id, token)).rowcount == 1
+
+    def finish(self, job_id, result, token):
+        """
+        Store a job's result; the job is marked failed if the result carries an error
+
+        Returns:
+            bool: False if the claim was lost, in which case the result is discarded
+        """
+        status = "failed" if isinstance(result, dict) and "error" in result else "success"
+        with self._connect() as conn:
+            # The uploaded file is no longer needed once the job has run
+            stored = conn.execute("UPDATE jobs SET status = ?, result = ?, file_data = NULL, claim_token = NULL, "
+                                  "updated_at = ? WHERE id = ? AND claim_token = ? AND status = 'running'",
+                                  (status, json.dumps(result), time.time(), job_id, token)).rowcount == 1
+        if not stored:
+            logger.warning(f"Discarded the result of job {job_id}: its claim was lost")
+        return stored
+
+    def get(self, job_id):
+        """
+        Look up a job's status and result
+
+        Returns:
+            dict: Job status (and result once finished), or None if the job is unknown
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, result, created_at, updated_at FROM jobs WHERE id = ?",
+                               (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {"job_id": job_id, "status": row[0], "created_at": row[2], "updated_at": row[3]}
+        if row[1] is not None:
+            job["result"] = json.loads(row[1])
+        return job
+
+    def maintain(self):
+        """Re-queue jobs whose worker stopped sending heartbeats, fail jobs lost too often, purge expired jobs"""
+        now = time.time()
+        stale = now - self.stale_seconds
+        # A job that keeps taking its worker down (e.g. out of memory during OCR) must not loop forever
+        error = json.dumps({"error": f"Job was abandoned by its worker {self.max_attempts} times",
+                            "status": "failed"})
+        with self._connect() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                failed = conn.execute("UPDATE jobs SET status = 'failed', result = ?, file_data = NULL, "
+                                      "claim_token = NULL, updated_at = ? WHERE status = 'running' "
+                                      "AND heartbeat_at < ? AND attempts >= ?",
+                                      (error, now, stale, self.max_attempts)).rowcount
+                requeued = conn.execute("UPDATE jobs SET status = 'queued', claim_token = NULL, updated_at = ? "
+                                        "WHERE status = 'running' AND heartbeat_at < ?", (now, stale)).rowcount
+                conn.execute("DELETE FROM jobs WHERE status IN ('success', 'failed') AND updated_at < ?",
+                             (now - self.retention_seconds,))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        if requeued:
+            logger.warning(f"Re-queued {requeued} jobs whose workers stopped responding")
+        if failed:
+            logger.error(f"Failed {failed} jobs abandoned {self.max_attempts} times")
+
+
+class JobWorkerPool:
+    """Background threads that drain a JobQueue using registered handlers"""
+
+    def __init__(self, queue, num_workers, poll_interval, heartbeat_interval=30):
+        """
+        Args:
+            queue (JobQueue): Queue to process
+            num_workers (int): Number of worker threads in this process
+            poll_interval (float): Seconds to wait between polls when the queue is empty
+            heartbeat_interval (float): Seconds between heartbeats for running jobs; keep well below
+                the queue's stale_seconds
+        """
+        self.queue = queue
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._handlers = {}
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._start_lock = threading.Lock()
+        # Claim tokens of the jobs this process is running, by job id
+        self._running = {}
+        self._running_lock = threading.Lock()
+
+    def register(self, kind, handler):
+        """Register handler(payload, file_data) -> result dict for jobs of the given kind"""
+        self._handlers[kind] = handler
+
+    def notify(self):
+        """Wake idle workers after a job was enqueued from this process"""
+        self._wakeup.set()
+
+    def start(self):
+        """
+        Start the worker and heartbeat threads in this process, once
+
+        Call it after the process has forked (threads do not survive a fork), e.g. from
+        a server's post-fork hook or before the first request; later calls return at once.
+        """
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # Threads inherited from a parent process are gone after a fork
+            self._threads = []
+            with self._running_lock:
+                self._running = {}
+            self.queue.maintain()
+            for i in range(self.num_workers):
+                self._threads.append(threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True))
+            self._threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"Started {self.num_workers} job workers")
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._running_lock:
+                running = list(self._running.items())
+            for job_id, token in running:
+                try:
+                    if not self.queue.heartbeat(job_id, token):
+                        logger.warning(f"Job {job_id} was taken over while running")
+                except Exception as e:
+                    logger.error(f"Job heartbeat error: {e}")
+
+    def _run(self):
+        last_maintenance = time.time()
+        while True:
+            try:
+                if time.time() - last_maintenance > 60:
+                    self.queue.maintain()
+                    last_maintenance = time.time()
+
+                job = self.queue.claim()
+                if job is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+
+                with self._running_lock:
+                    self._running[job["id"]] = job["token"]
+                try:
+                    result = self._execute(job)
+                finally:
+                    with self._running_lock:
+                        self._running.pop(job["id"], None)
+                self.queue.finish(job["id"], result, job["token"])
+            except Exception as e:
+                # Keep the worker alive through transient database errors
+                logger.error(f"Job worker error: {e}")
+                time.sleep(self.poll_interval)
+
+    def _execute(self, job):
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            return {"error": f"Unknown job type: {job['kind']}", "status": "failed"}
+        try:
+            return handler(job["payload"], job["file_data"])
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            traceback.print_exc()
+            return {"error": str(e), "status": "failed"}
@@ -0,0 +1,193 @@
+"""
+Single-pass JSON recovery for LLM responses.
+
+When a reply is not plain JSON, the first object (or array) is located and
+copied in one forward scan that tracks string and bracket state; if it does not
+parse, the scan resumes at the next bracket after it, so the cost stays linear
+in the response size and nothing is re-scanned. Along the way the scan
+drops // and /* */ comments, trailing commas and raw newlines inside strings.
+If the reply was cut off (e.g. at the output token limit), it falls back to the
+last complete top-level element instead of re-requesting the whole response; a
+cut-off string, number or nested value is dropped rather than closed, since
+`"match_score": 8` may have been 80. Only partial parses of a reply that is
+still streaming close the open value, for display.
+"""
+import json
+
+from utils.metrics import REGISTRY
+
+PARSE_COUNTER = REGISTRY.counter("llm_json_parse_total",
+                                 "LLM replies by how their JSON was recovered "
+                                 "(direct, extracted, repaired, truncated or failed)", ("outcome",))
+
+_CLOSERS = {'{': '}', '[': ']'}
+_WHITESPACE = ' \t\r\n'
+
+
+def _strip_trailing_space(out):
+    while out and out[-1] in _WHITESPACE:
+        out.pop()
+
+
+def _scan(text, start):
+    """
+    Copy the JSON value starting at text[start], cleaning it as it goes
+
+    Returns:
+        tuple: (characters, complete, modified, in_string, stack, safe point, index after the value)
+    """
+    out = []
+    stack = []
+    in_string = escape = modified = False
+    # Output length and open brackets right after the last complete top-level element, for truncated replies
+    safe = (0, [])
+    i, n = start, len(text)
+    while i < n:
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+            elif c == '\n':
+                c = '\\n'
+                modified = True
+            out.append(c)
+            i += 1
+            continue
+
+        if c == '"':
+            in_string = True
+            out.append(c)
+        elif c in _CLOSERS:
+            stack.append(_CLOSERS[c])
+            out.append(c)
+            if len(stack) == 1:
+                safe = (len(out), list(stack))
+        elif c in '}]':
+            if not stack:
+                break
+            _strip_trailing_space(out)
+            if out and out[-1] == ',':
+                out.pop()
+                modified = True
+            if c != stack[-1]:
+                modified = True
+            out.append(stack.pop())
+            if not stack:
+                return out, True, modified, False, stack, safe, i + 1
+            if len(stack) == 1:
+                safe = (len(out), list(stack))
+        elif c == ',':
+            if len(stack) == 1:
+                safe = (len(out), list(stack))
+            out.append(c)
+        elif c == '/' and i + 1 < n and text[i + 1] in '/*':
+            end = text.find('\n' if text[i + 1] == '/' else '*/', i + 2)
+            i = n if end < 0 else end + (1 if text[i + 1] == '/' else 2)
+            modified = True
+            continue
+        else:
+            out.append(c)
+        i += 1
+    return out, False, modified, in_string, stack, safe, n
+
+
+def _close(out, stack):
+    _strip_trailing_space(out)
+    if out and out[-1] in ',:':
+        out.pop()
+    return ''.join(out) + ''.join(reversed(stack))
+
+
+def _recover(text, expected, close_open=False):
+    """
+    Recovery without metrics: returns (value, outcome, complete) or raises ValueError
+
+    A truncated reply falls back to its last complete top-level element; with close_open the open string
+    and brackets are closed first, keeping the cut-off value as far as it got.
+    """
+    try:
+        value = json.loads(text)
+        if isinstance(value, expected):
+            return value, "direct", True
+    except ValueError:
+        pass
+
+    opener = '{' if expected is dict else '['
+    start = text.find(opener)
+    if start < 0:
+        raise ValueError("No JSON value found in response")
+
+    while start >= 0:
+        out, complete, modified, in_string, stack, safe, end = _scan(text, start)
+        if complete:
+            candidates = [''.join(out)]
+        elif close_open:
+            if in_string:
+                out.append('"')
+            candidates = [_close(list(out), stack), _close(out[:safe[0]], safe[1])]
+        else:
+            candidates = [_close(out[:safe[0]], safe[1])]
+
+        for candidate in candidates:
+            try:
+                value = json.loads(candidate)
+            except ValueError:
+                continue
+            if not isinstance(value, expected):
+                continue
+            if complete:
+                return value, "extracted" if not modified else "repaired", True
+            if not value and not close_open:
+                raise ValueError("Response was cut off before its first complete element")
+            return value, "truncated", False
+
+        # Bracketed prose ("{name}") before the real value: carry on after it
+        start = text.find(opener, end)
+
+    raise ValueError("Could not repair JSON in response")
+
+
+def parse_json_response(text, expected=dict):
+    """
+    Parse a JSON object or array from an LLM reply
+
+    Args:
+        text (str): Raw response text
+        expected (type): dict or list
+
+    Returns:
+        tuple: (parsed value, how it was recovered: "direct", "extracted", "repaired", or "truncated" when
+            the reply was cut off and only its complete elements were kept)
+
+    Raises:
+        ValueError: No value of the expected type could be recovered
+    """
+    try:
+        value, outcome, _ = _recover(text, expected)
+    except ValueError:
+        PARSE_COUNTER.inc(outcome="failed")
+        raise
+    PARSE_COUNTER.inc(outcome=outcome)
+    return value, outcome
+
+
+def parse_partial_json(text, expected=dict):
+    """
+    Best-effort parse of a reply that is still streaming in (not counted in the parse metrics)
+
+    Args:
+        text (str): Response text received so far
+        expected (type): dict or list
+
+    Returns:
+        tuple: (value closed at the cut, or None if nothing is recoverable yet; whether the value is complete)
+    """
+    try:
+        value, _, complete = _recover(text, expected, close_open=True)
+    except ValueError:
+        return None, False
+    return value, complete
@@ -0,0 +1,372 @@
+"""
+In-process metrics and request tracing.
+
+Counters and histograms live in one process-wide registry and are exported in
+the Prometheus text format. span() times a processing stage into the
+stage_duration_seconds histogram and, while a request Trace is active in the
+current context, adds it to that trace so the request can report its own
+breakdown (e.g. as a Server-Timing header).
+
+Each process keeps its own registry. When several worker processes serve the
+app (gunicorn or uvicorn workers), Registry.share() makes each of them write
+its samples to a file in a common directory, and expose() reports the sum over
+all files, so any worker answers a scrape for the whole server.
+"""
+import os
+import glob
+import json
+import math
+import time
+import uuid
+import atexit
+import logging
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """Return {label values tuple: count}"""
+        with self._lock:
+            return dict(self._values)
+
+    def snapshot(self):
+        return {"|".join(key) or "total": value for key, value in self.samples().items()}
+
+    def dump(self):
+        """Return the counter as JSON-serializable data, for sharing with other processes"""
+        return {"type": "counter", "documentation": self.documentation, "labelnames": list(self.labelnames),
+                "samples": [[list(key), value] for key, value in self.samples().items()]}
+
+    @staticmethod
+    def merge(samples, dumped):
+        """Add dumped samples (from dump()) into a samples() dict"""
+        for key, value in dumped:
+            samples[tuple(key)] = samples.get(tuple(key), 0) + value
+        return samples
+
+    def expose(self, samples=None):
+        """Return the counter in the Prometheus text format (of the given samples, by default its own)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted((self.samples() if samples is None else samples).items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values (e.g. latencies in seconds)"""
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        """Return {label values tuple: {"buckets": [(bound, cumulative count)], "sum", "count"}}"""
+        with self._lock:
+            result = {}
+            for key, series in self._series.items():
+                cumulative, buckets = 0, []
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                result[key] = {"buckets": buckets, "sum": series["sum"], "count": series["count"]}
+            return result
+
+    def snapshot(self):
+        snapshot = {}
+        for key, series in self.samples().items():
+            snapshot["|".join(key) or "total"] = {
+                "count": series["count"],
+                "mean_seconds": round(series["sum"] / series["count"], 6) if series["count"] else 0.0,
+                "buckets": {str(bound): count for bound, count in series["buckets"]}
+            }
+        return snapshot
+
+    def dump(self):
+        """Return the histogram as JSON-serializable data, for sharing with other processes"""
+        return {"type": "histogram", "documentation": self.documentation, "labelnames": list(self.labelnames),
+                "buckets": list(self.buckets), "samples": [[list(key), series]
+                                                          for key, series in self.samples().items()]}
+
+    @staticmethod
+    def merge(samples, dumped):
+        """Add dumped samples (from dump()) into a samples() dict"""
+        for key, series in dumped:
+            total = samples.setdefault(tuple(key), {"buckets": [(bound, 0) for bound, _ in series["buckets"]],
+                                                    "sum": 0.0, "count": 0})
+            total["buckets"] = [(bound, count + added)
+                                for (bound, count), (_, added) in zip(total["buckets"], series["buckets"])]
+            total["sum"] += series["sum"]
+            total["count"] += series["count"]
+        return samples
+
+    def expose(self, samples=None):
+        """Return the histogram in the Prometheus text format (of the given samples, by default its own)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted((self.samples() if samples is None else samples).items()):
+            for bound, count in series["buckets"] + [(math.inf, series["count"])]:
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return "\n".join(lines)
+
+
+_METRIC_TYPES = {"counter": Counter, "histogram": Histogram}
+
+
+class Registry:
+    """Process-wide collection of metrics, created on first use by name"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        # Set by share(): the directory shared with the other worker processes and this process's file in it
+        self._directory = None
+        self._path = None
+        self._pid = None
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def share(self, directory, interval=5.0):
+        """
+        Write this process's samples to a file in directory every interval seconds (and at exit), and make
+        expose() report the sum over every file there
+
+        Call once per process, after any fork; further calls in the same process do nothing.
+
+        Args:
+            directory (str): Directory shared by the worker processes; nothing is shared if empty
+            interval (float): Seconds between writes
+        """
+        pid = os.getpid()
+        with self._lock:
+            if not directory or self._pid == pid:
+                return
+            os.makedirs(directory, exist_ok=True)
+            self._pid = pid
+            self._directory = directory
+            # A random suffix keeps a later process that reuses the pid from overwriting this one's totals
+            self._path = os.path.join(directory, f"metrics-{pid}-{uuid.uuid4().hex[:8]}.json")
+        self.write()
+        threading.Thread(target=self._write_loop, args=(interval,), name="metrics-writer", daemon=True).start()
+        atexit.register(self.write)
+
+    def _write_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.write()
+
+    def write(self):
+        """Write this process's samples to its shared file (no-op unless share() was called in this process)"""
+        if self._path is None or self._pid != os.getpid():
+            return
+        data = {metric.name: metric.dump() for metric in self.metrics()}
+        try:
+            with open(self._path + ".tmp", "w") as f:
+                json.dump(data, f)
+            os.replace(self._path + ".tmp", self._path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {self._path}: {e}")
+
+    def _shared_samples(self):
+        """Return {name: (metric, samples summed over every process's file)}"""
+        merged = {}
+        for path in glob.glob(os.path.join(self._directory, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                # Written by a process that died mid-write; the .tmp suffix keeps this rare
+                continue
+            for name, dumped in data.items():
+                if name not in merged:
+                    cls = _METRIC_TYPES[dumped["type"]]
+                    with self._lock:
+                        metric = self._metrics.get(name)
+                    if metric is None:
+                        options = {"buckets": dumped["buckets"]} if cls is Histogram else {}
+                        metric = cls(name, dumped["documentation"], dumped["labelnames"], **options)
+                    merged[name] = (metric, {})
+                metric, samples = merged[name]
+                metric.merge(samples, dumped["samples"])
+        return merged
+
+    def expose(self):
+        """Return every metric in the Prometheus text exposition format, summed over processes when shared"""
+        if self._path is None or self._pid != os.getpid():
+            return "".join(metric.expose() + "\n" for metric in sorted(self.metrics(), key=lambda m: m.name))
+        self.write()
+        merged = self._shared_samples()
+        return "".join(metric.expose(samples) + "\n" for _, (metric, samples) in sorted(merged.items()))
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.histogram("stage_duration_seconds", "Time spent per processing stage", ("stage",))
+
+
+class Trace:
+    """Stage timings collected while serving one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            total, count = self._stages.get(stage, (0.0, 0))
+            self._stages[stage] = (total + seconds, count + 1)
+
+    def stages(self):
+        """Return {stage: (total seconds, count)} in the order stages first finished"""
+        with self._lock:
+            return dict(self._stages)
+
+    def server_timing(self):
+        """
+        Format the stages as a Server-Timing header value
+
+        Repeated stages (e.g. one per OCR page) are summed, with the count in the description.
+        """
+        entries = []
+        for stage, (seconds, count) in self.stages().items():
+            entry = f"{stage};dur={seconds * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="x{count}"'
+            entries.append(entry)
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def current_trace():
+    """Return the Trace active in this context, or None"""
+    return _current_trace.get()
+
+
+def activate_trace(trace):
+    """
+    Make a trace current for this context
+
+    Returns:
+        Token to pass to deactivate_trace
+    """
+    return _current_trace.set(trace)
+
+
+def deactivate_trace(token):
+    _current_trace.reset(token)
+
+
+def record_stage(stage, seconds):
+    """Record a stage duration measured by the caller"""
+    STAGE_LATENCY.observe(seconds, stage=stage)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as a processing stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    """Decorator timing every call of a function as a processing stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
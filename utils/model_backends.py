@@ -0,0 +1,224 @@
+"""
+Model backends behind GeminiAPI, selected with Config.GEMINI_BACKEND.
+
+"gemini" builds the real google.generativeai model. "standin" answers locally
+with schema-valid resume, sentiment and batch sentiment JSON after a tunable
+delay, and can inject quota/server errors and malformed replies at given rates.
+It needs no API key or network, so load tests can size the Flask and OCR tiers
+and exercise the retry and JSON repair paths, and CI runs are deterministic
+(replies depend only on the prompt and STANDIN_SEED).
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+
+import google.generativeai as genai
+from google.api_core import exceptions as api_exceptions
+
+from config import Config
+from utils.job_profile import find_skills
+
+logger = logging.getLogger(__name__)
+
+BATCH_MARKER = "Feedback items (JSON array):"
+BATCH_INSTRUCTIONS_MARKER = "Return ONLY a JSON array"
+RESUME_MARKER = "\nResume:\n"
+INSTRUCTIONS_MARKER = "Provide a comprehensive analysis"
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+SATISFACTION_AREAS = ("compensation", "work_environment", "management", "career_growth", "work_life_balance")
+POSITIVE_WORDS = frozenset(["great", "good", "enjoy", "love", "supportive", "excellent", "happy", "smooth", "clear"])
+NEGATIVE_WORDS = frozenset(["poor", "bad", "overwhelming", "burned", "never", "below", "rare", "unfair", "stress"])
+
+
+def _gemini_model(model_name, generation_config):
+    api_key = Config.GEMINI_API_KEY
+    if not api_key or api_key == "my_gemini_key" or api_key == "your-api-key-here":
+        logger.error("Invalid or missing Gemini API key. Please set a valid key in your .env file.")
+        raise ValueError("Invalid Gemini API key configuration")
+
+    # Configure the Gemini client
+    genai.configure(api_key=api_key)
+
+    # Initialize the model with configuration
+    return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+
+def _standin_model(model_name, generation_config):
+    logger.info("Using the local Gemini stand-in; no API calls will be made")
+    return StandInModel(latency=Config.STANDIN_LATENCY_SECONDS, sigma=Config.STANDIN_LATENCY_SIGMA,
+                        distribution=Config.STANDIN_LATENCY_DISTRIBUTION, error_rate=Config.STANDIN_ERROR_RATE,
+                        malformed_rate=Config.STANDIN_MALFORMED_RATE, seed=Config.STANDIN_SEED)
+
+
+BACKENDS = {"gemini": _gemini_model, "standin": _standin_model}
+
+
+def create_model(model_name, generation_config, backend=None):
+    """
+    Build the model object for the configured backend
+
+    Args:
+        model_name (str): Gemini model name
+        generation_config (dict): Default generation config
+        backend (str): Backend name (default: Config.GEMINI_BACKEND)
+
+    Returns:
+        Object exposing generate_content and generate_content_async
+    """
+    backend = (backend or Config.GEMINI_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown GEMINI_BACKEND '{backend}'; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[backend](model_name, generation_config)
+
+
+class StandInResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StandInModel:
+    """Local replacement for genai.GenerativeModel with injectable latency, errors and malformed output"""
+
+    def __init__(self, latency=0.8, sigma=0.4, distribution="lognormal", error_rate=0.0, malformed_rate=0.0,
+                 seed=0):
+        """
+        Args:
+            latency (float): Median delay per call in seconds
+            sigma (float): Spread: log-normal sigma, or +/- fraction of the median for "uniform"
+            distribution (str): "fixed", "uniform" or "lognormal"
+            error_rate (float): Share of calls failing with a quota or server error, before any output
+            malformed_rate (float): Share of replies with broken JSON (fenced, commented, truncated, ...)
+            seed (int): Seed for delays and injected faults; replies depend only on the prompt and seed
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}'")
+        self.latency = latency
+        self.sigma = sigma
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        """Delay, whether to fail and whether to mangle the reply for one call"""
+        with self._lock:
+            self.calls += 1
+            if self.latency <= 0 or self.distribution == "fixed":
+                delay = max(0.0, self.latency)
+            elif self.distribution == "uniform":
+                delay = self.latency * self._rng.uniform(max(0.0, 1 - self.sigma), 1 + self.sigma)
+            else:
+                delay = self.latency * self._rng.lognormvariate(0, self.sigma)
+            fail = self._rng.random() < self.error_rate
+            malformed = self._rng.random() < self.malformed_rate
+            variant = self._rng.randrange(5)
+        return delay, fail, malformed, variant
+
+    @staticmethod
+    def _error(variant):
+        if variant % 2:
+            return api_exceptions.ServiceUnavailable("Stand-in backend unavailable")
+        return api_exceptions.ResourceExhausted("Stand-in quota exceeded")
+
+    def reply(self, prompt):
+        """Schema-valid JSON for the kind of prompt (resume, sentiment or sentiment batch)"""
+        rng = random.Random(f"{self.seed}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}")
+        if BATCH_MARKER in prompt:
+            payload = prompt.split(BATCH_MARKER, 1)[1].split(BATCH_INSTRUCTIONS_MARKER, 1)[0]
+            return json.dumps([dict(self._sentiment(rng, item["feedback"]), id=item["id"])
+                               for item in json.loads(payload)])
+        if "Employee Feedback:" in prompt:
+            return json.dumps(self._sentiment(rng, prompt.split("Employee Feedback:", 1)[1]))
+        return json.dumps(self._resume(rng, prompt))
+
+    @staticmethod
+    def _resume(rng, prompt):
+        # Skills the job asks for, split by whether the resume mentions them
+        job_part, _, resume_part = prompt.partition(RESUME_MARKER)
+        resume_part = resume_part.split(INSTRUCTIONS_MARKER, 1)[0]
+        resume_skills = set(find_skills(resume_part))
+        wanted = find_skills(job_part) or ["Communication", "Problem Solving"]
+        matched = [skill for skill in wanted if skill in resume_skills]
+        missing = [skill for skill in wanted if skill not in resume_skills]
+        score = max(0, min(100, round(100 * len(matched) / len(wanted)) + rng.randint(-10, 10)))
+        return {
+            "match_score": score,
+            "skills_matched": matched,
+            "skills_missing": missing,
+            "experience_match": rng.random() < 0.6,
+            "education_match": rng.random() < 0.8,
+            "key_strengths": ["Relevant project experience"] if matched else [],
+            "improvement_areas": [f"Experience with {skill}" for skill in missing[:3]],
+            "recommendation": "Proceed to a technical interview." if score >= 70 else "Keep on file for other roles."
+        }
+
+    @staticmethod
+    def _sentiment(rng, text):
+        words = re.findall(r"[a-z]+", text.lower())
+        positive = sum(word in POSITIVE_WORDS for word in words)
+        negative = sum(word in NEGATIVE_WORDS for word in words)
+        score = (positive - negative) / (positive + negative) if positive + negative else 0.0
+        score = round(max(-1.0, min(1.0, score + rng.uniform(-0.1, 0.1))), 2)
+        return {
+            "sentiment_score": score,
+            "attrition_risk": "Low" if score >= 0.3 else "Medium" if score >= -0.3 else "High",
+            "key_concerns": ["Workload"] if score < 0.3 else [],
+            "positive_factors": ["Team collaboration"] if score > -0.3 else [],
+            "satisfaction_areas": {area: rng.randint(3, 9) for area in SATISFACTION_AREAS},
+            "engagement_recommendations": ["Hold regular check-ins", "Review workloads", "Recognize good work"],
+            "summary": "Stand-in analysis of the feedback."
+        }
+
+    @staticmethod
+    def _mangle(text, variant):
+        """Damage a JSON reply the way LLMs do"""
+        if variant == 0:
+            return f"Here is the analysis you asked for:\n```json\n{text}\n```"
+        if variant == 1:
+            return text.replace(", \"", ",\n// next field\n\"", 1)
+        if variant == 2:
+            return text[:-1].rstrip() + ",\n" + text[-1]
+        if variant == 3:
+            # Cut off as if the output token limit was hit
+            return text[:max(1, int(len(text) * 0.7))]
+        return "I'm sorry, I can't provide that analysis right now."
+
+    def _reply_text(self, prompt, malformed, variant):
+        text = self.reply(prompt)
+        return self._mangle(text, variant) if malformed else text
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        delay, fail, malformed, variant = self._draw()
+        time.sleep(delay)
+        if fail:
+            raise self._error(variant)
+        return StandInResponse(self._reply_text(prompt, malformed, variant))
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        delay, fail, malformed, variant = self._draw()
+        if not stream:
+            await asyncio.sleep(delay)
+            if fail:
+                raise self._error(variant)
+            return StandInResponse(self._reply_text(prompt, malformed, variant))
+
+        # Streaming: half the delay before the first chunk, the rest spread over the reply
+        await asyncio.sleep(delay / 2)
+        if fail:
+            raise self._error(variant)
+        text = self._reply_text(prompt, malformed, variant)
+        chunks = [text[start:start + 64] for start in range(0, len(text), 64)] or [""]
+
+        async def stream_chunks():
+            for chunk in chunks:
+                yield StandInResponse(chunk)
+                await asyncio.sleep(delay / 2 / len(chunks))
+        return stream_chunks()
@@ -0,0 +1,81 @@
+import os
+import time
+import logging
+import threading
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Process-wide EasyOCR reader, created on first use
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    """
+    Return the shared EasyOCR reader, loading Torch and the OCR models on first call
+
+    Returns:
+        easyocr.Reader: Reader configured with Config.OCR_LANGUAGES
+    """
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                start = time.perf_counter()
+                # Importing easyocr pulls in Torch, so it is deferred until a document actually needs OCR
+                import easyocr
+                _reader = easyocr.Reader(Config.OCR_LANGUAGES)
+                logger.info(f"EasyOCR reader loaded in {time.perf_counter() - start:.2f}s")
+    return _reader
+
+
+def is_loaded():
+    """Return True if the OCR models are already resident in this process"""
+    return _reader is not None
+
+
+def warm_up():
+    """Load the OCR models ahead of the first request (e.g. from a server hook or worker initializer)"""
+    get_reader()
+
+
+def readtext(image):
+    """
+    OCR one image with the shared reader
+
+    Args:
+        image: File path, encoded image bytes or numpy array
+
+    Returns:
+        str: Recognized text, fragments joined by spaces
+    """
+    result = get_reader().readtext(image, batch_size=Config.OCR_BATCH_SIZE)
+    return ' '.join([text_result[1] for text_result in result])
+
+
+def set_torch_threads(threads):
+    """
+    Limit the intra-op threads Torch uses in this process
+
+    OCR processes run side by side, so each one gets a few threads instead of
+    every process starting one thread per core and oversubscribing the CPU.
+    """
+    if threads <= 0:
+        return
+    # Read by OpenMP/MKL when Torch is first imported
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before Torch starts any parallel work
+        pass
+
+
+def init_worker(threads):
+    """Initializer for OCR worker processes: tune Torch threads, then load the models"""
+    set_torch_threads(threads)
+    warm_up()
@@ -0,0 +1,147 @@
+"""
+Local OCR process pool for a single web process.
+
+When the shared OCR service is off and OCR_LOCAL_WORKERS is not 1, scanned PDF
+pages are OCR'd on a pool of worker processes, each holding one EasyOCR/Torch model and running Torch with
+OCR_TORCH_THREADS intra-op threads, so pages use separate cores instead of
+contending for the same ones. Workers take the next queued page as soon as they
+are free, so a slow page never holds up the others. Each request keeps at most
+OCR_MAX_CORES_PER_REQUEST // OCR_TORCH_THREADS pages queued, which interleaves
+concurrent requests on the pool instead of serving them one after another.
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from utils import ocr_engine
+from utils.ocr_service import pages_per_request
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the automatic pool size; every worker holds its own copy of the models
+MAX_AUTO_WORKERS = 4
+
+
+def pool_size():
+    """
+    Number of OCR worker processes from Config.OCR_LOCAL_WORKERS
+
+    Returns:
+        int: Pool size; 1 means OCR runs in the calling process
+    """
+    if Config.OCR_LOCAL_WORKERS > 0:
+        return Config.OCR_LOCAL_WORKERS
+    cores = os.cpu_count() or 1
+    return max(1, min(MAX_AUTO_WORKERS, cores // max(1, Config.OCR_TORCH_THREADS)))
+
+
+class OCRPool:
+    """Process pool that OCRs page images; the processes and models start on first use"""
+
+    # Seconds to keep OCR in-process after the pool broke before starting it again
+    RETRY_INTERVAL = 30
+
+    def __init__(self, workers, threads):
+        """
+        Args:
+            workers (int): OCR worker processes
+            threads (int): Torch intra-op threads per worker
+        """
+        self.workers = workers
+        self.threads = threads
+        self.max_in_flight = min(workers, pages_per_request(threads))
+        self._executor = None
+        self._lock = threading.Lock()
+        self._last_failure = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers start without the parent's threads and import Torch with the thread limits set
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=ocr_engine.init_worker,
+                                                     initargs=(self.threads,))
+                logger.info(f"Started local OCR pool with {self.workers} workers x {self.threads} Torch threads")
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._last_failure = time.time()
+        # A worker died (e.g. killed for memory); the pool is restarted after RETRY_INTERVAL
+        logger.warning(f"Local OCR pool broke, using in-process OCR for {self.RETRY_INTERVAL}s")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def available(self):
+        """Return False while the pool is backing off after a failure"""
+        return time.time() - self._last_failure >= self.RETRY_INTERVAL
+
+    def submit(self, image):
+        """
+        Queue one page image for OCR
+
+        Returns:
+            concurrent.futures.Future: Resolves to the recognized text; raises if the worker failed
+        """
+        executor = self._get_executor()
+        try:
+            future = executor.submit(ocr_engine.readtext, image)
+        except BrokenProcessPool as e:
+            self._reset(executor)
+            future = Future()
+            future.set_exception(e)
+            return future
+        future.add_done_callback(lambda done: self._check_broken(executor, done))
+        return future
+
+    def _check_broken(self, executor, future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset(executor)
+
+    def readtext(self, image):
+        """
+        OCR a single image on the pool
+
+        Returns:
+            str: Recognized text, an error message if it took over OCR_PAGE_TIMEOUT_SECONDS, or None if the
+                pool failed
+        """
+        future = self.submit(image)
+        try:
+            return future.result(timeout=Config.OCR_PAGE_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(f"Local OCR pool did not finish an image in {Config.OCR_PAGE_TIMEOUT_SECONDS}s")
+            return f"Error: OCR timed out after {Config.OCR_PAGE_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            logger.warning(f"Local OCR pool failed, using in-process OCR: {e}")
+            return None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide OCR pool, or None when OCR should run in the calling process"""
+    global _pool
+    if Config.OCR_SERVICE_ENABLED or pool_size() <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = OCRPool(pool_size(), Config.OCR_TORCH_THREADS)
+        return _pool if _pool.available() else None
@@ -0,0 +1,188 @@
+"""
+Image preprocessing ahead of EasyOCR.
+
+Page renders and uploaded images are reduced to what recognition needs: one
+grayscale channel, text lines straightened, the page cropped to the text, and
+the image scaled so a typical glyph is about OCR_TARGET_TEXT_HEIGHT pixels
+tall. EasyOCR's detector cost grows with the pixel count, so smaller arrays
+make pages faster, and straight text is recognized at least as well as skewed
+text. Images that cannot be analysed (blank pages, photos without text-like
+shapes) are passed on unchanged apart from the grayscale conversion.
+"""
+import logging
+
+import cv2
+import numpy as np
+
+from config import Config
+from utils.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# The skew is estimated on a copy whose longer side is at most this many pixels
+ANALYSIS_LONG_SIDE = 1200
+# Connected components outside these bounds (in pixels, at full size) are not glyphs
+MIN_GLYPH_HEIGHT = 4
+MIN_GLYPH_AREA = 6
+# Angles below this are not worth an extra rotation
+MIN_DESKEW_DEGREES = 0.2
+
+
+def to_grayscale(image):
+    """
+    Args:
+        image (numpy.ndarray): Grayscale, RGB or RGBA image
+
+    Returns:
+        numpy.ndarray: Single-channel uint8 image
+    """
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+
+def _ink_mask(gray):
+    """Binary mask (255 = ink) of dark text on a light background"""
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return mask
+
+
+def estimate_skew(mask):
+    """
+    Estimate the text line angle of a page
+
+    Glyphs are smeared horizontally into line blobs and the median angle of the
+    elongated blobs is taken, so headings, columns and stray marks do not
+    dominate the estimate.
+
+    Args:
+        mask (numpy.ndarray): Ink mask from _ink_mask
+
+    Returns:
+        float: Angle in degrees to rotate the page by (counter-clockwise) to level the lines; 0.0 if unknown
+    """
+    scale = min(1.0, ANALYSIS_LONG_SIDE / max(mask.shape))
+    small = cv2.resize(mask, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else mask
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, small.shape[1] // 60), 1))
+    lines = cv2.dilate(small, kernel)
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    angles = []
+    for contour in contours:
+        (_, _), (width, height), angle = cv2.minAreaRect(contour)
+        if width < height:
+            width, height = height, width
+            angle -= 90
+        # Only blobs that look like lines of text say anything about the skew
+        if width < 5 * max(height, 1) or width < small.shape[1] * 0.1:
+            continue
+        angle = (angle + 45) % 90 - 45
+        angles.append(angle)
+    if not angles:
+        return 0.0
+    return float(np.median(angles))
+
+
+def rotate(gray, angle):
+    """Rotate counter-clockwise by angle degrees, growing the canvas and filling it with white"""
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_width, new_height = int(height * sin + width * cos), int(height * cos + width * sin)
+    matrix[0, 2] += new_width / 2 - width / 2
+    matrix[1, 2] += new_height / 2 - height / 2
+    return cv2.warpAffine(gray, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+
+def find_glyphs(mask):
+    """
+    Bounding box of the text and the median glyph height
+
+    Args:
+        mask (numpy.ndarray): Ink mask from _ink_mask
+
+    Returns:
+        tuple: ((x0, y0, x1, y1), median glyph height in pixels), or (None, None) if no glyphs were found
+    """
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    # Row 0 is the background; drop specks and anything larger than a line of large type
+    stats = stats[1:count]
+    heights = stats[:, cv2.CC_STAT_HEIGHT]
+    glyphs = stats[(heights >= MIN_GLYPH_HEIGHT) & (heights <= mask.shape[0] // 8)
+                   & (stats[:, cv2.CC_STAT_AREA] >= MIN_GLYPH_AREA)]
+    if not len(glyphs):
+        return None, None
+    x0 = glyphs[:, cv2.CC_STAT_LEFT].min()
+    y0 = glyphs[:, cv2.CC_STAT_TOP].min()
+    x1 = (glyphs[:, cv2.CC_STAT_LEFT] + glyphs[:, cv2.CC_STAT_WIDTH]).max()
+    y1 = (glyphs[:, cv2.CC_STAT_TOP] + glyphs[:, cv2.CC_STAT_HEIGHT]).max()
+    return (int(x0), int(y0), int(x1), int(y1)), float(np.median(glyphs[:, cv2.CC_STAT_HEIGHT]))
+
+
+def preprocess(image):
+    """
+    Grayscale, deskew, crop to the text and downscale one image
+
+    Args:
+        image (numpy.ndarray): Page render or decoded image
+
+    Returns:
+        numpy.ndarray: Single-channel image cropped to the text. A deskewed page whose text reaches its edges
+            can come out a little larger than the input, since rotate grows the canvas
+    """
+    gray = to_grayscale(image)
+    mask = _ink_mask(gray)
+    ink = cv2.countNonZero(mask) / mask.size
+    if ink == 0 or ink > 0.5:
+        # Blank, or not dark text on a light background
+        return gray
+
+    angle = estimate_skew(mask)
+    if MIN_DESKEW_DEGREES <= abs(angle) <= Config.OCR_MAX_DESKEW_DEGREES:
+        gray = rotate(gray, angle)
+        mask = _ink_mask(gray)
+
+    box, glyph_height = find_glyphs(mask)
+    if box is None:
+        return gray
+    margin = Config.OCR_CROP_MARGIN
+    x0, y0, x1, y1 = box
+    gray = gray[max(0, y0 - margin):y1 + margin, max(0, x0 - margin):x1 + margin]
+
+    # Only ever shrink: upscaling adds pixels without adding detail
+    scale = Config.OCR_TARGET_TEXT_HEIGHT / glyph_height
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(gray)
+
+
+def prepare(image):
+    """
+    Apply preprocessing if enabled, decoding file paths and encoded images first
+
+    Args:
+        image: File path, encoded image bytes or numpy array
+
+    Returns:
+        The preprocessed numpy array, or the input unchanged if preprocessing is off or fails
+    """
+    if not Config.OCR_PREPROCESS_ENABLED:
+        return image
+    try:
+        with span("ocr.preprocess"):
+            if isinstance(image, str):
+                decoded = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+            elif isinstance(image, (bytes, bytearray)):
+                decoded = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            else:
+                decoded = image
+            if decoded is None:
+                # Not an image OpenCV can read; let EasyOCR report the error
+                return image
+            return preprocess(decoded)
+    except Exception as e:
+        logger.warning(f"OCR preprocessing failed, using the original image: {e}")
+        return image
@@ -0,0 +1,198 @@
+"""
+Local OCR service shared by all web workers.
+
+A single service process owns a fixed-size pool of OCR worker processes, each
+holding one EasyOCR/Torch model. Web workers submit page images over a local
+socket and the pool's task queue hands them to whichever OCR worker is free,
+so model memory scales with OCR_WORKERS instead of the web worker count.
+
+The manager unpickles whatever an authenticated client sends, so the service
+and its clients refuse to start without an explicit OCR_SERVICE_AUTHKEY, and
+the service only listens on a loopback address or a unix socket.
+
+Run standalone with:
+    OCR_SERVICE_AUTHKEY=... python -m utils.ocr_service
+"""
+import os
+import time
+import logging
+import ipaddress
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.managers import BaseManager
+
+from config import Config
+from utils import ocr_engine
+
+logger = logging.getLogger(__name__)
+
+# Keys anyone can read from the repository, which must never protect the service
+PUBLIC_AUTHKEYS = frozenset(["", "dev-secret"])
+
+
+class OCRService:
+    """Service object exposed to clients; forwards each page to the worker pool"""
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def readtext(self, image):
+        return self._pool.apply(ocr_engine.readtext, (image,))
+
+
+class OCRServiceManager(BaseManager):
+    pass
+
+
+def service_settings():
+    """
+    Address and authentication key of the OCR service, refusing settings that would expose it
+
+    Returns:
+        tuple: (unix socket path or (host, port), authkey bytes)
+
+    Raises:
+        ValueError: If OCR_SERVICE_AUTHKEY is unset or public, or OCR_SERVICE_HOST is not a loopback address
+    """
+    if Config.OCR_SERVICE_AUTHKEY in PUBLIC_AUTHKEYS:
+        raise ValueError("OCR_SERVICE_AUTHKEY must be set to a secret value to use the OCR service")
+    authkey = Config.OCR_SERVICE_AUTHKEY.encode('utf-8')
+    if Config.OCR_SERVICE_SOCKET:
+        return Config.OCR_SERVICE_SOCKET, authkey
+
+    host = Config.OCR_SERVICE_HOST
+    try:
+        loopback = host == "localhost" or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(f"OCR_SERVICE_HOST must be a loopback address, not '{host}'; "
+                         f"use OCR_SERVICE_SOCKET to share the service between containers")
+    return (host, Config.OCR_SERVICE_PORT), authkey
+
+
+def serve():
+    """Start the OCR worker pool and serve requests until the process is terminated"""
+    address, authkey = service_settings()
+    pool = multiprocessing.Pool(processes=Config.OCR_WORKERS, initializer=ocr_engine.init_worker,
+                                initargs=(Config.OCR_TORCH_THREADS,))
+    service = OCRService(pool)
+    OCRServiceManager.register('get_service', callable=lambda: service)
+
+    if isinstance(address, str) and os.path.exists(address):
+        # Left behind by a service that was killed
+        os.unlink(address)
+    manager = OCRServiceManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    if isinstance(address, str):
+        os.chmod(address, 0o600)
+    logger.info(f"OCR service listening on {address} with {Config.OCR_WORKERS} workers")
+    try:
+        server.serve_forever()
+    finally:
+        pool.terminate()
+
+
+class OCRClient:
+    """Client side of the OCR service used by ResumeProcessor"""
+
+    # Seconds to wait before trying to reach an unavailable service again
+    RETRY_INTERVAL = 30
+
+    def __init__(self):
+        """
+        Raises:
+            ValueError: If the service settings are unsafe, see service_settings
+        """
+        self._address, self._authkey = service_settings()
+        OCRServiceManager.register('get_service')
+        self._service = None
+        self._lock = threading.Lock()
+        self._last_failure = 0.0
+        self._page_pool = ThreadPoolExecutor(max_workers=Config.OCR_WORKERS, thread_name_prefix="ocr-client")
+        # Pages one request may keep queued on the service
+        self.max_in_flight = min(Config.OCR_WORKERS, pages_per_request(Config.OCR_TORCH_THREADS))
+
+    def _get_service(self):
+        with self._lock:
+            if self._service is None:
+                if time.time() - self._last_failure < self.RETRY_INTERVAL:
+                    return None
+                try:
+                    manager = OCRServiceManager(address=self._address, authkey=self._authkey)
+                    manager.connect()
+                    self._service = manager.get_service()
+                except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                    self._last_failure = time.time()
+                    logger.warning(f"OCR service unavailable, using in-process OCR: {e!r}")
+                    return None
+            return self._service
+
+    def readtext(self, image):
+        """
+        OCR a single image on the service
+
+        Returns:
+            str: Recognized text, or None if the service is unreachable
+        """
+        service = self._get_service()
+        if service is None:
+            return None
+        try:
+            return service.readtext(image)
+        except (OSError, EOFError) as e:
+            # Connection dropped (e.g. service restarted); reconnect on the next call
+            with self._lock:
+                self._service = None
+                self._last_failure = time.time()
+            logger.warning(f"Lost connection to OCR service: {e}")
+            return None
+
+    def submit(self, image):
+        """
+        Queue one page image for OCR on the service
+
+        Returns:
+            concurrent.futures.Future: Resolves to the recognized text, or None if the service is unreachable
+        """
+        return self._page_pool.submit(self.readtext, image)
+
+
+def pages_per_request(threads):
+    """
+    Pages one request may have in flight at once, from Config.OCR_MAX_CORES_PER_REQUEST
+
+    Args:
+        threads (int): Torch threads each OCR process uses
+
+    Returns:
+        int: At least 1
+    """
+    return max(1, Config.OCR_MAX_CORES_PER_REQUEST // max(1, threads))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide OCR client, or None when the OCR service is disabled
+
+    Raises:
+        ValueError: If the service is enabled with unsafe settings, see service_settings
+    """
+    global _client
+    if not Config.OCR_SERVICE_ENABLED:
+        return None
+    with _client_lock:
+        if _client is None:
+            _client = OCRClient()
+        return _client
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    serve()
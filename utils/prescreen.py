@@ -0,0 +1,148 @@
+"""
+Local, deterministic pre-screen ranking of resumes against a job description.
+
+Each requisition (job description hash) has an incremental BM25 index over the
+extracted text of every applicant seen for it, so new applicants are added
+without rebuilding and term weights reflect the whole applicant pool. A batch is
+ranked by a blend of BM25 relevance and required-skill coverage from the job
+profile, and only the top resumes are sent to Gemini.
+"""
+import re
+import math
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+from config import Config
+from utils.job_profile import get_job_profile
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+
+# Share of the pre-screen score taken by required-skill coverage; the rest is BM25 relevance
+SKILL_WEIGHT = 0.6
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class PrescreenIndex:
+    """Incremental BM25 index of resume texts"""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_counts = {}
+        self._doc_freq = Counter()
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._term_counts)
+
+    def add(self, doc_id, text):
+        """
+        Add a document; documents already in the index are left unchanged
+
+        Returns:
+            bool: Whether the document was new
+        """
+        terms = Counter(tokenize(text))
+        with self._lock:
+            if doc_id in self._term_counts:
+                return False
+            self._term_counts[doc_id] = terms
+            self._doc_freq.update(terms.keys())
+            self._total_length += sum(terms.values())
+            return True
+
+    def score(self, query, doc_ids):
+        """
+        BM25 score of each document for the query
+
+        Args:
+            query (str): Query text; each distinct term counts once
+            doc_ids (list): Documents to score
+
+        Returns:
+            list: Score per doc id, in the given order
+        """
+        query_terms = set(tokenize(query))
+        with self._lock:
+            num_docs = len(self._term_counts)
+            avg_length = self._total_length / num_docs if num_docs else 0.0
+            idf = {term: math.log(1 + (num_docs - self._doc_freq[term] + 0.5) / (self._doc_freq[term] + 0.5))
+                   for term in query_terms if self._doc_freq[term]}
+            scores = []
+            for doc_id in doc_ids:
+                terms = self._term_counts[doc_id]
+                length_norm = self.k1 * (1 - self.b + self.b * sum(terms.values()) / avg_length) if avg_length else 0
+                score = 0.0
+                for term, weight in idf.items():
+                    frequency = terms.get(term, 0)
+                    if frequency:
+                        score += weight * frequency * (self.k1 + 1) / (frequency + length_norm)
+                scores.append(score)
+            return scores
+
+
+def document_id(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(jd_hash):
+    """Return the index for a requisition, creating it on first use"""
+    with _indexes_lock:
+        index = _indexes.get(jd_hash)
+        if index is None:
+            index = _indexes[jd_hash] = PrescreenIndex()
+            while len(_indexes) > Config.PRESCREEN_INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(jd_hash)
+        return index
+
+
+def prescreen(job_description, texts, top_n=None):
+    """
+    Rank resume texts locally and mark the top ones for LLM analysis
+
+    Args:
+        job_description (str): Job description string
+        texts (list): Extracted resume texts
+        top_n (int): How many resumes to shortlist (default: Config.PRESCREEN_TOP_N)
+
+    Returns:
+        list: {"prescreen_score", "prescreen_rank", "shortlisted"} per text, in input order
+    """
+    top_n = Config.PRESCREEN_TOP_N if top_n is None else top_n
+    job_profile = get_job_profile(job_description)
+    index = get_index(job_profile.jd_hash)
+
+    doc_ids = [document_id(text) for text in texts]
+    for doc_id, text in zip(doc_ids, texts):
+        index.add(doc_id, text)
+
+    query = job_profile.to_prompt() if job_profile.is_informative() else job_description
+    relevance = index.score(query, doc_ids)
+    best = max(relevance, default=0.0) or 1.0
+
+    scores = []
+    for text, bm25 in zip(texts, relevance):
+        coverage = job_profile.match_skills(text)["coverage"]
+        if coverage is None:
+            scores.append(bm25 / best)
+        else:
+            scores.append(SKILL_WEIGHT * coverage / 100 + (1 - SKILL_WEIGHT) * bm25 / best)
+
+    # Stable sort: equal scores keep upload order, so the ranking is deterministic
+    order = sorted(range(len(texts)), key=lambda i: -scores[i])
+    ranking = [None] * len(texts)
+    for rank, i in enumerate(order, start=1):
+        ranking[i] = {"prescreen_score": round(scores[i] * 100, 1), "prescreen_rank": rank,
+                      "shortlisted": rank <= top_n}
+    return ranking
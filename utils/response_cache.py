@@ -0,0 +1,188 @@
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """TTL cache for parsed LLM responses with an LRU memory tier, optional disk tier and request coalescing"""
+
+    def __init__(self, ttl_seconds, max_entries, disk_path=None):
+        """
+        Args:
+            ttl_seconds (float): How long a cached response stays valid
+            max_entries (int): Entries kept in the in-memory LRU tier
+            disk_path (str): Optional SQLite file for a persistent second tier
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or '.', exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.disk_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(prompt, model_name, generation_config):
+        """
+        Build a cache key from a prompt and the settings that affect the model output
+
+        Args:
+            prompt (str): Prompt text; whitespace differences are ignored
+            model_name (str): Model the prompt is sent to
+            generation_config (dict): Sampling settings used for the call
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        normalized = " ".join(prompt.split())
+        payload = json.dumps({"prompt": normalized, "model": model_name, "config": generation_config},
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _get_memory(self, key, now):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _set_memory(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return a copy of the cached value for key, or None if missing or expired"""
+        with self._lock:
+            value = self._get_memory(key, time.time())
+            if value is not None:
+                self._counters["memory_hits"] += 1
+                return copy.deepcopy(value)
+        return self._get_disk(key)
+
+    def _get_disk(self, key):
+        """Look key up in the disk tier, counting a disk hit or a miss"""
+        if self.disk_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                                       (key, time.time())).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    with self._lock:
+                        # Promote to the memory tier for the remaining lifetime
+                        self._set_memory(key, value, row[1])
+                        self._counters["disk_hits"] += 1
+                    return copy.deepcopy(value)
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Response cache disk lookup failed: {e}")
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key for ttl_seconds"""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._set_memory(key, copy.deepcopy(value), expires_at)
+
+        if self.disk_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                                 (key, json.dumps(value), expires_at))
+                    conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.warning(f"Response cache disk store failed: {e}")
+
+    def get_or_compute(self, key, compute, should_cache=lambda value: True):
+        """
+        Return the cached value for key, computing it at most once across concurrent callers
+
+        Args:
+            key (str): Cache key from make_key
+            compute (callable): Produces the value on a miss
+            should_cache (callable): Decides whether a computed value may be stored
+
+        Returns:
+            A copy of the cached or freshly computed value
+        """
+        # The memory lookup and the in-flight registration happen under one lock: a leader stores its
+        # value before leaving _inflight, so every later caller sees either the value or the future
+        with self._lock:
+            value = self._get_memory(key, time.time())
+            if value is not None:
+                self._counters["memory_hits"] += 1
+                return copy.deepcopy(value)
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            # Another thread is already calling upstream for this key; share its result
+            return copy.deepcopy(future.result())
+
+        try:
+            value = self._get_disk(key)
+            if value is None:
+                value = compute()
+                if value is not None and should_cache(value):
+                    self.set(key, value)
+            future.set_result(value)
+            return copy.deepcopy(value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        """Return hit/miss counters for the cache"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
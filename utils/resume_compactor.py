@@ -0,0 +1,288 @@
+"""
+Section-aware compaction of resume text before it is sent to Gemini.
+
+Extracted text is normalized (Unicode forms, whitespace, OCR debris) and split
+into sections by their headings. When the resume is over the token budget, page numbers
+at the top or bottom of a page are dropped and lines repeated there on every page
+(headers and footers) are kept once. Sections are then
+added in order of relevance (skills and experience first, the rest ranked by
+overlap with the job description) until the token budget is spent, instead of
+cutting the text at a fixed character count.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from utils.async_gemini import estimate_tokens
+
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'professional profile', 'objective',
+                'career objective', 'about me', 'about'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'relevant experience'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'core competencies', 'competencies',
+               'technologies', 'tools', 'tools and technologies', 'skills and tools', 'expertise'],
+    'education': ['education', 'academic background', 'academics', 'qualifications',
+                  'education and training', 'academic qualifications'],
+    'projects': ['projects', 'key projects', 'personal projects', 'academic projects'],
+    'certifications': ['certifications', 'certificates', 'licenses', 'licenses and certifications', 'courses'],
+    'awards': ['awards', 'honors', 'achievements', 'honors and awards', 'accomplishments'],
+    'publications': ['publications', 'research', 'patents'],
+    'languages': ['languages'],
+    'volunteering': ['volunteering', 'volunteer experience', 'leadership', 'activities'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests'],
+    'references': ['references'],
+}
+HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Always kept first, in this order; experience goes last of these so a long work history is cut
+# (keeping the most recent roles) rather than crowding out the short sections
+CORE_SECTIONS = ['contact', 'skills', 'summary', 'education', 'experience']
+# Remaining sections are ranked by overlap with the job description
+# Only kept if budget remains after everything else
+LOW_PRIORITY_SECTIONS = ['interests', 'references']
+
+PAGE_NUMBER_PATTERN = re.compile(r'^(page\s*)?\d+(\s*(of|/)\s*\d+)?$', re.IGNORECASE)
+NOISE_LINE_PATTERN = re.compile(r'^[\W_]{1,3}$')
+HORIZONTAL_SPACE_PATTERN = re.compile(r'[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+')
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+WORD_PATTERN = re.compile(r'[a-z][a-z0-9+#.]{2,}')
+
+# Extraction separates PDF pages with a form feed, as pdftotext does
+PAGE_BREAK = '\f'
+# Only the first and last line of a page can be a header or footer
+PAGE_EDGE_LINES = 1
+# A short edge line repeated on this many pages (or on every page of a shorter document) is page furniture
+REPEATED_LINE_MIN_COUNT = 3
+REPEATED_LINE_MAX_CHARS = 80
+
+
+def normalize_text(text):
+    """
+    Normalize Unicode, whitespace and OCR debris line by line
+
+    Returns:
+        list: Cleaned lines, with runs of blank lines collapsed to one empty string
+    """
+    text = unicodedata.normalize('NFKC', text).replace('\r\n', '\n').replace('\r', '\n')
+    lines = []
+    for raw in text.split('\n'):
+        line = HORIZONTAL_SPACE_PATTERN.sub(' ', raw).strip()
+        if line and NOISE_LINE_PATTERN.match(line):
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _furniture_key(line):
+    # Headers and footers often differ only in a page number or date
+    return re.sub(r'\d+', '#', line.lower())
+
+
+def _drop_page_numbers(lines):
+    """Remove page numbers from the top and bottom of a page, leaving numbers in the body (years, phones)"""
+    lines = list(lines)
+    for index in sorted(_edge_indexes(lines), reverse=True):
+        if PAGE_NUMBER_PATTERN.match(lines[index]):
+            del lines[index]
+    return lines
+
+
+def _edge_indexes(lines):
+    """Indexes of the first and last few non-empty lines of a page"""
+    filled = [index for index, line in enumerate(lines) if line]
+    return set(filled[:PAGE_EDGE_LINES] + filled[-PAGE_EDGE_LINES:])
+
+
+def split_pages(text):
+    """Normalize text page by page, dropping pages left empty"""
+    pages = (normalize_text(page) for page in text.split(PAGE_BREAK))
+    return [lines for lines in pages if lines]
+
+
+def _join_pages(pages):
+    return [line for index, lines in enumerate(pages) for line in ([''] if index else []) + lines]
+
+
+def dedupe_repeated_lines(pages):
+    """
+    Drop page numbers, and keep only the first occurrence of headers, footers and consecutive duplicate lines
+
+    Only short lines at the top or bottom of a page that repeat at the edges of several pages count as
+    headers or footers, so a job title, date line or "Responsibilities:" heading repeated inside the
+    resume body is kept.
+
+    Args:
+        pages (list): Normalized lines per page, as returned by split_pages
+
+    Returns:
+        list: Lines of all pages, with an empty line between pages
+    """
+    pages = [_drop_page_numbers(lines) for lines in pages]
+    edges = [_edge_indexes(lines) for lines in pages]
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter()
+        for lines, indexes in zip(pages, edges):
+            # Number-only lines (years, phone numbers) are body text once page numbers are gone
+            counts.update({_furniture_key(lines[index]) for index in indexes
+                           if len(lines[index]) <= REPEATED_LINE_MAX_CHARS and LETTER_PATTERN.search(lines[index])})
+        min_count = min(REPEATED_LINE_MIN_COUNT, len(pages))
+        repeated = {key for key, count in counts.items() if count >= min_count}
+
+    seen = set()
+    result = []
+    for lines, indexes in zip(pages, edges):
+        if result and result[-1]:
+            result.append('')
+        for index, line in enumerate(lines):
+            if result and line and line == result[-1]:
+                continue
+            key = _furniture_key(line) if index in indexes else None
+            if key in repeated:
+                if key in seen:
+                    continue
+                seen.add(key)
+            result.append(line)
+    return result
+
+
+def _heading_section(line):
+    """Return the section a heading line starts, or None if the line is not a heading"""
+    if len(line) > 40:
+        return None
+    key = re.sub(r'[^a-z& ]', '', line.lower()).replace('&', 'and')
+    key = ' '.join(key.split())
+    return HEADING_TO_SECTION.get(key)
+
+
+def split_sections(lines):
+    """
+    Split lines into sections by their headings
+
+    Returns:
+        list: (section name, lines) in document order; text before the first heading is "contact"
+    """
+    sections = [('contact', [])]
+    for line in lines:
+        section = _heading_section(line) if line else None
+        if section is not None:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if any(body)]
+
+
+def _line_tokens(line):
+    # Rounded up per line (newline included) so the kept lines never add up to more than the budget
+    return len(line) // 4 + 1
+
+
+def _fit_lines(lines, budget, cut_last=True):
+    """
+    Longest prefix of lines that fits the token budget; the first line that does not fit is cut at a word
+    unless cut_last is False
+    """
+    kept, used = [], 0
+    for line in lines:
+        cost = _line_tokens(line)
+        if used + cost > budget:
+            if not cut_last:
+                break
+            # OCR output can be a whole page on one line, so keep as much of it as fits
+            cut = line[:max(0, (budget - used) * 4 - 1)].rsplit(' ', 1)[0]
+            if cut:
+                kept.append(cut)
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def _section_relevance(lines, job_terms):
+    if not job_terms:
+        return 0.0
+    words = WORD_PATTERN.findall(' '.join(lines).lower())
+    if not words:
+        return 0.0
+    return sum(1 for word in words if word in job_terms) / len(words)
+
+
+def compact_resume(resume_text, job_description='', token_budget=6000):
+    """
+    Reduce resume text to its most relevant sections within a token budget
+
+    Args:
+        resume_text (str): Extracted resume text
+        job_description (str): Job description used to rank optional sections
+        token_budget (int): Approximate maximum tokens of the compacted text
+
+    Returns:
+        dict: text, sections (kept, in document order), omitted_sections, truncated_sections,
+            original_tokens, compacted_tokens and saved_tokens
+    """
+    original_tokens = estimate_tokens(resume_text)
+    # Repeated lines are only dropped when something has to go; under budget the resume is kept whole
+    pages = split_pages(resume_text)
+    lines = dedupe_repeated_lines(pages) if original_tokens > token_budget else _join_pages(pages)
+    sections = split_sections(lines)
+
+    job_terms = set(WORD_PATTERN.findall(job_description.lower()))
+
+    def priority(index):
+        name, lines = sections[index]
+        if name in CORE_SECTIONS:
+            return 0, CORE_SECTIONS.index(name), index
+        if name in LOW_PRIORITY_SECTIONS:
+            return 2, 0, index
+        return 1, -_section_relevance(lines, job_terms), index
+
+    kept = {}
+    truncated = []
+    remaining = token_budget
+    for index in sorted(range(len(sections)), key=priority):
+        name, lines = sections[index]
+        fitted = _fit_lines(lines, remaining)
+        if not any(fitted):
+            continue
+        if fitted != lines:
+            truncated.append(name)
+        kept[index] = fitted
+        remaining -= sum(_line_tokens(line) for line in fitted)
+
+    # Kept sections are emitted in their original order so the resume still reads naturally
+    text = '\n'.join('\n'.join(kept[index]).strip() for index in sorted(kept))
+    compacted_tokens = estimate_tokens(text)
+    return {
+        'text': text,
+        'sections': [sections[index][0] for index in sorted(kept)],
+        'omitted_sections': [name for index, (name, _) in enumerate(sections) if index not in kept],
+        'truncated_sections': truncated,
+        'original_tokens': original_tokens,
+        'compacted_tokens': compacted_tokens,
+        'saved_tokens': max(0, original_tokens - compacted_tokens)
+    }
+
+
+def compact_job_description(job_description, token_budget=2000):
+    """
+    Normalize a job description and cut it at a line boundary within the token budget
+
+    Returns:
+        dict: text, original_tokens, compacted_tokens and saved_tokens
+    """
+    original_tokens = estimate_tokens(job_description)
+    pages = split_pages(job_description)
+    lines = dedupe_repeated_lines(pages) if original_tokens > token_budget else _join_pages(pages)
+    text = '\n'.join(_fit_lines(lines, token_budget, cut_last=False)).strip()
+    compacted_tokens = estimate_tokens(text)
+    return {
+        'text': text,
+        'original_tokens': original_tokens,
+        'compacted_tokens': compacted_tokens,
+        'saved_tokens': max(0, original_tokens - compacted_tokens)
+    }
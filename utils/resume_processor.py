@@ -1,132 +1,380 @@
 import os
 import logging
 import traceback
+import io
 import json
+import time
+import asyncio
+import sqlite3
+import contextvars
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from utils.gemini_api import GeminiAPI
+from utils.text_cache import TextCache
+from utils.candidate_store import CandidateStore
+from utils.resume_compactor import PAGE_BREAK
+from utils.job_profile import get_job_profile, skills_match_score
+from utils.metrics import span, record_stage
+from utils import async_gemini
+from utils import ocr_engine
+from utils import ocr_service
+from utils import ocr_pool
+from utils import ocr_preprocess
 import PyPDF2
 import docx
 from config import Config
 import fitz
-import easyocr
+import numpy as np
 from PIL import Image
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction output changes so stale cache entries are ignored
+EXTRACTOR_VERSION = 6
+
 
 class ResumeProcessor:
     def __init__(self):
         try:
             self.gemini_api = GeminiAPI()
-            # Initialize EasyOCR reader once during startup
-            self.reader = easyocr.Reader(['en'])  # Initialize with English language
+            # EasyOCR and Torch load lazily on the first document that needs OCR unless preloading is requested
+            if Config.OCR_PRELOAD:
+                ocr_engine.warm_up()
+            # An OCR service without a safe address and key fails here rather than on the first scan
+            ocr_service.get_client()
+            self._init_text_caches()
+            # Past screenings are kept for search instead of being recomputed
+            self.candidate_store = None
+            if Config.CANDIDATE_STORE_ENABLED:
+                self.candidate_store = CandidateStore(Config.CANDIDATE_STORE_PATH,
+                                                      Config.CANDIDATE_STORE_RETENTION_SECONDS)
             logger.info("ResumeProcessor initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize ResumeProcessor: {e}")
             traceback.print_exc()
             raise
 
-    def extract_text_with_easyocr(self, image_path):
+    @classmethod
+    def for_extraction(cls):
+        """
+        ResumeProcessor that only extracts text (extract_text and OCR), without a Gemini client or
+        candidate store, e.g. for extraction worker processes
+        """
+        processor = cls.__new__(cls)
+        processor.gemini_api = None
+        processor.candidate_store = None
+        processor._init_text_caches()
+        return processor
+
+    def _init_text_caches(self):
+        # Extracted text is cached by file content so re-screenings skip parsing and OCR
+        self.text_cache = None
+        if Config.EXTRACTION_CACHE_ENABLED:
+            self.text_cache = TextCache(Config.EXTRACTION_CACHE_PATH, Config.EXTRACTION_CACHE_MAX_BYTES)
+        # OCR text is also cached per page image, for pages that reappear in other uploads
+        self.page_cache = None
+        if Config.OCR_PAGE_CACHE_ENABLED:
+            self.page_cache = TextCache(Config.OCR_PAGE_CACHE_PATH, Config.OCR_PAGE_CACHE_MAX_BYTES)
+
+    @property
+    def reader(self):
+        """Shared EasyOCR reader, loaded on first access"""
+        return ocr_engine.get_reader()
+
+    def extract_text_with_easyocr(self, image):
+        """
+        OCR a single image
+
+        Args:
+            image: File path, encoded image bytes or numpy array
+
+        Returns:
+            str: Recognized text, or an error message
+        """
         try:
+            # Prefer the shared OCR service so this worker never has to load the models itself
+            client = ocr_service.get_client()
+            if client is not None:
+                if isinstance(image, str):
+                    with open(image, 'rb') as image_file:
+                        image = image_file.read()
+                text = client.readtext(image)
+                if text is not None:
+                    return text
+            else:
+                # Otherwise use the local OCR processes, which keep Torch out of the web process
+                pool = ocr_pool.get_pool()
+                if pool is not None:
+                    text = pool.readtext(image)
+                    if text is not None:
+                        return text
+
             # Use EasyOCR to extract text
-            result = self.reader.readtext(image_path)
-            # Combine all detected text
-            text = ' '.join([text_result[1] for text_result in result])
-            return text
+            return ocr_engine.readtext(image)
         except Exception as e:
             logger.error(f"Error in EasyOCR processing: {e}")
             traceback.print_exc()
             return f"Error processing with EasyOCR: {str(e)}"
 
-    def pdf_to_images(self, pdf_path, output_dir):
-        try:
-            os.makedirs(output_dir, exist_ok=True)
-            doc = fitz.open(pdf_path)
-            image_paths = []
+    @staticmethod
+    def _render_zoom(page):
+        """Pick a zoom so the page's longer side renders at about OCR_TARGET_LONG_SIDE pixels"""
+        long_side = max(page.rect.width, page.rect.height) or 1
+        zoom = Config.OCR_TARGET_LONG_SIDE / long_side
+        return min(max(zoom, Config.OCR_MIN_ZOOM), Config.OCR_MAX_ZOOM)
 
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2.5, 2.5))
-                image_path = os.path.join(output_dir, f"page_{page_num + 1}.png")
-                pix.save(image_path)
-                image_paths.append(image_path)
+    def iter_pdf_page_images(self, pdf_source, page_numbers=None):
+        """
+        Render PDF pages to RGB numpy arrays one at a time, without touching disk
 
+        Args:
+            pdf_source: Path to the PDF or its raw bytes
+            page_numbers: Optional iterable of 0-based page indexes to render (default: all pages)
+
+        Yields:
+            numpy.ndarray: Page image of shape (height, width, 3)
+        """
+        if isinstance(pdf_source, (bytes, bytearray)):
+            doc = fitz.open(stream=pdf_source, filetype="pdf")
+        else:
+            doc = fitz.open(pdf_source)
+        try:
+            for page_num in (range(len(doc)) if page_numbers is None else page_numbers):
+                page = doc.load_page(page_num)
+                zoom = self._render_zoom(page)
+                with span("ocr.render"):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                yield np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        finally:
             doc.close()
-            return image_paths
+
+    def ocr_pdf_pages(self, pdf_source, page_numbers=None):
+        """
+        OCR PDF pages as they are rendered, keeping only a few page images in memory
+
+        Args:
+            pdf_source: Path to the PDF or its raw bytes
+            page_numbers: Optional iterable of 0-based page indexes to OCR (default: all pages)
+
+        Returns:
+            list: Recognized text per page, in page order
+        """
+        texts = []
+        try:
+            # The OCR service or the local OCR pool; without either, pages are OCR'd here one by one
+            executor = ocr_service.get_client() or ocr_pool.get_pool()
+            if executor is None:
+                for image in self.iter_pdf_page_images(pdf_source, page_numbers):
+                    with span("ocr.page"):
+                        image = ocr_preprocess.prepare(image)
+                        key = self._page_cache_key(image)
+                        text = self._cached_page(key)
+                        if text is None:
+                            text = self.extract_text_with_easyocr(image)
+                            self._cache_page(key, text)
+                        texts.append(text)
+                return texts
+
+            # Keep up to max_in_flight pages of this request queued; results are collected in page order
+            in_flight = deque()
+            for image in self.iter_pdf_page_images(pdf_source, page_numbers):
+                # Preprocessed here so only the smaller array is sent to the OCR processes
+                image = ocr_preprocess.prepare(image)
+                key = self._page_cache_key(image)
+                text = self._cached_page(key)
+                in_flight.append((image, key, text if text is not None else executor.submit(image),
+                                  time.perf_counter()))
+                if len(in_flight) >= executor.max_in_flight:
+                    texts.append(self._collect_ocr(*in_flight.popleft()))
+            while in_flight:
+                texts.append(self._collect_ocr(*in_flight.popleft()))
+            return texts
         except Exception as e:
             logger.error(f"Error converting PDF to images: {e}")
             traceback.print_exc()
-            return []
+            return texts
+
+    def _page_cache_key(self, image):
+        if self.page_cache is None:
+            return None
+        # Keyed by the rendered pixels, so the same scan inside a different PDF is still a hit
+        image = np.ascontiguousarray(image)
+        return TextCache.make_key(image, "ocr-page", f"v{EXTRACTOR_VERSION}", "x".join(map(str, image.shape)))
+
+    def _cached_page(self, key):
+        return self.page_cache.get(key) if key is not None else None
+
+    def _cache_page(self, key, text):
+        if key is not None and not text.startswith("Error"):
+            self.page_cache.put(key, text)
+
+    @staticmethod
+    def _page_needs_ocr(page, page_text):
+        """
+        Classify a PDF page as scanned, using its text density, image coverage and fonts
+
+        Args:
+            page: PyMuPDF page
+            page_text (str): Text already extracted from the page's text layer
+
+        Returns:
+            bool: True if the page should be OCR'd
+        """
+        if len(page_text.strip()) >= Config.OCR_PAGE_MIN_CHARS:
+            return False
+
+        page_area = page.rect.width * page.rect.height or 1
+        image_area = 0
+        for info in page.get_image_info():
+            bbox = fitz.Rect(info["bbox"]) & page.rect
+            if not bbox.is_empty:
+                image_area += bbox.width * bbox.height
+        if image_area / page_area >= Config.OCR_PAGE_MIN_IMAGE_COVERAGE:
+            return True
+
+        # Text converted to outlines has no fonts and no text layer, but is still drawn on the page
+        return not page.get_fonts() and bool(page.get_drawings())
+
+    def _merge_ocr_pages(self, pdf_source, page_texts, page_numbers):
+        """
+        OCR the given pages and write the results into page_texts in place
+
+        Args:
+            pdf_source: Path to the PDF or its raw bytes
+            page_texts (list): Text per page; extended if OCR returns more pages than it holds
+            page_numbers: 0-based page indexes to OCR, or None for all pages
+        """
+        if page_numbers is not None and not page_numbers:
+            return
+        ocr_texts = self.ocr_pdf_pages(pdf_source, page_numbers)
+        numbers = page_numbers if page_numbers is not None else range(len(ocr_texts))
+        for page_num, ocr_text in zip(numbers, ocr_texts):
+            while len(page_texts) <= page_num:
+                page_texts.append("")
+            # Keep the text layer when OCR failed or found less than the page already had
+            if not ocr_text.startswith("Error") and len(ocr_text.strip()) > len(page_texts[page_num].strip()):
+                page_texts[page_num] = ocr_text
+
+    def _collect_ocr(self, image, key, pending, submitted):
+        if isinstance(pending, str):
+            # Page cache hit
+            return pending
+        try:
+            # The timeout counts from submission, so pages queued together share it instead of adding up
+            remaining = submitted + Config.OCR_PAGE_TIMEOUT_SECONDS - time.perf_counter()
+            text = pending.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            pending.cancel()
+            logger.warning(f"OCR of a page did not finish in {Config.OCR_PAGE_TIMEOUT_SECONDS}s, skipping it")
+            text = f"Error: OCR timed out after {Config.OCR_PAGE_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            logger.warning(f"OCR worker failed on a page: {e}")
+            text = None
+        if text is None:
+            # Service or pool became unusable; OCR this page another way
+            text = self.extract_text_with_easyocr(image)
+        # Pages run in parallel, so this is the time from submission to result
+        record_stage("ocr.page", time.perf_counter() - submitted)
+        self._cache_page(key, text)
+        return text
 
     def extract_text(self, resume_file):
-        temp_dir = Config.UPLOAD_FOLDER
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_path = os.path.join(temp_dir, resume_file.filename)
-        resume_file.save(temp_path)
+        # Uploads are read straight from the request stream; nothing is written to disk
+        with span("upload.read"):
+            data = resume_file.stream.read(Config.MAX_CONTENT_LENGTH + 1)
+        if len(data) > Config.MAX_CONTENT_LENGTH:
+            msg = f"Error: File exceeds the maximum upload size of {Config.MAX_CONTENT_LENGTH} bytes."
+            logger.warning(msg)
+            return msg
+
+        if self.text_cache is None:
+            with span("extract"):
+                return self._extract_text_from_bytes(data, resume_file.filename)
+
+        file_ext = os.path.splitext(resume_file.filename)[1].lower()
+        cache_key = TextCache.make_key(data, f"v{EXTRACTOR_VERSION}", file_ext)
+
+        with span("extract.cache"):
+            text = self.text_cache.get(cache_key)
+        if text is not None:
+            logger.info(f"Extraction cache hit for {resume_file.filename}")
+            return text
 
+        with span("extract"):
+            text = self._extract_text_from_bytes(data, resume_file.filename)
+        # Only successful extractions are cached; errors may be transient
+        if not (text.startswith("Error") or text.startswith("Unsupported")):
+            self.text_cache.put(cache_key, text)
+        return text
+
+    def _extract_text_from_bytes(self, data, file_name):
         try:
-            file_ext = os.path.splitext(resume_file.filename)[1].lower()
+            file_ext = os.path.splitext(file_name)[1].lower()
             text = ""
 
             if file_ext == '.pdf':
+                # Text per page, so OCR output for scanned pages can be merged back in page order
+                page_texts = []
+                ocr_page_numbers = []
+
                 # Try with PyMuPDF (fitz) first instead of PyPDF2
                 try:
-                    pdf_doc = fitz.open(temp_path)
-                    for page_num in range(len(pdf_doc)):
-                        page = pdf_doc[page_num]
-                        page_text = page.get_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    pdf_doc.close()
+                    with span("extract.pymupdf"):
+                        pdf_doc = fitz.open(stream=data, filetype="pdf")
+                        for page_num in range(len(pdf_doc)):
+                            page = pdf_doc[page_num]
+                            page_text = page.get_text()
+                            page_texts.append(page_text)
+                            if self._page_needs_ocr(page, page_text):
+                                ocr_page_numbers.append(page_num)
+                        pdf_doc.close()
                 except Exception as fitz_error:
                     logger.error(f"PyMuPDF extraction error: {fitz_error}")
                     traceback.print_exc()
+                    page_texts = []
+                    ocr_page_numbers = []
 
                     # Fall back to PyPDF2 if PyMuPDF fails
                     try:
-                        with open(temp_path, 'rb') as file:
-                            reader = PyPDF2.PdfReader(file)
+                        with span("extract.pypdf2"):
+                            reader = PyPDF2.PdfReader(io.BytesIO(data))
                             for page in reader.pages:
                                 try:
-                                    page_text = page.extract_text()
-                                    if page_text:
-                                        text += page_text + "\n"
+                                    page_texts.append(page.extract_text() or "")
                                 except Exception as page_error:
                                     logger.warning(f"Error extracting text from page: {page_error}")
-                                    continue  # Skip problematic pages
+                                    page_texts.append("")  # Skip problematic pages
                     except Exception as pypdf_error:
                         logger.error(f"PyPDF2 extraction error: {pypdf_error}")
                         traceback.print_exc()
 
-                # If text extraction failed or returned minimal text, use OCR
+                # OCR only the pages without a usable text layer
+                if ocr_page_numbers:
+                    logger.info(f"OCR needed for {len(ocr_page_numbers)} of {len(page_texts)} pages")
+                    self._merge_ocr_pages(data, page_texts, ocr_page_numbers)
+
+                # Pages are separated by a form feed so the compactor can find headers and footers
+                text = PAGE_BREAK.join(page_text + "\n" for page_text in page_texts if page_text)
+
+                # If text extraction still returned minimal text, OCR the remaining pages as well
                 if not text.strip() or len(text) < 100:
                     logger.info("Text extraction insufficient, falling back to OCR")
-                    images_dir = os.path.join(temp_dir, "pdf_images")
-                    image_paths = self.pdf_to_images(temp_path, images_dir)
-                    ocr_text = ""
-
-                    for img_path in image_paths:
-                        # Use EasyOCR instead of Tesseract
-                        page_text = self.extract_text_with_easyocr(img_path)
-                        ocr_text += page_text + "\n"
-                        try:
-                            os.remove(img_path)
-                        except Exception:
-                            logger.warning(f"Failed to remove temporary image: {img_path}")
-
+                    # With no pages parsed (both parsers failed) the renderer tries every page;
+                    # pages OCR'd above are not OCR'd again, so a blank scan ends with nothing to do
+                    remaining = ([n for n in range(len(page_texts)) if n not in ocr_page_numbers]
+                                 if page_texts else None)
+                    self._merge_ocr_pages(data, page_texts, remaining)
+                    ocr_text = PAGE_BREAK.join(page_text + "\n" for page_text in page_texts if page_text)
                     if ocr_text.strip():
                         text = ocr_text
 
-                    try:
-                        os.rmdir(images_dir)
-                    except Exception:
-                        logger.warning(f"Failed to remove images dir: {images_dir}")
-
             elif file_ext in ['.docx', '.doc']:
                 try:
-                    doc = docx.Document(temp_path)
-                    text = "\n".join([p.text for p in doc.paragraphs if p.text])
+                    with span("extract.docx"):
+                        doc = docx.Document(io.BytesIO(data))
+                        text = "\n".join([p.text for p in doc.paragraphs if p.text])
                 except Exception as docx_error:
                     logger.error(f"DOCX processing error: {docx_error}")
                     traceback.print_exc()
@@ -134,16 +382,16 @@ class ResumeProcessor:
 
             elif file_ext in ['.txt', '.rtf']:
                 try:
-                    with open(temp_path, 'r', encoding='utf-8', errors='ignore') as file:
-                        text = file.read()
+                    text = data.decode('utf-8', errors='ignore')
                 except Exception as txt_error:
                     logger.error(f"TXT processing error: {txt_error}")
                     traceback.print_exc()
                     return f"Error extracting text from text file: {str(txt_error)}"
 
             elif file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']:
-                # Use EasyOCR for image files
-                text = self.extract_text_with_easyocr(temp_path)
+                # Use EasyOCR for image files; preprocessing decodes the bytes (EasyOCR does when it is off)
+                with span("ocr.image"):
+                    text = self.extract_text_with_easyocr(ocr_preprocess.prepare(data))
 
             else:
                 msg = f"Unsupported file format: {file_ext}. Please upload PDF, DOCX, TXT, or image files."
@@ -163,14 +411,6 @@ class ResumeProcessor:
             traceback.print_exc()
             return f"Error extracting text: {str(e)}"
 
-        finally:
-            try:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                    logger.info(f"Removed temporary file: {temp_path}")
-            except Exception as e:
-                logger.warning(f"Failed to remove temporary file: {e}")
-
     # The rest of your code remains unchanged
     def generate_ai_recommendations(self, analysis_results, job_description):
         """
@@ -188,8 +428,10 @@ class ResumeProcessor:
         # Calculate match quality
         match_score = analysis_results.get('match_score', 0)
         experience_match = analysis_results.get('experience_match', False)
-        skills_matched = analysis_results.get('skills_matched', [])
-        skills_missing = analysis_results.get('skills_missing', [])
+        # Fall back to the local job profile match when the model did not list skills
+        local_match = analysis_results.get('local_skill_match') or {}
+        skills_matched = analysis_results.get('skills_matched', local_match.get('matched', []))
+        skills_missing = analysis_results.get('skills_missing', local_match.get('missing', []))
 
         # Generate recommendations based on match score
         if match_score >= 85:
@@ -236,46 +478,197 @@ class ResumeProcessor:
     def process(self, resume_file, job_description):
         try:
             resume_text = self.extract_text(resume_file)
+            return self.analyze_text(resume_text, resume_file.filename, job_description)
+
+        except Exception as e:
+            logger.error(f"Resume processing failed: {e}")
+            traceback.print_exc()
+            return {"error": str(e), "status": "failed"}
+
+    async def process_async(self, resume_file, job_description, executor=None):
+        """
+        Async version of process for the ASGI app
+
+        Extraction and OCR run on executor (default: the loop's) so the event loop
+        keeps serving other requests, and the Gemini call is awaited.
+
+        Returns:
+            dict: Same results as process
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            # The copied context keeps the request trace active in the executor thread
+            resume_text = await loop.run_in_executor(executor, contextvars.copy_context().run,
+                                                     self.extract_text, resume_file)
+            return await self.analyze_text_async(resume_text, resume_file.filename, job_description, executor=executor)
+
+        except Exception as e:
+            logger.error(f"Resume processing failed: {e}")
+            traceback.print_exc()
+            return {"error": str(e), "status": "failed"}
+
+    async def analyze_text_async(self, resume_text, file_name, job_description, job_profile=None, executor=None):
+        """
+        Async version of analyze_text; blocking post-processing (the candidate store write) runs on executor
 
-            if isinstance(resume_text, str) and (
-                    resume_text.startswith("Error") or resume_text.startswith("Unsupported")):
+        Returns:
+            dict: Same results as analyze_text
+        """
+        try:
+            if self.is_extraction_error(resume_text):
                 logger.error(f"Extraction error: {resume_text}")
                 return {"error": resume_text, "status": "failed"}
 
-            results = self.gemini_api.analyze_resume(resume_text, job_description)
-
-            if isinstance(results, dict):
-                # Add file metadata
-                results["file_name"] = resume_file.filename
-                results["resume_text_preview"] = resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
-
-                # Generate AI recommendations
-                recommendations = self.generate_ai_recommendations(results, job_description)
-                results["recommendations"] = recommendations
-
-                # Add a simple score if missing
-                if "match_score" not in results:
-                    # Calculate a simple score based on skills match
-                    skills_matched = len(results.get("skills_matched", []))
-                    skills_missing = len(results.get("skills_missing", []))
-                    total_skills = skills_matched + skills_missing
-                    if total_skills > 0:
-                        results["match_score"] = int((skills_matched / total_skills) * 100)
-                    else:
-                        results["match_score"] = 50  # Default score
-
-                results["status"] = "success"
-            else:
-                results = {
-                    "analysis": results,
-                    "file_name": resume_file.filename,
-                    "resume_text_preview": resume_text[:200] + "..." if len(resume_text) > 200 else resume_text,
-                    "status": "success"
-                }
+            if job_profile is None and Config.JOB_PROFILE_ENABLED:
+                job_profile = get_job_profile(job_description)
 
-            return results
+            results = await async_gemini.run_async(
+                self.gemini_api.analyze_resume_async(resume_text, job_description, job_profile))
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, self._complete_analysis, results, resume_text, file_name, job_description, job_profile)
 
         except Exception as e:
             logger.error(f"Resume processing failed: {e}")
             traceback.print_exc()
             return {"error": str(e), "status": "failed"}
+
+    def analyze_text(self, resume_text, file_name, job_description, job_profile=None):
+        """
+        Analyze already extracted resume text against a job description
+
+        Args:
+            resume_text: Output of extract_text (may be an extraction error message)
+            file_name: Original name of the uploaded file
+            job_description: Job description string
+            job_profile: Parsed JobProfile; looked up from the profile cache when omitted
+
+        Returns:
+            dict: Analysis results, or an error dict with status "failed"
+        """
+        try:
+            if self.is_extraction_error(resume_text):
+                logger.error(f"Extraction error: {resume_text}")
+                return {"error": resume_text, "status": "failed"}
+
+            if job_profile is None and Config.JOB_PROFILE_ENABLED:
+                job_profile = get_job_profile(job_description)
+
+            results = self.gemini_api.analyze_resume(resume_text, job_description, job_profile)
+            return self._complete_analysis(results, resume_text, file_name, job_description, job_profile)
+
+        except Exception as e:
+            logger.error(f"Resume processing failed: {e}")
+            traceback.print_exc()
+            return {"error": str(e), "status": "failed"}
+
+    def stream_text_analysis(self, resume_text, file_name, job_description, job_profile=None):
+        """
+        Streaming version of analyze_text
+
+        Yields:
+            tuple: ("delta", text) and ("field", name, value) events as the model replies, then
+            ("result", analysis) with the same post-processing as analyze_text
+        """
+        try:
+            if self.is_extraction_error(resume_text):
+                logger.error(f"Extraction error: {resume_text}")
+                yield "result", {"error": resume_text, "status": "failed"}
+                return
+
+            if job_profile is None and Config.JOB_PROFILE_ENABLED:
+                job_profile = get_job_profile(job_description)
+
+            for event in self.gemini_api.stream_resume_analysis(resume_text, job_description, job_profile):
+                if event[0] == "result":
+                    event = ("result", self._complete_analysis(event[1], resume_text, file_name,
+                                                               job_description, job_profile))
+                yield event
+
+        except Exception as e:
+            logger.error(f"Resume processing failed: {e}")
+            traceback.print_exc()
+            yield "result", {"error": str(e), "status": "failed"}
+
+    def _complete_analysis(self, results, resume_text, file_name, job_description, job_profile):
+        """Add metadata, recommendations and a fallback score to a Gemini analysis, and store it"""
+        if isinstance(results, dict):
+            # Add file metadata
+            results["file_name"] = file_name
+            results["resume_text_preview"] = resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
+            if job_profile is not None:
+                results["local_skill_match"] = job_profile.match_skills(resume_text)
+            results["analysis_source"] = "gemini"
+
+            # Generate AI recommendations
+            recommendations = self.generate_ai_recommendations(results, job_description)
+            results["recommendations"] = recommendations
+
+            # Add a simple score if missing
+            if "match_score" not in results:
+                # Calculate a simple score based on skills match
+                results["match_score"] = skills_match_score(results.get("skills_matched", []),
+                                                            results.get("skills_missing", []))
+
+            results["status"] = "success"
+            self._record_candidate(results, resume_text, job_description, job_profile)
+        else:
+            results = {
+                "analysis": results,
+                "file_name": file_name,
+                "resume_text_preview": resume_text[:200] + "..." if len(resume_text) > 200 else resume_text,
+                "status": "success"
+            }
+
+        return results
+
+    def analyze_text_locally(self, resume_text, file_name, job_description, job_profile=None):
+        """
+        Score extracted resume text with the local job profile match only (no Gemini call)
+
+        Used for resumes the pre-screen did not shortlist. The match score is the same
+        skills ratio analyze_text falls back to when the model returns no score.
+
+        Returns:
+            dict: Analysis results with analysis_source "local", or an error dict with status "failed"
+        """
+        if self.is_extraction_error(resume_text):
+            logger.error(f"Extraction error: {resume_text}")
+            return {"error": resume_text, "status": "failed"}
+
+        job_profile = job_profile or get_job_profile(job_description)
+        local_match = job_profile.match_skills(resume_text)
+        results = {
+            "match_score": skills_match_score(local_match["matched"], local_match["missing"]),
+            "skills_matched": local_match["matched"],
+            "skills_missing": local_match["missing"],
+            "local_skill_match": local_match,
+            "recommendation": "Not shortlisted by the local pre-screen; not analyzed by AI",
+            "analysis_source": "local",
+            "file_name": file_name,
+            "resume_text_preview": resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
+        }
+        results["recommendations"] = self.generate_ai_recommendations(results, job_description)
+        results["status"] = "success"
+        self._record_candidate(results, resume_text, job_description, job_profile)
+        return results
+
+    def _record_candidate(self, results, resume_text, job_description, job_profile):
+        """Save a screening in the candidate store; a storage failure never fails the screening"""
+        if self.candidate_store is None or "error" in results:
+            return
+        if results.get("truncated"):
+            logger.info(f"Not recording the cut-off analysis of {results.get('file_name')}")
+            return
+        try:
+            results["candidate_id"] = self.candidate_store.record(
+                results, resume_text, job_description,
+                job_title=job_profile.title if job_profile is not None else None,
+                jd_hash=job_profile.jd_hash if job_profile is not None else None)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Could not record screening for {results.get('file_name')}: {e}")
+
+    @staticmethod
+    def is_extraction_error(resume_text):
+        """Whether extract_text returned an error message instead of resume text"""
+        return isinstance(resume_text, str) and (
+            resume_text.startswith("Error") or resume_text.startswith("Unsupported"))
@@ -1,16 +1,45 @@
 import re
 import nltk
+from concurrent.futures import ThreadPoolExecutor
 from nltk.sentiment import SentimentIntensityAnalyzer
-from collections import Counter
+from collections import Counter, deque
+from utils import async_gemini
 from utils.gemini_api import GeminiAPI
+from utils.fast_sentiment import VaderBatchScorer
+from utils.metrics import REGISTRY, span, timed
+from config import Config
 
 # Try to download NLTK data if not already present
 try:
-    nltk.data.find('vader_lexicon')
+    nltk.data.find('sentiment/vader_lexicon.zip')
 except LookupError:
     nltk.download('vader_lexicon')
     nltk.download('punkt')
 
+# Simple stopwords list (can be expanded)
+STOPWORDS = frozenset(['i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves',
+                       'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him',
+                       'his', 'himself', 'she', 'her', 'hers', 'herself', 'it', 'its',
+                       'itself', 'they', 'them', 'their', 'theirs', 'themselves',
+                       'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those',
+                       'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have',
+                       'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an',
+                       'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while',
+                       'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between',
+                       'into', 'through', 'during', 'before', 'after', 'above', 'below',
+                       'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over',
+                       'under', 'again', 'further', 'then', 'once', 'here', 'there',
+                       'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each',
+                       'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+                       'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
+                       's', 't', 'can', 'will', 'just', 'don', 'should', 'now'])
+KEYWORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+ROUTE_COUNTER = REGISTRY.counter("sentiment_route_total", "Feedback texts answered per route", ("route",))
+ROUTE_LATENCY = REGISTRY.histogram("sentiment_route_latency_seconds",
+                                   "Time to answer one feedback request (or one bulk Gemini batch) per route",
+                                   ("route",))
+
 
 class SentimentAnalyzer:
     """Class to handle employee sentiment analysis logic"""
@@ -21,32 +50,16 @@ class SentimentAnalyzer:
         self.gemini_api = GeminiAPI()
         # Initialize NLTK's sentiment analyzer for backup/comparison
         self.nltk_sia = SentimentIntensityAnalyzer()
+        # One-pass scorer for bulk requests, reusing the same lexicon
+        self.vader_batch = VaderBatchScorer(self.nltk_sia)
 
     def _extract_keywords(self, text, num_keywords=5):
         """Extract most frequent meaningful words as keywords"""
-        # Simple stopwords list (can be expanded)
-        stopwords = ['i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves',
-                     'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him',
-                     'his', 'himself', 'she', 'her', 'hers', 'herself', 'it', 'its',
-                     'itself', 'they', 'them', 'their', 'theirs', 'themselves',
-                     'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those',
-                     'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have',
-                     'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an',
-                     'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while',
-                     'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between',
-                     'into', 'through', 'during', 'before', 'after', 'above', 'below',
-                     'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over',
-                     'under', 'again', 'further', 'then', 'once', 'here', 'there',
-                     'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each',
-                     'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
-                     'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
-                     's', 't', 'can', 'will', 'just', 'don', 'should', 'now']
-
         # Clean text and tokenize
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+        words = KEYWORD_PATTERN.findall(text.lower())
 
         # Remove stopwords
-        filtered_words = [word for word in words if word not in stopwords]
+        filtered_words = [word for word in words if word not in STOPWORDS]
 
         # Count word frequencies
         freq = Counter(filtered_words)
@@ -54,6 +67,25 @@ class SentimentAnalyzer:
         # Return top keywords
         return [word for word, count in freq.most_common(num_keywords)]
 
+    def prescore_bulk(self, texts):
+        """
+        Compute the local NLTK sentiment and keywords for many texts in one pass
+
+        Args:
+            texts (list): Feedback texts
+
+        Returns:
+            list: {"nltk_sentiment", "keywords"} per text, identical to the per-call analyze() fields
+        """
+        compounds = self.vader_batch.compound_scores(texts)
+        # Survey answers repeat a lot; extract keywords once per distinct text
+        keywords = {}
+        for text in texts:
+            if text not in keywords:
+                keywords[text] = self._extract_keywords(text)
+        return [{"nltk_sentiment": compound, "keywords": list(keywords[text])}
+                for text, compound in zip(texts, compounds)]
+
     def analyze(self, feedback_text):
         """
         Analyze employee feedback for sentiment and attrition risk
@@ -65,116 +97,339 @@ class SentimentAnalyzer:
             dict: Analysis results
         """
         try:
+            with span("sentiment.vader"):
+                nltk_compound = self.nltk_sia.polarity_scores(feedback_text)['compound']
+            if self._is_clear_cut(feedback_text, nltk_compound):
+                with ROUTE_LATENCY.time(route="local"):
+                    results = self._local_result(feedback_text, nltk_compound)
+                ROUTE_COUNTER.inc(route="local")
+                return results
+
             # Use the Gemini API for sentiment analysis
-            results = self.gemini_api.analyze_sentiment(feedback_text)
+            with ROUTE_LATENCY.time(route="gemini"):
+                results = self.gemini_api.analyze_sentiment(feedback_text)
+                results = self._finalize(results, feedback_text, nltk_compound)
+            ROUTE_COUNTER.inc(route="gemini")
+            results["route"] = "gemini"
+            return results
+
+        except Exception as e:
+            return self._error_result(e)
+
+    async def analyze_async(self, feedback_text):
+        """
+        Async version of analyze for the ASGI app; the Gemini call is awaited instead of blocking a thread
+
+        Returns:
+            dict: Same results as analyze
+        """
+        try:
+            with span("sentiment.vader"):
+                nltk_compound = self.nltk_sia.polarity_scores(feedback_text)['compound']
+            if self._is_clear_cut(feedback_text, nltk_compound):
+                with ROUTE_LATENCY.time(route="local"):
+                    results = self._local_result(feedback_text, nltk_compound)
+                ROUTE_COUNTER.inc(route="local")
+                return results
+
+            with ROUTE_LATENCY.time(route="gemini"):
+                results = await async_gemini.run_async(self.gemini_api.analyze_sentiment_async(feedback_text))
+                results = self._finalize(results, feedback_text, nltk_compound)
+            ROUTE_COUNTER.inc(route="gemini")
+            results["route"] = "gemini"
+            return results
+
+        except Exception as e:
+            return self._error_result(e)
+
+    def analyze_stream(self, feedback_text):
+        """
+        Streaming version of analyze
+
+        Yields:
+            tuple: ("delta", text) and ("field", name, value) events while Gemini replies, then
+            ("result", analysis) with the same interpretation bands and fallbacks as analyze
+        """
+        try:
+            with span("sentiment.vader"):
+                nltk_compound = self.nltk_sia.polarity_scores(feedback_text)['compound']
+            if self._is_clear_cut(feedback_text, nltk_compound):
+                with ROUTE_LATENCY.time(route="local"):
+                    results = self._local_result(feedback_text, nltk_compound)
+                ROUTE_COUNTER.inc(route="local")
+                yield "result", results
+                return
+
+            with ROUTE_LATENCY.time(route="gemini"):
+                for event in self.gemini_api.stream_sentiment(feedback_text):
+                    if event[0] == "result":
+                        results = self._finalize(event[1], feedback_text, nltk_compound)
+                        results["route"] = "gemini"
+                        event = ("result", results)
+                    yield event
+            ROUTE_COUNTER.inc(route="gemini")
+
+        except Exception as e:
+            yield "result", self._error_result(e)
+
+    @staticmethod
+    def _is_clear_cut(feedback_text, nltk_compound):
+        """Whether tiered routing may answer this text from the local model alone"""
+        return (Config.SENTIMENT_ROUTING == "tiered"
+                and abs(nltk_compound) >= Config.SENTIMENT_LOCAL_MIN_CONFIDENCE
+                and len(feedback_text.split()) <= Config.SENTIMENT_LOCAL_MAX_WORDS)
 
-            # Calculate backup sentiment score using NLTK
+    def _local_result(self, feedback_text, nltk_compound, keywords=None):
+        """Build a full analysis from the VADER score, with the same bands and default recommendations"""
+        if keywords is None:
+            keywords = self._extract_keywords(feedback_text)
+        if nltk_compound >= 0.3:
+            attrition_risk = 'Low'
+        elif nltk_compound >= -0.3:
+            attrition_risk = 'Medium'
+        else:
+            attrition_risk = 'High'
+        results = {
+            'sentiment_score': nltk_compound,
+            'attrition_risk': attrition_risk,
+            'key_concerns': list(keywords) if nltk_compound < 0 else [],
+            'positive_factors': list(keywords) if nltk_compound > 0 else []
+        }
+        results = self._finalize(results, feedback_text, nltk_compound, keywords)
+        results["route"] = "local"
+        return results
+
+    def analyze_bulk(self, items):
+        """
+        Analyze many feedback texts, packing short ones into shared Gemini prompts
+
+        With tiered routing, clear-cut short texts are answered locally and only
+        the rest are sent to Gemini.
+
+        Args:
+            items (list): (item_id, feedback_text) pairs
+
+        Yields:
+            dict: Analysis results per item, in input order, each with its "id"
+        """
+        items = list(items)
+        texts = [text for _, text in items]
+        # Local scores depend only on the text, so they are keyed by it
+        local_scores = dict(zip(texts, self.prescore_bulk(texts)))
+
+        routes = [self._is_clear_cut(text, local_scores[text]["nltk_sentiment"]) for text in texts]
+        escalated = [item for item, local in zip(items, routes) if not local]
+        gemini_results = self._analyze_escalated(escalated, local_scores)
+        for (item_id, text), local in zip(items, routes):
+            if local:
+                local_score = local_scores[text]
+                try:
+                    item = self._local_result(text, local_score["nltk_sentiment"], local_score["keywords"])
+                except Exception as e:
+                    item = self._error_result(e)
+                ROUTE_COUNTER.inc(route="local")
+                yield dict(item, id=item_id)
+            else:
+                # Escalated results come back in the same relative order
+                yield next(gemini_results)
+
+    def _analyze_escalated(self, items, local_scores):
+        """Yield Gemini results for items in order, keeping a bounded number of batches in flight"""
+        batches = self._pack_batches(items)
+        with ThreadPoolExecutor(max_workers=Config.BATCH_LLM_CONCURRENCY) as pool:
+            # Keep a bounded number of batches in flight so results stream out in order
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append((batch, pool.submit(self._analyze_batch, batch)))
+                if len(in_flight) >= Config.BATCH_LLM_CONCURRENCY:
+                    yield from self._collect_batch(*in_flight.popleft(), local_scores, pool)
+            while in_flight:
+                yield from self._collect_batch(*in_flight.popleft(), local_scores, pool)
+
+    def analyze_bulk_local(self, items, chunk_size=5000):
+        """
+        Score many feedback texts with the local NLTK model only (no Gemini calls)
+
+        Args:
+            items (list): (item_id, feedback_text) pairs
+            chunk_size (int): Texts scored per vectorized pass
+
+        Yields:
+            dict: id, nltk_sentiment, keywords, text_length and word_count per item, in input order
+        """
+        items = list(items)
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            for (item_id, text), local in zip(chunk, self.prescore_bulk([text for _, text in chunk])):
+                yield dict(local, id=item_id, text_length=len(text), word_count=len(text.split()))
+
+    @staticmethod
+    def _pack_batches(items):
+        """Group items into prompt-sized batches; long texts get a batch of their own"""
+        batch, batch_chars = [], 0
+        for item_id, text in items:
+            if len(text) > Config.SENTIMENT_BATCH_ITEM_MAX_CHARS:
+                # Flush the pending batch first so results keep input order
+                if batch:
+                    yield batch
+                    batch, batch_chars = [], 0
+                yield [(item_id, text)]
+                continue
+            if batch and (len(batch) >= Config.SENTIMENT_BATCH_SIZE
+                          or batch_chars + len(text) > Config.SENTIMENT_BATCH_MAX_CHARS):
+                yield batch
+                batch, batch_chars = [], 0
+            batch.append((item_id, text))
+            batch_chars += len(text)
+        if batch:
+            yield batch
+
+    def _analyze_batch(self, batch):
+        """
+        Returns:
+            list: Gemini result per item, None for items the batch reply left out
+        """
+        if len(batch) == 1:
+            # Long items go alone, as a regular single-feedback prompt
+            return [self.gemini_api.analyze_sentiment(batch[0][1])]
+        with ROUTE_LATENCY.time(route="gemini_batch"):
+            return self.gemini_api.analyze_sentiment_batch([text for _, text in batch])
+
+    def _collect_batch(self, batch, future, local_scores, pool):
+        try:
+            batch_results = future.result()
+        except Exception as e:
+            # A single item has no smaller prompt to fall back to
+            batch_results = [e] if len(batch) == 1 else [None] * len(batch)
+        # Items missing from the batch reply are analyzed on their own, in parallel on the same pool
+        retries = {i: pool.submit(self.gemini_api.analyze_sentiment, text)
+                   for i, ((_, text), results) in enumerate(zip(batch, batch_results)) if results is None}
+        for i, (item_id, text) in enumerate(batch):
+            try:
+                results = retries[i].result() if i in retries else batch_results[i]
+                if isinstance(results, Exception):
+                    raise results
+                local = local_scores.get(text, {})
+                item = self._finalize(results, text, local.get("nltk_sentiment"), local.get("keywords"))
+                item["route"] = "gemini"
+            except Exception as e:
+                item = self._error_result(e)
+            ROUTE_COUNTER.inc(route="gemini")
+            yield dict(item, id=item_id)
+
+    @timed("sentiment.finalize")
+    def _finalize(self, results, feedback_text, nltk_compound=None, keywords=None):
+        """Merge a Gemini sentiment result with local NLTK scores, interpretation and recommendations"""
+        # Calculate backup sentiment score using NLTK, unless already computed in bulk
+        if nltk_compound is None:
             nltk_scores = self.nltk_sia.polarity_scores(feedback_text)
             nltk_compound = nltk_scores['compound']
 
-            # Extract keywords as a backup/enhancement
+        # Extract keywords as a backup/enhancement
+        if keywords is None:
             keywords = self._extract_keywords(feedback_text)
 
-            # Check if Gemini API returned proper results
-            if isinstance(results, dict) and ('error' in results or 'sentiment_score' not in results):
-                # Use NLTK as fallback
-                sentiment_score = nltk_compound
-                results = {
-                    'sentiment_score': sentiment_score,
-                    'attrition_risk': 'Medium',  # Default value
-                    'key_concerns': keywords,
-                    'positive_factors': [],
-                    'engagement_recommendations': [
-                        'Consider conducting a follow-up interview to gather more specific feedback.',
-                        'Implement regular check-ins to maintain communication channels.',
-                        'Review team dynamics and management practices.'
-                    ]
-                }
-            elif not isinstance(results, dict):
-                # If results is not a dictionary, create one
-                sentiment_score = nltk_compound
-                results = {
-                    'sentiment_score': sentiment_score,
-                    'attrition_risk': 'Medium',
-                    'key_concerns': keywords,
-                    'positive_factors': [],
-                    'sentiment_analysis': results,  # Include the original analysis as a field
-                    'engagement_recommendations': [
-                        'Consider conducting a follow-up interview to gather more specific feedback.',
-                        'Implement regular check-ins to maintain communication channels.',
-                        'Review team dynamics and management practices.'
-                    ]
-                }
-            else:
-                sentiment_score = results.get('sentiment_score', nltk_compound)
+        # Check if Gemini API returned proper results
+        if isinstance(results, dict) and ('error' in results or 'sentiment_score' not in results):
+            # Use NLTK as fallback
+            sentiment_score = nltk_compound
+            results = {
+                'sentiment_score': sentiment_score,
+                'attrition_risk': 'Medium',  # Default value
+                'key_concerns': keywords,
+                'positive_factors': [],
+                'engagement_recommendations': [
+                    'Consider conducting a follow-up interview to gather more specific feedback.',
+                    'Implement regular check-ins to maintain communication channels.',
+                    'Review team dynamics and management practices.'
+                ]
+            }
+        elif not isinstance(results, dict):
+            # If results is not a dictionary, create one
+            sentiment_score = nltk_compound
+            results = {
+                'sentiment_score': sentiment_score,
+                'attrition_risk': 'Medium',
+                'key_concerns': keywords,
+                'positive_factors': [],
+                'sentiment_analysis': results,  # Include the original analysis as a field
+                'engagement_recommendations': [
+                    'Consider conducting a follow-up interview to gather more specific feedback.',
+                    'Implement regular check-ins to maintain communication channels.',
+                    'Review team dynamics and management practices.'
+                ]
+            }
+        else:
+            sentiment_score = results.get('sentiment_score', nltk_compound)
+
+        # Add interpretations of the sentiment score
+        if sentiment_score >= 0.7:
+            results['interpretation'] = 'Very Positive'
+        elif sentiment_score >= 0.3:
+            results['interpretation'] = 'Positive'
+        elif sentiment_score >= -0.3:
+            results['interpretation'] = 'Neutral'
+        elif sentiment_score >= -0.7:
+            results['interpretation'] = 'Negative'
+        else:
+            results['interpretation'] = 'Very Negative'
+
+        # Ensure key_concerns and positive_factors exist
+        if 'key_concerns' not in results:
+            results['key_concerns'] = keywords
+        if 'positive_factors' not in results:
+            results['positive_factors'] = []
 
-            # Add interpretations of the sentiment score
-            if sentiment_score >= 0.7:
-                results['interpretation'] = 'Very Positive'
-            elif sentiment_score >= 0.3:
-                results['interpretation'] = 'Positive'
+        # Ensure engagement_recommendations exist
+        if 'engagement_recommendations' not in results or not results['engagement_recommendations']:
+            # Default recommendations based on sentiment
+            if sentiment_score >= 0.3:
+                results['engagement_recommendations'] = [
+                    "Continue reinforcing positive workplace culture",
+                    "Consider implementing a formal recognition program",
+                    "Maintain current management practices that are working well"
+                ]
             elif sentiment_score >= -0.3:
-                results['interpretation'] = 'Neutral'
-            elif sentiment_score >= -0.7:
-                results['interpretation'] = 'Negative'
+                results['engagement_recommendations'] = [
+                    "Schedule regular feedback sessions to address potential concerns",
+                    "Evaluate team communication processes for improvement opportunities",
+                    "Consider workplace satisfaction surveys to identify specific areas for enhancement"
+                ]
             else:
-                results['interpretation'] = 'Very Negative'
-
-            # Ensure key_concerns and positive_factors exist
-            if 'key_concerns' not in results:
-                results['key_concerns'] = keywords
-            if 'positive_factors' not in results:
-                results['positive_factors'] = []
-
-            # Ensure engagement_recommendations exist
-            if 'engagement_recommendations' not in results or not results['engagement_recommendations']:
-                # Default recommendations based on sentiment
-                if sentiment_score >= 0.3:
-                    results['engagement_recommendations'] = [
-                        "Continue reinforcing positive workplace culture",
-                        "Consider implementing a formal recognition program",
-                        "Maintain current management practices that are working well"
-                    ]
-                elif sentiment_score >= -0.3:
-                    results['engagement_recommendations'] = [
-                        "Schedule regular feedback sessions to address potential concerns",
-                        "Evaluate team communication processes for improvement opportunities",
-                        "Consider workplace satisfaction surveys to identify specific areas for enhancement"
-                    ]
-                else:
-                    results['engagement_recommendations'] = [
-                        "Conduct one-on-one meetings to address specific concerns",
-                        "Review management practices and team dynamics",
-                        "Develop an action plan to address identified issues",
-                        "Consider implementing additional support resources"
-                    ]
-
-            # Format recommendations for display
-            results['recommendations'] = "\n• " + "\n• ".join(results['engagement_recommendations'])
-
-            # Add text analysis metadata
-            results["text_length"] = len(feedback_text)
-            results["word_count"] = len(feedback_text.split())
-            results["nltk_sentiment"] = nltk_compound
-            results["keywords"] = keywords
+                results['engagement_recommendations'] = [
+                    "Conduct one-on-one meetings to address specific concerns",
+                    "Review management practices and team dynamics",
+                    "Develop an action plan to address identified issues",
+                    "Consider implementing additional support resources"
+                ]
 
-            return results
+        # Format recommendations for display
+        results['recommendations'] = "\n• " + "\n• ".join(results['engagement_recommendations'])
 
-        except Exception as e:
-            # Provide default values in case of error
-            return {
-                "error": str(e),
-                "status": "failed",
-                "sentiment_score": 0,
-                "interpretation": "Error",
-                "attrition_risk": "Medium",
-                "key_concerns": [],
-                "positive_factors": [],
-                "engagement_recommendations": [
-                    "Error analyzing feedback. Please try again.",
-                    "Consider conducting a manual review of this feedback.",
-                    "Check system configuration if errors persist."
-                ],
-                "recommendations": "• Error analyzing feedback. Please try again.\n• Consider conducting a manual review of this feedback.\n• Check system configuration if errors persist.",
-                "suggestion": "Please try again with different text or check if the Gemini API is functioning correctly."
-            }
\ No newline at end of file
+        # Add text analysis metadata
+        results["text_length"] = len(feedback_text)
+        results["word_count"] = len(feedback_text.split())
+        results["nltk_sentiment"] = nltk_compound
+        results["keywords"] = keywords
+
+        return results
+
+    @staticmethod
+    def _error_result(e):
+        # Provide default values in case of error
+        return {
+            "error": str(e),
+            "status": "failed",
+            "sentiment_score": 0,
+            "interpretation": "Error",
+            "attrition_risk": "Medium",
+            "key_concerns": [],
+            "positive_factors": [],
+            "engagement_recommendations": [
+                "Error analyzing feedback. Please try again.",
+                "Consider conducting a manual review of this feedback.",
+                "Check system configuration if errors persist."
+            ],
+            "recommendations": "• Error analyzing feedback. Please try again.\n• Consider conducting a manual review of this feedback.\n• Check system configuration if errors persist.",
+            "suggestion": "Please try again with different text or check if the Gemini API is functioning correctly."
+        }
\ No newline at end of file
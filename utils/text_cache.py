@@ -0,0 +1,155 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Lookups only read; access times and hit/miss counts are written in one transaction
+# once this many lookups or seconds have passed, and before every store
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 5.0
+
+
+class TextCache:
+    """Content-addressed, size-bounded LRU cache of extracted text stored in SQLite"""
+
+    def __init__(self, path, max_bytes):
+        """
+        Args:
+            path (str): Location of the SQLite database file
+            max_bytes (int): Total size of cached text kept before evicting least recently used entries
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Buffered by get() until the next flush
+        self._pending_lock = threading.Lock()
+        self._accessed = {}
+        self._hits = 0
+        self._misses = 0
+        self._flushed = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            # Counters live in the database so hits from pool workers and other web workers add up
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0)")
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the cache safe across threads and forked workers
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(data, *parts):
+        """
+        Build a cache key from raw content and any qualifiers that change the output
+
+        Args:
+            data (bytes): File content
+            *parts: Extra key components such as extractor version and file extension
+
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        return ":".join([str(p) for p in parts] + [digest])
+
+    def get(self, key):
+        """Return cached text for key, or None on a miss"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT text FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Text cache lookup failed: {e}")
+            return None
+
+        with self._pending_lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._accessed[key] = time.time()
+            due = (self._hits + self._misses >= FLUSH_EVERY
+                   or time.monotonic() - self._flushed >= FLUSH_INTERVAL)
+        if due:
+            self.flush()
+        return row[0] if row is not None else None
+
+    def flush(self):
+        """Write buffered access times and hit/miss counts to the database"""
+        with self._pending_lock:
+            accessed, hits, misses = self._accessed, self._hits, self._misses
+            self._accessed, self._hits, self._misses = {}, 0, 0
+            self._flushed = time.monotonic()
+        if not (accessed or hits or misses):
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany("UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+                                 [(accessed_at, key) for key, accessed_at in accessed.items()])
+                conn.executemany("UPDATE counters SET value = value + ? WHERE name = ?",
+                                 [(hits, 'hits'), (misses, 'misses')])
+        except sqlite3.Error as e:
+            logger.warning(f"Text cache access update failed: {e}")
+
+    def put(self, key, text):
+        """Store text under key and evict least recently used entries beyond max_bytes"""
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        # Eviction below goes by last access, so recent hits must be recorded first
+        self.flush()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                             (key, text, size, time.time()))
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                evicted = 0
+                while total > self.max_bytes:
+                    row = conn.execute("SELECT key, size FROM entries ORDER BY last_access LIMIT 1").fetchone()
+                    if row is None:
+                        break
+                    conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+                    total -= row[1]
+                    evicted += 1
+                if evicted:
+                    conn.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (evicted,))
+        except sqlite3.Error as e:
+            logger.warning(f"Text cache store failed: {e}")
+
+    def stats(self):
+        """Return hit/miss counters and current cache size"""
+        self.flush()
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = counters.get('hits', 0) + counters.get('misses', 0)
+        return {
+            "hits": counters.get('hits', 0),
+            "misses": counters.get('misses', 0),
+            "evictions": counters.get('evictions', 0),
+            "hit_rate": round(counters.get('hits', 0) / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes
+        }